@@ -6,15 +6,24 @@ Módulo que contiene los algoritmos de búsqueda requeridos:
 
 from typing import List, Optional
 from funciones_libros.libro import Libro
+from funciones_libros.isbn import clave_isbn_o_none
+from funciones_libros.texto import normalizar_termino
 
 class Busqueda:
     """
     Clase que contiene los algoritmos de búsqueda requeridos.
+    
+    Atributos:
+        examinados: Número de elementos examinados en la última búsqueda
     """
     
+    examinados: int = 0
+    
     def busqueda_lineal(self, inventario: List[Libro], termino: str) -> List[Libro]:
         """
         Busca libros por título o autor usando búsqueda lineal en el inventario general.
+        La comparación no distingue mayúsculas ni tildes y usa las formas
+        normalizadas que cada libro guarda, sin convertir su texto en cada búsqueda.
         
         Args:
             inventario: Lista de objetos Libro (inventario general desordenado)
@@ -24,19 +33,22 @@ class Busqueda:
             Lista de objetos Libro que coinciden con el término de búsqueda
         """
         resultados = []
-        termino_lower = termino.lower()
+        termino_normalizado = normalizar_termino(termino)
         
         for libro in inventario:
-            if (termino_lower in libro.titulo.lower() or 
-                termino_lower in libro.autor.lower()):
+            if (termino_normalizado in libro.titulo_normalizado or 
+                termino_normalizado in libro.autor_normalizado):
                 resultados.append(libro)
         
+        self.examinados = len(inventario)
         return resultados
     
     def busqueda_binaria(self, inventario_ordenado: List[Libro], isbn: str) -> Optional[int]:
         """
         Busca un libro por ISBN usando búsqueda binaria en el inventario ordenado.
         Esta función es crítica para verificar reservas pendientes.
+        Se compara la clave entera de cada libro (ISBN-13), por lo que un
+        ISBN-10 encuentra al mismo libro que su ISBN-13 equivalente.
         
         Args:
             inventario_ordenado: Lista de objetos Libro ordenada por ISBN
@@ -47,25 +59,19 @@ class Busqueda:
         """
         izquierda = 0
         derecha = len(inventario_ordenado) - 1
-        isbn_limpio = isbn.replace("-", "").replace(" ", "")
-        
-        try:
-            isbn_int = int(isbn_limpio)
-        except ValueError:
+        self.examinados = 0
+        clave = clave_isbn_o_none(isbn)
+        if clave is None:
             return None
         
         while izquierda <= derecha:
             medio = (izquierda + derecha) // 2
-            isbn_medio_limpio = inventario_ordenado[medio].isbn.replace("-", "").replace(" ", "")
-            
-            try:
-                isbn_medio_int = int(isbn_medio_limpio)
-            except ValueError:
-                return None
+            self.examinados += 1
+            clave_medio = inventario_ordenado[medio].clave
             
-            if isbn_medio_int == isbn_int:
+            if clave_medio == clave:
                 return medio
-            elif isbn_medio_int < isbn_int:
+            elif clave_medio < clave:
                 izquierda = medio + 1
             else:
                 derecha = medio - 1
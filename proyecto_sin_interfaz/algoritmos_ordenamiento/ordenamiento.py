@@ -4,7 +4,7 @@ Módulo que contiene los algoritmos de ordenamiento requeridos:
 - Merge Sort
 """
 
-from typing import List
+from typing import List, Optional
 from funciones_libros.libro import Libro
 
 class Ordenamiento:
@@ -30,21 +30,11 @@ class Ordenamiento:
             j = i - 1
             
             # Mover elementos mayores que el ISBN actual una posición adelante
-            # Normalizar ISBNs para comparación (eliminar guiones y espacios)
-            isbn_actual = libro_actual.isbn.replace("-", "").replace(" ", "")
-            try:
-                isbn_actual_int = int(isbn_actual)
-            except ValueError:
-                isbn_actual_int = 0
+            # (se compara la clave entera del ISBN, calculada al crear el libro)
+            clave_actual = libro_actual.clave
             
             while j >= 0:
-                isbn_j = lista_ordenada[j].isbn.replace("-", "").replace(" ", "")
-                try:
-                    isbn_j_int = int(isbn_j)
-                except ValueError:
-                    isbn_j_int = 0
-                
-                if isbn_j_int > isbn_actual_int:
+                if lista_ordenada[j].clave > clave_actual:
                     lista_ordenada[j + 1] = lista_ordenada[j]
                     j -= 1
                 else:
@@ -108,19 +98,27 @@ class Ordenamiento:
         
         return resultado
     
-    def generar_reporte_por_valor(self, inventario: List[Libro], archivo: str = "reporte_por_valor.json") -> None:
+    def generar_reporte_por_valor(self, inventario: List[Libro], archivo: str = "reporte_por_valor.json",
+                                  ordenado: bool = False, formato: Optional[str] = None,
+                                  comprimir: Optional[bool] = None) -> None:
         """
         Genera un reporte del inventario ordenado por valor y lo guarda en un archivo.
+        Los libros se escriben uno a uno, sin construir la lista de diccionarios.
         
         Args:
             inventario: Lista de objetos Libro
             archivo: Nombre del archivo donde se guardará el reporte
+            ordenado: Si es True, el inventario ya viene ordenado por valor
+                      (p. ej. desde GestorLibros.obtener_inventario_por_valor)
+                      y no se vuelve a ordenar
+            formato: "json", "json_indentado" o "jsonl" (ver persistencia.serializador)
+            comprimir: Si es True se comprime con gzip; si es None se comprime
+                       cuando el archivo termina en ".gz"
         """
-        import json
         import os
+        from persistencia.serializador import escribir_registros
         
-        inventario_ordenado = self.merge_sort_por_valor(inventario)
-        datos = [libro.to_dict() for libro in inventario_ordenado]
+        inventario_ordenado = inventario if ordenado else self.merge_sort_por_valor(inventario)
         
         try:
             # Obtener el directorio del script actual
@@ -128,8 +126,8 @@ class Ordenamiento:
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, archivo)
             
-            with open(ruta_archivo, "w", encoding="utf-8") as f:
-                json.dump(datos, f, indent=4, ensure_ascii=False)
+            escribir_registros(ruta_archivo, (libro.to_dict() for libro in inventario_ordenado),
+                               formato, comprimir)
             print(f"\nReporte generado exitosamente en {archivo}")
         except Exception as e:
             print(f"Error al generar reporte: {e}")
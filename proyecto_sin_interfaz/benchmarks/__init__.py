@@ -0,0 +1,3 @@
+from .generador import GeneradorDatos
+
+__all__ = ['GeneradorDatos']
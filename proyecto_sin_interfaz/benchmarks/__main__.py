@@ -0,0 +1,4 @@
+import sys
+from .ejecutar import main
+
+sys.exit(main())
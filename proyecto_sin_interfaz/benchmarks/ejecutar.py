@@ -0,0 +1,304 @@
+"""
+Módulo que ejecuta la suite de benchmarks del sistema y compara los
+resultados con una línea base guardada.
+
+Uso (desde el directorio del proyecto):
+    python -m benchmarks --escalas 1k 10k --salida resultados.json
+    python -m benchmarks --escalas 1k --comparar resultados.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_libros.indice_valor import IndiceValor
+from funciones_libros.catalogo_particionado import CatalogoParticionado
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+from algoritmos_busqueda.busqueda import Busqueda
+from algoritmos_ordenamiento.ordenamiento import Ordenamiento
+from problemas_resueltos.estanteria import Estanteria
+from recursion.funciones_recursivas import FuncionesRecursivas
+from .generador import GeneradorDatos, PALABRAS
+
+ESCALAS = {"1k": 1000, "10k": 10000, "100k": 100000, "1M": 1000000}
+
+# Tamaños máximos para los algoritmos cuyo costo no es (casi) lineal.
+# Con estos límites cada medición termina en segundos a cualquier escala.
+LIMITE_INSERCION = 2000
+LIMITE_FUERZA_BRUTA = 40
+LIMITE_BACKTRACKING = 18
+CONSULTAS_BINARIAS = 1000
+
+
+def _medir(funcion: Callable[[], Any], repeticiones: int) -> List[float]:
+    """
+    Ejecuta una función varias veces y mide cada ejecución.
+
+    Args:
+        funcion: Función sin argumentos a medir
+        repeticiones: Número de ejecuciones
+
+    Returns:
+        Lista con la duración de cada ejecución en segundos
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def _resultado(escala: str, nombre: str, n: int, tiempos: List[float],
+               operaciones: int = 1) -> Dict[str, Any]:
+    """
+    Construye el registro de resultado de un benchmark.
+
+    Args:
+        escala: Nombre de la escala (1k, 10k, ...)
+        nombre: Nombre del benchmark
+        n: Tamaño efectivo de la entrada
+        tiempos: Duraciones medidas en segundos
+        operaciones: Operaciones realizadas en cada ejecución
+
+    Returns:
+        Diccionario con las estadísticas de la medición
+    """
+    return {
+        "escala": escala,
+        "nombre": nombre,
+        "n": n,
+        "operaciones": operaciones,
+        "repeticiones": len(tiempos),
+        "min_s": min(tiempos),
+        "mediana_s": statistics.median(tiempos),
+    }
+
+
+def ejecutar_benchmarks(escalas: List[str], semilla: int = 42, repeticiones: int = 3,
+                        solo: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Ejecuta la suite de benchmarks para las escalas indicadas.
+
+    Args:
+        escalas: Nombres de escala a ejecutar (claves de ESCALAS)
+        semilla: Semilla del generador de datos
+        repeticiones: Número de ejecuciones de cada benchmark
+        solo: Nombres de benchmarks a ejecutar (todos si es None)
+
+    Returns:
+        Diccionario con metadatos y la lista de resultados
+    """
+    busqueda = Busqueda()
+    ordenamiento = Ordenamiento()
+    estanteria = Estanteria()
+    recursion = FuncionesRecursivas()
+    resultados = []
+
+    def activo(nombre: str) -> bool:
+        return solo is None or nombre in solo
+
+    for escala in escalas:
+        n = ESCALAS[escala]
+        generador = GeneradorDatos(semilla)
+        libros = generador.libros(n)
+        usuarios = generador.usuarios(max(1, n // 10))
+        ordenados = sorted(libros, key=lambda libro: libro.clave)
+        consultas = [generador.aleatorio.choice(libros).isbn for _ in range(CONSULTAS_BINARIAS)]
+        termino = generador.aleatorio.choice(PALABRAS)
+        autor = libros[0].autor
+
+        if activo("busqueda_lineal"):
+            tiempos = _medir(lambda: busqueda.busqueda_lineal(libros, termino), repeticiones)
+            resultados.append(_resultado(escala, "busqueda_lineal", n, tiempos))
+
+        if activo("busqueda_particionada"):
+            # El reparto inicial del catálogo entre procesos no se mide
+            with CatalogoParticionado(libros) as catalogo:
+                tiempos = _medir(lambda: catalogo.buscar_por_titulo_autor(termino), repeticiones)
+            resultados.append(_resultado(escala, "busqueda_particionada", n, tiempos))
+
+        if activo("busqueda_binaria"):
+            tiempos = _medir(lambda: [busqueda.busqueda_binaria(ordenados, isbn) for isbn in consultas],
+                             repeticiones)
+            resultados.append(_resultado(escala, "busqueda_binaria", n, tiempos, CONSULTAS_BINARIAS))
+
+        if activo("ordenamiento_insercion"):
+            muestra = libros[:LIMITE_INSERCION]
+            tiempos = _medir(lambda: ordenamiento.ordenamiento_insercion(muestra), repeticiones)
+            resultados.append(_resultado(escala, "ordenamiento_insercion", len(muestra), tiempos))
+
+        if activo("merge_sort_por_valor"):
+            tiempos = _medir(lambda: ordenamiento.merge_sort_por_valor(libros), repeticiones)
+            resultados.append(_resultado(escala, "merge_sort_por_valor", n, tiempos))
+
+        if activo("rango_valor_indice"):
+            indice_valor = IndiceValor(libros)
+            rangos = [(v, v + 20000) for v in
+                      (generador.aleatorio.randint(10000, 150000) for _ in range(CONSULTAS_BINARIAS))]
+            tiempos = _medir(lambda: [indice_valor.en_rango(minimo, maximo) for minimo, maximo in rangos],
+                             repeticiones)
+            resultados.append(_resultado(escala, "rango_valor_indice", n, tiempos, CONSULTAS_BINARIAS))
+
+        if activo("fuerza_bruta_estanteria"):
+            muestra = libros[:LIMITE_FUERZA_BRUTA]
+            tiempos = _medir(lambda: estanteria.fuerza_bruta_estanteria_deficiente(muestra), repeticiones)
+            resultados.append(_resultado(escala, "fuerza_bruta_estanteria", len(muestra), tiempos))
+
+        if activo("backtracking_estanteria"):
+            muestra = libros[:LIMITE_BACKTRACKING]
+            tiempos = _medir(lambda: estanteria.backtracking_estanteria_optima(muestra), repeticiones)
+            resultados.append(_resultado(escala, "backtracking_estanteria", len(muestra), tiempos))
+
+        # La profundidad de las funciones recursivas crece con la lista,
+        # por lo que se limita para no superar el límite de recursión.
+        muestra_recursiva = libros[:sys.getrecursionlimit() - 100]
+        if activo("valor_total_autor_pila"):
+            tiempos = _medir(lambda: recursion.valor_total_autor_recursivo_pila(muestra_recursiva, autor),
+                             repeticiones)
+            resultados.append(_resultado(escala, "valor_total_autor_pila", len(muestra_recursiva), tiempos))
+
+        if activo("peso_promedio_autor_cola"):
+            tiempos = _medir(lambda: recursion.peso_promedio_autor_recursivo_cola(muestra_recursiva, autor),
+                             repeticiones)
+            resultados.append(_resultado(escala, "peso_promedio_autor_cola", len(muestra_recursiva), tiempos))
+
+        if activo("registro_usuarios"):
+            padron = generador.usuarios(n)
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta_usuarios = os.path.join(directorio, "usuarios.json")
+
+                def registrar():
+                    gestor_usuarios = GestorUsuario(ruta_usuarios)
+                    gestor_usuarios.autoguardado = False
+                    gestor_usuarios.registrar_masivo(padron)
+                    for usuario in padron[:CONSULTAS_BINARIAS]:
+                        gestor_usuarios.buscar_usuario(usuario.identificacion)
+
+                tiempos = _medir(registrar, repeticiones)
+                resultados.append(_resultado(escala, "registro_usuarios", n, tiempos))
+
+        if activo("prestar_devolver"):
+            with tempfile.TemporaryDirectory() as directorio:
+                GeneradorDatos.guardar(os.path.join(directorio, "libros.json"), ordenados)
+                GeneradorDatos.guardar(os.path.join(directorio, "historial.json"),
+                                       generador.prestamos(n, libros, usuarios))
+                GeneradorDatos.guardar(os.path.join(directorio, "reservas.json"),
+                                       generador.reservas(max(1, n // 100), libros, usuarios))
+                gestor_libros = GestorLibros(os.path.join(directorio, "libros.json"))
+                gestor_prestamos = GestorPrestamos(gestor_libros,
+                                                   os.path.join(directorio, "historial.json"),
+                                                   os.path.join(directorio, "reservas.json"))
+                operaciones = max(5, min(100, 100000 // n))
+                eventos = [(generador.aleatorio.choice(libros).isbn,
+                            generador.aleatorio.choice(usuarios).nombre) for _ in range(operaciones)]
+
+                def ciclo():
+                    for isbn, usuario in eventos:
+                        gestor_prestamos.prestar_libro(isbn, usuario)
+                        gestor_prestamos.devolver_libro(isbn, usuario)
+
+                tiempos = _medir(ciclo, repeticiones)
+                resultados.append(_resultado(escala, "prestar_devolver", n, tiempos, operaciones))
+
+    return {
+        "meta": {
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "semilla": semilla,
+            "repeticiones": repeticiones,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar_resultados(actual: Dict[str, Any], base: Dict[str, Any],
+                        umbral: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compara los resultados actuales con una línea base.
+
+    Se compara la mediana de cada benchmark presente en ambas ejecuciones y
+    se marca como regresión si supera a la de la base en más del umbral.
+
+    Args:
+        actual: Resultados de la ejecución actual
+        base: Resultados de la línea base
+        umbral: Aumento relativo tolerado (0.10 = 10 %)
+
+    Returns:
+        Lista de comparaciones con la razón actual/base y la marca de regresión
+    """
+    indice_base = {(r["escala"], r["nombre"]): r for r in base.get("resultados", [])}
+    comparaciones = []
+    for resultado in actual.get("resultados", []):
+        referencia = indice_base.get((resultado["escala"], resultado["nombre"]))
+        if referencia is None or referencia["mediana_s"] <= 0:
+            continue
+        razon = resultado["mediana_s"] / referencia["mediana_s"]
+        comparaciones.append({
+            "escala": resultado["escala"],
+            "nombre": resultado["nombre"],
+            "base_s": referencia["mediana_s"],
+            "actual_s": resultado["mediana_s"],
+            "razon": razon,
+            "regresion": razon > 1 + umbral,
+        })
+    return comparaciones
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de la línea de comandos.
+
+    Args:
+        argumentos: Argumentos de la línea de comandos (sys.argv si es None)
+
+    Returns:
+        Código de salida: 0 si no hay regresiones, 1 en caso contrario
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks del Sistema de Gestión de Bibliotecas")
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["1k"],
+                        help="Escalas a ejecutar")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador de datos")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Ejecuciones por benchmark")
+    parser.add_argument("--solo", nargs="+", help="Ejecutar solo los benchmarks indicados")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Archivo JSON de línea base para detectar regresiones")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="Aumento relativo tolerado antes de marcar una regresión")
+    args = parser.parse_args(argumentos)
+
+    resultados = ejecutar_benchmarks(args.escalas, args.semilla, args.repeticiones, args.solo)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=4, ensure_ascii=False)
+    else:
+        json.dump(resultados, sys.stdout, indent=4, ensure_ascii=False)
+        print()
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        comparaciones = comparar_resultados(resultados, base, args.umbral)
+        regresiones = [c for c in comparaciones if c["regresion"]]
+        for c in comparaciones:
+            marca = "REGRESIÓN" if c["regresion"] else "ok"
+            print(f"{c['escala']:>5} {c['nombre']:<28} {c['base_s']:.6f}s -> {c['actual_s']:.6f}s "
+                  f"(x{c['razon']:.2f}) {marca}", file=sys.stderr)
+        if regresiones:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Módulo que genera datos sintéticos reproducibles (catálogo, usuarios,
+préstamos y reservas) para medir el sistema a escalas realistas.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from funciones_libros.libro import Libro
+from funciones_prestamo.funciones_usuario.gestor_usuario import Usuario
+from persistencia.serializador import escribir_registros
+
+NOMBRES = ["Gabriel", "María", "José", "Lucía", "Andrés", "Camila", "Sofía", "Juan",
+           "Valentina", "Martín", "Isabel", "Tomás", "Ana", "Héctor", "Raúl", "Inés"]
+APELLIDOS = ["García", "Márquez", "Rodríguez", "López", "Pérez", "Gómez", "Díaz",
+             "Martínez", "Sánchez", "Ramírez", "Torres", "Álvarez", "Castaño", "Muñoz"]
+PALABRAS = ["amor", "tiempo", "soledad", "ciudad", "noche", "río", "memoria", "guerra",
+            "sombra", "viaje", "jardín", "silencio", "mar", "invierno", "sueño", "camino",
+            "historia", "montaña", "espejo", "fuego", "libro", "casa", "ángel", "destino"]
+ARTICULOS = ["El", "La", "Los", "Las", "Un", "Una"]
+
+
+class GeneradorDatos:
+    """
+    Clase que genera datos sintéticos deterministas a partir de una semilla.
+
+    Atributos:
+        semilla: Semilla del generador pseudoaleatorio
+    """
+
+    def __init__(self, semilla: int = 42):
+        """
+        Inicializa el generador.
+
+        Args:
+            semilla: Semilla del generador pseudoaleatorio
+        """
+        self.semilla = semilla
+        self.aleatorio = random.Random(semilla)
+
+    @staticmethod
+    def _isbn13(cuerpo: int) -> str:
+        """
+        Construye un ISBN-13 válido (prefijo 978 y dígito de control) con guiones.
+
+        Args:
+            cuerpo: Número de 9 dígitos que identifica al libro
+
+        Returns:
+            ISBN-13 con formato 978-XX-XXX-XXXX-X
+        """
+        digitos = f"978{cuerpo:09d}"
+        suma = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digitos))
+        control = (10 - suma % 10) % 10
+        return f"{digitos[:3]}-{digitos[3:5]}-{digitos[5:8]}-{digitos[8:]}-{control}"
+
+    def _nombre(self) -> str:
+        """Genera un nombre completo aleatorio."""
+        return (f"{self.aleatorio.choice(NOMBRES)} {self.aleatorio.choice(APELLIDOS)} "
+                f"{self.aleatorio.choice(APELLIDOS)}")
+
+    def libros(self, n: int) -> List[Libro]:
+        """
+        Genera un catálogo de libros con ISBN únicos y autores repetidos
+        (aproximadamente 20 títulos por autor).
+
+        Args:
+            n: Número de libros
+
+        Returns:
+            Lista de objetos Libro en orden aleatorio
+        """
+        autores = [self._nombre() for _ in range(max(1, n // 20))]
+        cuerpos = self.aleatorio.sample(range(10 ** 9), n)
+        catalogo = []
+        for cuerpo in cuerpos:
+            titulo = (f"{self.aleatorio.choice(ARTICULOS)} {self.aleatorio.choice(PALABRAS)} "
+                      f"de {self.aleatorio.choice(PALABRAS)}")
+            cantidad = self.aleatorio.randint(1, 5)
+            catalogo.append(Libro(
+                self._isbn13(cuerpo), titulo, self.aleatorio.choice(autores),
+                round(self.aleatorio.uniform(0.2, 2.5), 2),
+                self.aleatorio.randrange(15000, 120000, 500),
+                cantidad
+            ))
+        return catalogo
+
+    def usuarios(self, n: int) -> List[Usuario]:
+        """
+        Genera usuarios con identificación única.
+
+        Args:
+            n: Número de usuarios
+
+        Returns:
+            Lista de objetos Usuario
+        """
+        return [Usuario(self._nombre(), f"CC{10000000 + i}") for i in range(n)]
+
+    def prestamos(self, n: int, libros: List[Libro], usuarios: List[Usuario],
+                  dias: int = 3 * 365) -> List[Dict[str, Any]]:
+        """
+        Genera un historial de préstamos en orden cronológico con el mismo
+        formato que los registros de la Pila de historial.
+
+        Args:
+            n: Número de préstamos
+            libros: Catálogo del que se eligen los ISBN
+            usuarios: Usuarios que realizan los préstamos
+            dias: Antigüedad máxima del historial en días
+
+        Returns:
+            Lista de diccionarios con ISBN, Fecha y Usuario
+        """
+        inicio = datetime.now() - timedelta(days=dias)
+        segundos = [self.aleatorio.randrange(dias * 86400) for _ in range(n)]
+        segundos.sort()
+        return [{
+            "ISBN": self.aleatorio.choice(libros).isbn,
+            "Fecha": (inicio + timedelta(seconds=s)).strftime("%Y-%m-%d %H:%M:%S"),
+            "Usuario": self.aleatorio.choice(usuarios).nombre
+        } for s in segundos]
+
+    def reservas(self, n: int, libros: List[Libro], usuarios: List[Usuario]) -> List[Dict[str, Any]]:
+        """
+        Genera reservas pendientes con el formato de la Cola de reservas.
+
+        Args:
+            n: Número de reservas
+            libros: Catálogo del que se eligen los ISBN
+            usuarios: Usuarios que realizan las reservas
+
+        Returns:
+            Lista de diccionarios con ISBN y Usuario
+        """
+        return [{
+            "ISBN": self.aleatorio.choice(libros).isbn,
+            "Usuario": self.aleatorio.choice(usuarios).nombre
+        } for _ in range(n)]
+
+    @staticmethod
+    def guardar(ruta_archivo: str, datos: List[Any]) -> None:
+        """
+        Guarda una lista de libros o diccionarios en un archivo JSON compacto.
+
+        Args:
+            ruta_archivo: Ruta del archivo de destino
+            datos: Lista de objetos Libro o de diccionarios
+        """
+        escribir_registros(ruta_archivo, (d.to_dict() if isinstance(d, Libro) else d for d in datos))
@@ -0,0 +1,4 @@
+"""
+Configuración de pytest: las pruebas importan los paquetes del proyecto
+(funciones_libros, persistencia, ...) desde este directorio.
+"""
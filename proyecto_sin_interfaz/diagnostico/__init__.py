@@ -0,0 +1,5 @@
+from .metricas import (Histograma, RegistroMetricas, metricas, activar_instrumentacion,
+                       desactivar_instrumentacion, instrumentacion_activa)
+
+__all__ = ['Histograma', 'RegistroMetricas', 'metricas', 'activar_instrumentacion',
+           'desactivar_instrumentacion', 'instrumentacion_activa']
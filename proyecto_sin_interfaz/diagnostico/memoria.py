@@ -0,0 +1,458 @@
+"""
+Módulo que mide la memoria que retiene cada estructura del sistema y
+atribuye las asignaciones a los módulos del proyecto con tracemalloc.
+
+El perfil tiene dos partes:
+- Carga: se cargan los archivos de datos configurados (inventario,
+  historial, reservas y usuarios) entre dos instantáneas de tracemalloc,
+  y se informan los bytes retenidos por cada estructura (catálogo, cada
+  índice, historial, reservas, cachés) y por cada módulo.
+- Carga simulada: se aplican préstamos, devoluciones, reservas y consultas
+  al azar (con semilla) y se compara la instantánea anterior con la
+  posterior. El crecimiento por módulo y por línea de código permite
+  detectar fugas y medir el efecto de una optimización.
+
+Cada asignación se atribuye al marco más interno de su traza que pertenece
+al proyecto: lo que asigna json al leer el inventario cuenta para el
+módulo que lo leyó. Los bytes de una estructura se calculan recorriendo
+sus objetos; un objeto compartido (p. ej. un Libro que está en el catálogo
+y en un índice) se cuenta una sola vez, en la primera estructura que lo
+alcanza, así que cada índice informa solo lo que agrega al catálogo.
+
+La carga simulada no modifica los archivos de datos: el guardado
+automático se desactiva y nunca se guarda.
+
+Uso (desde el directorio del proyecto):
+    python -m diagnostico.memoria --operaciones 5000 --salida memoria.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from array import array
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, Optional
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+
+DIR_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Objetos que no forman parte de los datos de una estructura: las
+# suscripciones a eventos guardan métodos ligados a otros gestores
+_EXCLUIDOS = (type, ModuleType, FunctionType, MethodType, BuiltinFunctionType)
+
+# Objetos sin referencias a otros objetos
+_ATOMICOS = (str, bytes, bytearray, int, float, complex, bool, type(None), array)
+
+# Módulo al que se atribuyen las asignaciones sin marcos del proyecto
+SIN_MODULO = "<otros>"
+
+
+def tamanio_retenido(objeto: Any, vistos: Optional[set] = None) -> int:
+    """
+    Calcula los bytes que ocupa un objeto y todo lo que alcanza
+    (contenedores, atributos y __slots__).
+
+    Args:
+        objeto: Objeto a medir
+        vistos: Identificadores de objetos ya contados; se actualiza, de modo
+                que al medir varias estructuras con el mismo conjunto cada
+                objeto compartido se cuenta una sola vez
+
+    Returns:
+        Tamaño en bytes
+    """
+    if vistos is None:
+        vistos = set()
+    total = 0
+    pendientes = [objeto]
+    while pendientes:
+        actual = pendientes.pop()
+        if id(actual) in vistos or isinstance(actual, _EXCLUIDOS):
+            continue
+        vistos.add(id(actual))
+        total += sys.getsizeof(actual)
+        if isinstance(actual, _ATOMICOS):
+            continue
+        if isinstance(actual, dict):
+            pendientes.extend(actual.keys())
+            pendientes.extend(actual.values())
+        elif isinstance(actual, (list, tuple, set, frozenset, deque)):
+            pendientes.extend(actual)
+        else:
+            atributos = getattr(actual, "__dict__", None)
+            if atributos is not None:
+                pendientes.append(atributos)
+            for clase in type(actual).__mro__:
+                for nombre in getattr(clase, "__slots__", ()):
+                    if hasattr(actual, nombre):
+                        pendientes.append(getattr(actual, nombre))
+    return total
+
+
+def estructuras_sistema(gestor_prestamos: GestorPrestamos) -> Dict[str, List[Any]]:
+    """
+    Obtiene las estructuras que se miden, en el orden en que se cuentan.
+    El catálogo va primero para que los libros se le atribuyan a él y no
+    a los índices que los referencian.
+
+    Args:
+        gestor_prestamos: Gestor de préstamos con sus gestores asociados
+
+    Returns:
+        Diccionario nombre -> objetos que forman la estructura
+    """
+    gestor_libros = gestor_prestamos.gestor_libros
+    historial = gestor_prestamos.historial
+    estructuras = {
+        "catalogo": [gestor_libros.inventario_general],
+        "catalogo_ordenado": [gestor_libros.inventario_ordenado],
+        "indice_valor": [gestor_libros.indice_valor],
+        "indice_peso": [gestor_libros.indice_peso],
+        "indice_autor": [gestor_libros.indice_autor],
+        "indice_disponibles": [gestor_libros.disponibles],
+        "cache_consultas": [gestor_libros._cache_consultas],
+        "historial": [historial.elementos],
+        "historial_indices": [historial.activos, historial.por_usuario, historial.por_isbn],
+        "reservas": [gestor_prestamos.reservas],
+    }
+    if gestor_prestamos.gestor_usuarios is not None:
+        gestor_usuarios = gestor_prestamos.gestor_usuarios
+        estructuras["usuarios"] = [gestor_usuarios.indice_id, gestor_usuarios.indice_nombre]
+    return estructuras
+
+
+def tamanios_estructuras(gestor_prestamos: GestorPrestamos) -> Dict[str, int]:
+    """
+    Mide los bytes retenidos por cada estructura del sistema.
+
+    Args:
+        gestor_prestamos: Gestor de préstamos con sus gestores asociados
+
+    Returns:
+        Diccionario nombre de la estructura -> bytes retenidos
+    """
+    vistos: set = set()
+    return {nombre: sum(tamanio_retenido(objeto, vistos) for objeto in objetos)
+            for nombre, objetos in estructuras_sistema(gestor_prestamos).items()}
+
+
+def _modulo(nombre_archivo: str) -> Optional[str]:
+    """
+    Convierte la ruta de un archivo del proyecto en el nombre de su módulo.
+
+    Args:
+        nombre_archivo: Ruta del archivo de un marco de la traza
+
+    Returns:
+        Nombre del módulo (p. ej. "funciones_libros.gestor_libros"), o None
+        si el archivo no pertenece al proyecto
+    """
+    # Los marcos de módulos congelados ("<frozen abc>") no tienen archivo
+    if not nombre_archivo.endswith(".py"):
+        return None
+    ruta = os.path.abspath(nombre_archivo)
+    if not ruta.startswith(DIR_PROYECTO + os.sep):
+        return None
+    relativa = os.path.splitext(os.path.relpath(ruta, DIR_PROYECTO))[0]
+    return relativa.replace(os.sep, ".")
+
+
+def _marco_proyecto(traza: tracemalloc.Traceback) -> Optional[tracemalloc.Frame]:
+    """
+    Obtiene el marco más interno de una traza que pertenece al proyecto.
+
+    Args:
+        traza: Traza de una asignación
+
+    Returns:
+        Marco del proyecto, o None si la traza no pasa por el proyecto
+    """
+    marcos = list(traza)
+    # Desde Python 3.7 la traza va del marco más antiguo al más reciente
+    if sys.version_info >= (3, 7):
+        marcos.reverse()
+    for marco in marcos:
+        if _modulo(marco.filename) is not None:
+            return marco
+    return None
+
+
+class PerfilMemoria:
+    """
+    Clase que perfila la memoria de la carga de datos y de una carga simulada.
+
+    Atributos:
+        marcos: Marcos de traza que guarda tracemalloc por asignación
+        limite_lineas: Líneas de código con más crecimiento que se informan
+        carga: Resultado del perfil de la carga de datos
+        carga_simulada: Resultado del perfil de la carga simulada
+    """
+
+    def __init__(self, marcos: int = 10, limite_lineas: int = 10):
+        """
+        Inicializa el perfil.
+
+        Args:
+            marcos: Marcos de traza por asignación (más marcos atribuyen
+                    mejor, pero tracemalloc ocupa más memoria)
+            limite_lineas: Líneas de código con más crecimiento que se informan
+        """
+        self.marcos = marcos
+        self.limite_lineas = limite_lineas
+        self.carga: Dict[str, Any] = {}
+        self.carga_simulada: Dict[str, Any] = {}
+
+    def _instantanea(self) -> tracemalloc.Snapshot:
+        """Toma una instantánea sin las asignaciones de tracemalloc ni del propio perfil."""
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _comparar(self, antes: tracemalloc.Snapshot, despues: tracemalloc.Snapshot) -> Dict[str, Any]:
+        """
+        Compara dos instantáneas y atribuye la diferencia a módulos y líneas.
+
+        Args:
+            antes: Instantánea inicial
+            despues: Instantánea final
+
+        Returns:
+            Diccionario con la diferencia total, por módulo y por línea
+        """
+        por_modulo: Dict[str, int] = {}
+        por_linea: Dict[str, int] = {}
+        total = 0
+        for diferencia in despues.compare_to(antes, "traceback"):
+            if not diferencia.size_diff:
+                continue
+            total += diferencia.size_diff
+            marco = _marco_proyecto(diferencia.traceback)
+            if marco is None:
+                modulo, linea = SIN_MODULO, SIN_MODULO
+            else:
+                modulo = _modulo(marco.filename)
+                linea = f"{modulo}:{marco.lineno}"
+            por_modulo[modulo] = por_modulo.get(modulo, 0) + diferencia.size_diff
+            por_linea[linea] = por_linea.get(linea, 0) + diferencia.size_diff
+        lineas = sorted(por_linea.items(), key=lambda item: -abs(item[1]))[:self.limite_lineas]
+        return {
+            "diferencia_bytes": total,
+            "por_modulo": dict(sorted(por_modulo.items(), key=lambda item: -abs(item[1]))),
+            "lineas": dict(lineas),
+        }
+
+    def cargar(self, archivo_libros: str = "libros.json",
+               archivo_historial: str = "historial_prestamos.json",
+               archivo_reservas: str = "reservas.json",
+               archivo_usuarios: str = "usuarios.json") -> GestorPrestamos:
+        """
+        Carga los archivos de datos midiendo la memoria que retienen.
+        El resultado queda en el atributo carga.
+
+        Args:
+            archivo_libros: Archivo del inventario
+            archivo_historial: Archivo del historial de préstamos
+            archivo_reservas: Archivo de reservas
+            archivo_usuarios: Archivo de usuarios
+
+        Returns:
+            Gestor de préstamos con los datos cargados
+        """
+        iniciado = tracemalloc.is_tracing()
+        if not iniciado:
+            tracemalloc.start(self.marcos)
+        try:
+            antes = self._instantanea()
+            gestor_usuarios = GestorUsuario(archivo_usuarios)
+            gestor_libros = GestorLibros(archivo_libros)
+            gestor_prestamos = GestorPrestamos(gestor_libros, archivo_historial, archivo_reservas,
+                                               gestor_usuarios=gestor_usuarios)
+            despues = self._instantanea()
+        finally:
+            if not iniciado:
+                tracemalloc.stop()
+        self.carga = self._comparar(antes, despues)
+        self.carga["estructuras"] = tamanios_estructuras(gestor_prestamos)
+        return gestor_prestamos
+
+    def simular_carga(self, gestor_prestamos: GestorPrestamos, operaciones: int = 1000,
+                      semilla: int = 42) -> Dict[str, Any]:
+        """
+        Aplica préstamos, devoluciones, reservas y consultas al azar y mide
+        el crecimiento de la memoria. Los archivos de datos no se modifican.
+        El resultado queda en el atributo carga_simulada.
+
+        Args:
+            gestor_prestamos: Gestor de préstamos con los datos cargados
+            operaciones: Número de operaciones a aplicar
+            semilla: Semilla del generador aleatorio
+
+        Returns:
+            Diccionario con la diferencia total, por módulo, por línea y por estructura
+        """
+        gestor_libros = gestor_prestamos.gestor_libros
+        libros = gestor_libros.obtener_inventario_general()
+        aleatorio = random.Random(semilla)
+        usuarios = ([usuario.nombre for usuario in gestor_prestamos.gestor_usuarios.usuarios]
+                    if gestor_prestamos.gestor_usuarios is not None else [])
+        usuarios = usuarios or [f"Usuario {numero}" for numero in range(1, 51)]
+        autores = sorted({libro.autor for libro in libros})
+        almacenes = [gestor_libros, gestor_prestamos.historial, gestor_prestamos.reservas]
+        if gestor_prestamos.gestor_usuarios is not None:
+            almacenes.append(gestor_prestamos.gestor_usuarios)
+        anteriores = [almacen.autoguardado for almacen in almacenes]
+        for almacen in almacenes:
+            almacen.autoguardado = False
+
+        estructuras_antes = tamanios_estructuras(gestor_prestamos)
+        iniciado = tracemalloc.is_tracing()
+        if not iniciado:
+            tracemalloc.start(self.marcos)
+        try:
+            antes = self._instantanea()
+            prestados: List[tuple] = []
+            por_tipo = {"prestar": 0, "devolver": 0, "reservar": 0, "consultar": 0}
+            for _ in range(operaciones if libros else 0):
+                sorteo = aleatorio.random()
+                if sorteo < 0.35:
+                    isbn, usuario = aleatorio.choice(libros).isbn, aleatorio.choice(usuarios)
+                    if gestor_prestamos.prestar_libro(isbn, usuario)[0]:
+                        prestados.append((isbn, usuario))
+                    tipo = "prestar"
+                elif sorteo < 0.65 and prestados:
+                    posicion = aleatorio.randrange(len(prestados))
+                    prestados[posicion], prestados[-1] = prestados[-1], prestados[posicion]
+                    gestor_prestamos.devolver_libro(*prestados.pop())
+                    tipo = "devolver"
+                elif sorteo < 0.8:
+                    gestor_prestamos.reservar_libro(aleatorio.choice(libros).isbn,
+                                                    aleatorio.choice(usuarios))
+                    tipo = "reservar"
+                else:
+                    gestor_libros.buscar_por_titulo_autor(aleatorio.choice(autores))
+                    tipo = "consultar"
+                por_tipo[tipo] += 1
+            despues = self._instantanea()
+        finally:
+            if not iniciado:
+                tracemalloc.stop()
+            for almacen, anterior in zip(almacenes, anteriores):
+                almacen.autoguardado = anterior
+        estructuras_despues = tamanios_estructuras(gestor_prestamos)
+
+        self.carga_simulada = {"operaciones": por_tipo}
+        self.carga_simulada.update(self._comparar(antes, despues))
+        self.carga_simulada["estructuras"] = {
+            nombre: {"antes": estructuras_antes.get(nombre, 0), "despues": tamanio,
+                     "diferencia": tamanio - estructuras_antes.get(nombre, 0)}
+            for nombre, tamanio in estructuras_despues.items()
+        }
+        return self.carga_simulada
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Retorna el resultado del perfil.
+
+        Returns:
+            Diccionario con la carga de datos y la carga simulada
+        """
+        return {"carga": self.carga, "carga_simulada": self.carga_simulada}
+
+    def formatear(self) -> str:
+        """
+        Presenta el resultado del perfil como texto.
+
+        Returns:
+            Reporte con los bytes por estructura, por módulo y por línea
+        """
+        def kib(cantidad: int) -> str:
+            return f"{cantidad / 1024:,.1f} KiB"
+
+        lineas = []
+        if self.carga:
+            lineas.append(f"Carga de datos: {kib(self.carga['diferencia_bytes'])} asignados")
+            lineas.append("\nBytes retenidos por estructura:")
+            for nombre, tamanio in self.carga["estructuras"].items():
+                lineas.append(f"  {nombre:<22}{kib(tamanio):>16}")
+            lineas.append("\nAsignaciones por módulo:")
+            for modulo, tamanio in self.carga["por_modulo"].items():
+                lineas.append(f"  {modulo:<48}{kib(tamanio):>16}")
+        if self.carga_simulada:
+            operaciones = ", ".join(f"{tipo}: {cantidad}"
+                                    for tipo, cantidad in self.carga_simulada["operaciones"].items())
+            lineas.append(f"\nCarga simulada ({operaciones}): "
+                          f"{kib(self.carga_simulada['diferencia_bytes'])} de diferencia")
+            lineas.append("\nDiferencia por estructura:")
+            for nombre, datos in self.carga_simulada["estructuras"].items():
+                lineas.append(f"  {nombre:<22}{kib(datos['antes']):>16}{kib(datos['despues']):>16}"
+                              f"{kib(datos['diferencia']):>16}")
+            lineas.append("\nDiferencia por módulo:")
+            for modulo, tamanio in self.carga_simulada["por_modulo"].items():
+                lineas.append(f"  {modulo:<48}{kib(tamanio):>16}")
+            lineas.append("\nLíneas con más crecimiento:")
+            for linea, tamanio in self.carga_simulada["lineas"].items():
+                lineas.append(f"  {linea:<48}{kib(tamanio):>16}")
+        return "\n".join(lineas)
+
+    def exportar_json(self, archivo: str = "memoria.json") -> str:
+        """
+        Guarda el resultado del perfil en un archivo JSON.
+
+        Args:
+            archivo: Nombre del archivo de destino
+
+        Returns:
+            Ruta completa del archivo generado
+        """
+        ruta_archivo = os.path.join(DIR_PROYECTO, archivo)
+        with open(ruta_archivo, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, indent=4, ensure_ascii=False)
+        return ruta_archivo
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de la línea de comandos.
+
+    Args:
+        argumentos: Argumentos de la línea de comandos (sys.argv si es None)
+
+    Returns:
+        Código de salida (0)
+    """
+    parser = argparse.ArgumentParser(description="Perfil de memoria del Sistema de Gestión de Bibliotecas")
+    parser.add_argument("--libros", default="libros.json", help="Archivo del inventario")
+    parser.add_argument("--historial", default="historial_prestamos.json",
+                        help="Archivo del historial de préstamos")
+    parser.add_argument("--reservas", default="reservas.json", help="Archivo de reservas")
+    parser.add_argument("--usuarios", default="usuarios.json", help="Archivo de usuarios")
+    parser.add_argument("--operaciones", type=int, default=1000,
+                        help="Operaciones de la carga simulada (0 para omitirla)")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla de la carga simulada")
+    parser.add_argument("--marcos", type=int, default=10, help="Marcos de traza por asignación")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args(argumentos)
+
+    perfil = PerfilMemoria(args.marcos)
+    gestor_prestamos = perfil.cargar(args.libros, args.historial, args.reservas, args.usuarios)
+    if args.operaciones > 0:
+        perfil.simular_carga(gestor_prestamos, args.operaciones, args.semilla)
+    print(perfil.formatear())
+    if args.salida:
+        print(f"\nResultado guardado en {perfil.exportar_json(args.salida)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
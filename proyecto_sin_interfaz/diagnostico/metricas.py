@@ -0,0 +1,336 @@
+"""
+Módulo de instrumentación opcional de los métodos críticos del sistema.
+
+Cuando se activa, envuelve los métodos públicos de GestorLibros,
+GestorPrestamos, GestorUsuario, Busqueda, Ordenamiento, Pila y Cola para
+registrar:
+- Número de llamadas y latencias (histograma con percentiles p50/p95/p99)
+- Bytes escritos en cada escritura real de un archivo de datos (el
+  método _escribir de cada almacén, que con un escritor diferido se
+  ejecuta en el hilo escritor, y GestorUsuario.guardar_usuarios)
+- Elementos examinados en cada búsqueda
+
+Cuando está desactivada se restauran los métodos originales, por lo que
+no tiene ningún costo sobre el sistema.
+"""
+
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Histograma:
+    """
+    Histograma con cubetas de tamaño logarítmico.
+
+    Cada cubeta cubre un intervalo un 25 % mayor que la anterior a partir de
+    un valor mínimo (1 microsegundo para latencias), así que los percentiles
+    tienen un error relativo acotado y la memoria usada es constante.
+
+    Atributos:
+        minimo: Límite superior de la primera cubeta
+        cubetas: Número de muestras en cada cubeta
+        total: Número de muestras registradas
+        suma: Suma de todas las muestras
+        maximo: Mayor muestra registrada
+    """
+
+    FACTOR = 1.25
+    NUM_CUBETAS = 96
+
+    def __init__(self, minimo: float = 1e-6):
+        """
+        Inicializa un histograma vacío.
+
+        Args:
+            minimo: Límite superior de la primera cubeta
+        """
+        self.minimo = minimo
+        self.cubetas: List[int] = [0] * self.NUM_CUBETAS
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, valor: float) -> None:
+        """
+        Registra una muestra.
+
+        Args:
+            valor: Valor de la muestra (segundos u otra magnitud positiva)
+        """
+        if valor <= self.minimo:
+            indice = 0
+        else:
+            indice = min(self.NUM_CUBETAS - 1,
+                         int(math.log(valor / self.minimo, self.FACTOR)) + 1)
+        self.cubetas[indice] += 1
+        self.total += 1
+        self.suma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p: float) -> float:
+        """
+        Estima un percentil como el límite superior de la cubeta que lo contiene.
+
+        Args:
+            p: Percentil entre 0 y 100
+
+        Returns:
+            Valor estimado del percentil, o 0 si no hay muestras
+        """
+        if self.total == 0:
+            return 0.0
+        objetivo = math.ceil(self.total * p / 100)
+        acumulado = 0
+        for indice, cantidad in enumerate(self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(self.minimo * self.FACTOR ** indice, self.maximo)
+        return self.maximo
+
+    def resumen(self) -> Dict[str, float]:
+        """
+        Retorna un resumen del histograma.
+
+        Returns:
+            Diccionario con total, promedio, p50, p95, p99 y máximo
+        """
+        return {
+            "total": self.total,
+            "promedio": self.suma / self.total if self.total else 0.0,
+            "p50": self.percentil(50),
+            "p95": self.percentil(95),
+            "p99": self.percentil(99),
+            "maximo": self.maximo,
+        }
+
+
+class RegistroMetricas:
+    """
+    Clase que acumula las métricas de cada método instrumentado.
+
+    Atributos:
+        latencias: Histograma de latencias (segundos) por método
+        bytes_escritos: Histograma de bytes escritos por método de escritura
+        examinados: Histograma de elementos examinados por método de búsqueda
+    """
+
+    def __init__(self):
+        """Inicializa un registro vacío."""
+        self._bloqueo = threading.Lock()
+        self.latencias: Dict[str, Histograma] = {}
+        self.bytes_escritos: Dict[str, Histograma] = {}
+        self.examinados: Dict[str, Histograma] = {}
+
+    def _registrar(self, tabla: Dict[str, Histograma], nombre: str, valor: float,
+                   minimo: float = 1.0) -> None:
+        """Registra un valor en el histograma de un método."""
+        with self._bloqueo:
+            histograma = tabla.get(nombre)
+            if histograma is None:
+                histograma = tabla[nombre] = Histograma(minimo)
+            histograma.registrar(valor)
+
+    def registrar_llamada(self, nombre: str, segundos: float) -> None:
+        """
+        Registra una llamada y su duración.
+
+        Args:
+            nombre: Nombre del método (Clase.metodo)
+            segundos: Duración de la llamada
+        """
+        self._registrar(self.latencias, nombre, segundos, minimo=1e-6)
+
+    def registrar_bytes(self, nombre: str, cantidad: int) -> None:
+        """
+        Registra los bytes escritos por una llamada de guardado.
+
+        Args:
+            nombre: Nombre del método (Clase.metodo)
+            cantidad: Bytes escritos
+        """
+        self._registrar(self.bytes_escritos, nombre, cantidad)
+
+    def registrar_examinados(self, nombre: str, cantidad: int) -> None:
+        """
+        Registra los elementos examinados por una búsqueda.
+
+        Args:
+            nombre: Nombre del método (Clase.metodo)
+            cantidad: Elementos examinados
+        """
+        self._registrar(self.examinados, nombre, cantidad)
+
+    def reiniciar(self) -> None:
+        """Descarta todas las métricas acumuladas."""
+        with self._bloqueo:
+            self.latencias.clear()
+            self.bytes_escritos.clear()
+            self.examinados.clear()
+
+    def resumen(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna el resumen de métricas de cada método.
+
+        Returns:
+            Diccionario por método con llamadas, latencias y, si aplica,
+            bytes escritos y elementos examinados
+        """
+        with self._bloqueo:
+            datos = {}
+            for nombre, histograma in sorted(self.latencias.items()):
+                entrada = {"llamadas": histograma.total, "latencia_s": histograma.resumen()}
+                if nombre in self.bytes_escritos:
+                    bytes_escritos = self.bytes_escritos[nombre]
+                    entrada["bytes_escritos"] = {**bytes_escritos.resumen(),
+                                                 "bytes_totales": int(bytes_escritos.suma)}
+                if nombre in self.examinados:
+                    entrada["examinados"] = self.examinados[nombre].resumen()
+                datos[nombre] = entrada
+            return datos
+
+    def exportar_json(self, archivo: str = "metricas.json") -> str:
+        """
+        Guarda el resumen de métricas en un archivo JSON.
+
+        Args:
+            archivo: Nombre del archivo de destino
+
+        Returns:
+            Ruta completa del archivo generado
+        """
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        ruta_archivo = os.path.join(dir_proyecto, archivo)
+        with open(ruta_archivo, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, indent=4, ensure_ascii=False)
+        return ruta_archivo
+
+
+metricas = RegistroMetricas()
+
+# Métodos que escriben de verdad un archivo de datos. Los guardar_* de los
+# almacenes con escritor diferido solo programan la escritura, así que su
+# latencia y el tamaño del archivo en ese momento no miden la escritura
+METODOS_ESCRITURA = ("_escribir", "guardar_usuarios")
+
+_originales: Dict[type, Dict[str, Callable]] = {}
+_en_curso = threading.local()
+
+
+def _clases_instrumentables() -> List[type]:
+    """Retorna las clases cuyos métodos públicos se instrumentan."""
+    from funciones_libros.gestor_libros import GestorLibros
+    from funciones_prestamo.gestor_prestamos import GestorPrestamos
+    from algoritmos_busqueda.busqueda import Busqueda
+    from algoritmos_ordenamiento.ordenamiento import Ordenamiento
+    from estructuras_datos.pila import Pila
+    from estructuras_datos.cola import Cola
+    from estructuras_datos.planificador_reservas import PlanificadorReservas
+    from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+    return [GestorLibros, GestorPrestamos, Busqueda, Ordenamiento, Pila, Cola, PlanificadorReservas,
+            GestorUsuario]
+
+
+def _tamanio_archivo(objeto: Any) -> Optional[int]:
+    """
+    Obtiene el tamaño del archivo de persistencia de un objeto.
+
+    Args:
+        objeto: Instancia con atributo archivo (GestorLibros, Pila o Cola)
+
+    Returns:
+        Tamaño en bytes, o None si no se puede determinar
+    """
+    archivo = getattr(objeto, "archivo", None)
+    if not archivo:
+        return None
+    dir_actual = os.path.dirname(os.path.abspath(__file__))
+    dir_proyecto = os.path.dirname(dir_actual)
+    try:
+        return os.path.getsize(os.path.join(dir_proyecto, archivo))
+    except OSError:
+        return None
+
+
+def _envolver(nombre: str, metodo: Callable) -> Callable:
+    """
+    Crea la versión instrumentada de un método.
+
+    Args:
+        nombre: Nombre completo del método (Clase.metodo)
+        metodo: Método original
+
+    Returns:
+        Función que mide la llamada y delega en el método original
+    """
+    es_escritura = nombre.split(".")[-1] in METODOS_ESCRITURA
+    es_busqueda = nombre.startswith("Busqueda.")
+
+    @functools.wraps(metodo)
+    def envoltura(objeto, *args, **kwargs):
+        # Las llamadas recursivas (p. ej. merge_sort_por_valor) se miden
+        # una sola vez, en la llamada más externa
+        activos = getattr(_en_curso, "nombres", None)
+        if activos is None:
+            activos = _en_curso.nombres = set()
+        if nombre in activos:
+            return metodo(objeto, *args, **kwargs)
+        activos.add(nombre)
+        inicio = time.perf_counter()
+        try:
+            return metodo(objeto, *args, **kwargs)
+        finally:
+            activos.discard(nombre)
+            metricas.registrar_llamada(nombre, time.perf_counter() - inicio)
+            if es_escritura:
+                tamanio = _tamanio_archivo(objeto)
+                if tamanio is not None:
+                    metricas.registrar_bytes(nombre, tamanio)
+            elif es_busqueda:
+                metricas.registrar_examinados(nombre, getattr(objeto, "examinados", 0))
+
+    return envoltura
+
+
+def activar_instrumentacion() -> None:
+    """
+    Envuelve los métodos públicos de las clases instrumentables y sus
+    métodos de escritura.
+    """
+    if _originales:
+        return
+    for clase in _clases_instrumentables():
+        originales = {}
+        for atributo, valor in list(vars(clase).items()):
+            if not inspect.isfunction(valor):
+                continue
+            if atributo.startswith("_") and atributo not in METODOS_ESCRITURA:
+                continue
+            originales[atributo] = valor
+            setattr(clase, atributo, _envolver(f"{clase.__name__}.{atributo}", valor))
+        _originales[clase] = originales
+
+
+def desactivar_instrumentacion() -> None:
+    """Restaura los métodos originales de las clases instrumentadas."""
+    for clase, originales in _originales.items():
+        for atributo, valor in originales.items():
+            setattr(clase, atributo, valor)
+    _originales.clear()
+
+
+def instrumentacion_activa() -> bool:
+    """
+    Indica si la instrumentación está activa.
+
+    Returns:
+        True si los métodos están envueltos, False en caso contrario
+    """
+    return bool(_originales)
@@ -1,5 +1,10 @@
 from .pila import Pila
 from .cola import Cola
+from .indice_vencimientos import IndiceVencimientos
+from .indice_temporal import IndiceTemporal
+from .planificador_reservas import PlanificadorReservas
+from .eventos import BusEventos, Evento, AgrupadorEventos
+from .sketches import CountMinSketch, ElementosFrecuentes
 
-__all__ = ['Pila', 'Cola']
-
+__all__ = ['Pila', 'Cola', 'IndiceVencimientos', 'IndiceTemporal', 'PlanificadorReservas',
+           'BusEventos', 'Evento', 'AgrupadorEventos', 'CountMinSketch', 'ElementosFrecuentes']
@@ -3,8 +3,10 @@ Módulo que implementa la estructura de datos Cola (FIFO - First In First Out)
 para gestionar la lista de espera de reservas de libros agotados.
 """
 
-import json
-from typing import List, Dict, Any
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional
+from persistencia.serializador import escribir_registros, leer_registros
+from persistencia.escritor_diferido import EscritorDiferido
 
 class Cola:
     """
@@ -12,8 +14,10 @@ class Cola:
     para gestionar la lista de espera de reservas de libros agotados.
     
     Atributos:
-        elementos: Lista que almacena los elementos de la cola
+        elementos: Deque que almacena los elementos de la cola (desencolar es O(1))
         archivo: Nombre del archivo JSON donde se persiste la cola
+        autoguardado: Si es True, cada modificación se guarda inmediatamente en el archivo
+        escritor: Escritor diferido que guarda en segundo plano (None = guardar en el momento)
     """
     
     def __init__(self, archivo: str = "reservas.json"):
@@ -24,7 +28,11 @@ class Cola:
             archivo: Ruta del archivo JSON para persistencia
         """
         self.archivo = archivo
-        self.elementos: List[Dict[str, Any]] = []
+        self.autoguardado = True
+        self.escritor: Optional[EscritorDiferido] = None
+        self.elementos: Deque[Dict[str, Any]] = deque()
+        # Número de reservas pendientes por ISBN, para consultar en O(1)
+        self._reservas_por_isbn: Dict[str, int] = {}
         self.cargar_desde_archivo()
     
     def encolar(self, isbn: str, usuario: str) -> None:
@@ -40,7 +48,8 @@ class Cola:
             "Usuario": usuario
         }
         self.elementos.append(elemento)
-        self.guardar_en_archivo()
+        self._reservas_por_isbn[isbn] = self._reservas_por_isbn.get(isbn, 0) + 1
+        self._guardar_si_corresponde()
     
     def desencolar(self) -> Dict[str, Any]:
         """
@@ -54,8 +63,9 @@ class Cola:
         """
         if self.esta_vacia():
             raise IndexError("La cola está vacía")
-        elemento = self.elementos.pop(0)
-        self.guardar_en_archivo()
+        elemento = self.elementos.popleft()
+        self._descontar_reserva(elemento["ISBN"])
+        self._guardar_si_corresponde()
         return elemento
     
     def frente(self) -> Dict[str, Any]:
@@ -87,6 +97,31 @@ class Cola:
         """
         return len(self.elementos)
     
+    def tiene_reservas(self, isbn: str) -> bool:
+        """
+        Verifica en tiempo constante si hay reservas pendientes para un ISBN.
+        
+        Args:
+            isbn: ISBN del libro
+            
+        Returns:
+            True si hay al menos una reserva para el ISBN, False en caso contrario
+        """
+        return self._reservas_por_isbn.get(isbn, 0) > 0
+    
+    def _descontar_reserva(self, isbn: str) -> None:
+        """
+        Descuenta una reserva del conteo por ISBN.
+        
+        Args:
+            isbn: ISBN de la reserva eliminada
+        """
+        restantes = self._reservas_por_isbn.get(isbn, 0) - 1
+        if restantes > 0:
+            self._reservas_por_isbn[isbn] = restantes
+        else:
+            self._reservas_por_isbn.pop(isbn, None)
+    
     def obtener_reservas_isbn(self, isbn: str) -> List[Dict[str, Any]]:
         """
         Obtiene todas las reservas pendientes para un ISBN específico.
@@ -112,37 +147,67 @@ class Cola:
         """
         for i, elem in enumerate(self.elementos):
             if elem["ISBN"] == isbn and elem["Usuario"] == usuario:
-                self.elementos.pop(i)
-                self.guardar_en_archivo()
+                del self.elementos[i]
+                self._descontar_reserva(isbn)
+                self._guardar_si_corresponde()
                 return True
         return False
     
+    def _guardar_si_corresponde(self) -> None:
+        """
+        Guarda en el archivo si el guardado automático está activo. Con un
+        escritor diferido solo se programa la escritura de una copia de la cola.
+        """
+        if not self.autoguardado:
+            return
+        if self.escritor is None:
+            self._escribir(self.elementos)
+        else:
+            self.escritor.programar(self, self._escribir, list(self.elementos))
+
     def guardar_en_archivo(self) -> None:
-        """Guarda el estado actual de la cola en un archivo JSON."""
+        """
+        Guarda el estado actual de la cola en un archivo JSON. Con un escritor
+        diferido, la escritura reemplaza a la que estuviera pendiente.
+        """
+        if self.escritor is None:
+            self._escribir(self.elementos)
+        else:
+            self.escritor.escribir(self, self._escribir, list(self.elementos))
+
+    def _escribir(self, elementos: List[Dict[str, Any]]) -> bool:
+        """Escribe las reservas en el archivo JSON (True si se escribió)."""
         try:
             import os
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, self.archivo)
-            with open(ruta_archivo, "w", encoding="utf-8") as f:
-                json.dump(self.elementos, f, indent=4, ensure_ascii=False)
+            escribir_registros(ruta_archivo, elementos)
+            return True
         except Exception as e:
             print(f"Error al guardar en archivo: {e}")
+            return False
     
     def cargar_desde_archivo(self) -> None:
         """Carga el estado de la cola desde un archivo JSON si existe."""
+        # Lo pendiente se escribe antes, para no leer un archivo desactualizado
+        if self.escritor is not None:
+            self.escritor.vaciar(self)
         try:
             import os
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, self.archivo)
-            with open(ruta_archivo, "r", encoding="utf-8") as f:
-                self.elementos = json.load(f)
+            self.elementos = deque(leer_registros(ruta_archivo))
         except FileNotFoundError:
-            self.elementos = []
+            self.elementos = deque()
         except Exception as e:
             print(f"Error al cargar desde archivo: {e}")
-            self.elementos = []
+            self.elementos = deque()
+        
+        self._reservas_por_isbn = {}
+        for elem in self.elementos:
+            self._reservas_por_isbn[elem["ISBN"]] = self._reservas_por_isbn.get(elem["ISBN"], 0) + 1
 
@@ -0,0 +1,227 @@
+"""
+Módulo que implementa el bus de eventos de cambio del sistema.
+
+Los gestores emiten un evento tipado por cada cambio (libro agregado,
+disponibilidad modificada, reserva encolada, préstamo registrado, ...) y
+los interesados se suscriben al bus en lugar de volver a leer todos los
+datos. AgrupadorEventos acumula los eventos de un ciclo (p. ej. hasta que
+Tk queda inactivo) y los entrega juntos, descartando los redundantes.
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Inventario
+LIBRO_AGREGADO = "libro_agregado"
+LIBRO_ELIMINADO = "libro_eliminado"
+LIBRO_ACTUALIZADO = "libro_actualizado"
+CATALOGO_RECARGADO = "catalogo_recargado"
+
+# Historial de préstamos
+PRESTAMO_REGISTRADO = "prestamo_registrado"
+PRESTAMO_DEVUELTO = "prestamo_devuelto"
+HISTORIAL_RECARGADO = "historial_recargado"
+
+# Reservas
+RESERVA_ENCOLADA = "reserva_encolada"
+RESERVA_ATENDIDA = "reserva_atendida"
+RESERVA_RETIRADA = "reserva_retirada"
+RESERVAS_RECARGADAS = "reservas_recargadas"
+
+# Almacén al que pertenece cada tipo de evento
+AREA_EVENTO = {
+    LIBRO_AGREGADO: "libros",
+    LIBRO_ELIMINADO: "libros",
+    LIBRO_ACTUALIZADO: "libros",
+    CATALOGO_RECARGADO: "libros",
+    PRESTAMO_REGISTRADO: "historial",
+    PRESTAMO_DEVUELTO: "historial",
+    HISTORIAL_RECARGADO: "historial",
+    RESERVA_ENCOLADA: "reservas",
+    RESERVA_ATENDIDA: "reservas",
+    RESERVA_RETIRADA: "reservas",
+    RESERVAS_RECARGADAS: "reservas",
+}
+
+# Eventos que indican que todo el contenido de un almacén cambió
+RECARGAS = frozenset((CATALOGO_RECARGADO, HISTORIAL_RECARGADO, RESERVAS_RECARGADAS))
+
+
+class Evento:
+    """
+    Clase que representa un cambio ocurrido en los datos.
+
+    Atributos:
+        tipo: Tipo del evento (una de las constantes del módulo)
+        datos: Diccionario con los objetos afectados (libro, reserva o registro)
+    """
+
+    __slots__ = ("tipo", "datos")
+
+    def __init__(self, tipo: str, datos: Dict[str, Any]):
+        """
+        Inicializa un evento.
+
+        Args:
+            tipo: Tipo del evento
+            datos: Objetos afectados por el cambio
+        """
+        self.tipo = tipo
+        self.datos = datos
+
+    def __repr__(self) -> str:
+        """Retorna una representación técnica del evento."""
+        return f"Evento({self.tipo!r}, {self.datos!r})"
+
+
+class BusEventos:
+    """
+    Bus de eventos síncrono: cada evento emitido se entrega de inmediato a
+    los suscriptores interesados en su tipo. Sin suscriptores, emitir solo
+    cuesta una comprobación. Un error en un suscriptor se informa y no se
+    propaga a la operación que emitió el evento (el cambio ya se hizo).
+    """
+
+    def __init__(self):
+        """Inicializa un bus sin suscriptores."""
+        self._suscriptores: List[Tuple[Optional[FrozenSet[str]], Callable[[Evento], None]]] = []
+
+    def suscribir(self, funcion: Callable[[Evento], None],
+                  tipos: Optional[Iterable[str]] = None) -> Callable[[Evento], None]:
+        """
+        Registra una función que recibirá los eventos.
+
+        Args:
+            funcion: Función que recibe cada Evento
+            tipos: Tipos de evento de interés (todos si es None)
+
+        Returns:
+            La misma función, para poder cancelar la suscripción
+        """
+        self._suscriptores.append((frozenset(tipos) if tipos is not None else None, funcion))
+        return funcion
+
+    def cancelar(self, funcion: Callable[[Evento], None]) -> bool:
+        """
+        Elimina una suscripción.
+
+        Args:
+            funcion: Función registrada con suscribir
+
+        Returns:
+            True si se eliminó, False si no estaba suscrita
+        """
+        for posicion, (_, registrada) in enumerate(self._suscriptores):
+            if registrada == funcion:
+                del self._suscriptores[posicion]
+                return True
+        return False
+
+    def emitir(self, tipo: str, **datos: Any) -> None:
+        """
+        Emite un evento a los suscriptores interesados.
+
+        Args:
+            tipo: Tipo del evento
+            **datos: Objetos afectados por el cambio
+        """
+        if not self._suscriptores:
+            return
+        evento = Evento(tipo, datos)
+        for tipos, funcion in list(self._suscriptores):
+            if tipos is None or tipo in tipos:
+                try:
+                    funcion(evento)
+                except Exception as e:
+                    print(f"Error en un suscriptor del evento '{tipo}': {e}")
+
+
+def agrupar_eventos(eventos: List[Evento]) -> List[Evento]:
+    """
+    Elimina los eventos redundantes de una secuencia, conservando el orden:
+    - una recarga de un almacén descarta los eventos anteriores de ese almacén
+    - de las actualizaciones de un mismo libro solo queda la primera (quien
+      las recibe lee el estado actual del libro), y ninguna si el libro se
+      agregó en la misma secuencia
+    - una reserva encolada y retirada en la misma secuencia se descarta
+
+    Args:
+        eventos: Eventos en el orden en que se emitieron
+
+    Returns:
+        Lista de eventos sin redundancias
+    """
+    resultado: List[Optional[Evento]] = []
+    libros_vistos = set()
+    encoladas: Dict[int, int] = {}
+    for evento in eventos:
+        tipo = evento.tipo
+        if tipo in RECARGAS:
+            area = AREA_EVENTO[tipo]
+            resultado = [previo for previo in resultado
+                         if previo is not None and AREA_EVENTO.get(previo.tipo) != area]
+            if area == "libros":
+                libros_vistos = set()
+            # Las posiciones cambian al filtrar, así que se recalculan
+            encoladas = {id(previo.datos["reserva"]): posicion
+                         for posicion, previo in enumerate(resultado)
+                         if previo.tipo == RESERVA_ENCOLADA}
+        elif tipo in (LIBRO_AGREGADO, LIBRO_ACTUALIZADO):
+            clave = id(evento.datos["libro"])
+            if tipo == LIBRO_ACTUALIZADO and clave in libros_vistos:
+                continue
+            libros_vistos.add(clave)
+        elif tipo == RESERVA_ENCOLADA:
+            encoladas[id(evento.datos["reserva"])] = len(resultado)
+        elif tipo in (RESERVA_ATENDIDA, RESERVA_RETIRADA):
+            posicion = encoladas.pop(id(evento.datos["reserva"]), None)
+            if posicion is not None:
+                resultado[posicion] = None
+                continue
+        resultado.append(evento)
+    return [evento for evento in resultado if evento is not None]
+
+
+class AgrupadorEventos:
+    """
+    Acumula eventos y los entrega agrupados una vez por ciclo.
+
+    Atributos:
+        programar: Función que programa una llamada diferida (p. ej. root.after_idle)
+        entregar: Función que recibe la lista de eventos agrupados
+    """
+
+    def __init__(self, programar: Callable[[Callable[[], None]], Any],
+                 entregar: Callable[[List[Evento]], None]):
+        """
+        Inicializa el agrupador.
+
+        Args:
+            programar: Función que programa una llamada diferida
+            entregar: Función que recibe la lista de eventos agrupados
+        """
+        self.programar = programar
+        self.entregar = entregar
+        self._pendientes: List[Evento] = []
+        self._programado = False
+
+    def recibir(self, evento: Evento) -> None:
+        """
+        Guarda un evento y programa la entrega si aún no estaba programada.
+        Se usa como suscriptor de un BusEventos.
+
+        Args:
+            evento: Evento recibido
+        """
+        self._pendientes.append(evento)
+        if not self._programado:
+            self._programado = True
+            self.programar(self.vaciar)
+
+    def vaciar(self) -> None:
+        """Entrega los eventos pendientes agrupados."""
+        eventos = self._pendientes
+        self._pendientes = []
+        self._programado = False
+        agrupados = agrupar_eventos(eventos)
+        if agrupados:
+            self.entregar(agrupados)
@@ -0,0 +1,94 @@
+"""
+Módulo que implementa un índice de préstamos por clave (usuario o ISBN)
+ordenado por fecha, para consultar los préstamos de un rango de fechas sin
+recorrer ni convertir las fechas de todo el historial.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IndiceTemporal:
+    """
+    Índice de registros agrupados por clave, cada grupo ordenado por fecha.
+
+    Cada clave tiene dos listas paralelas: las marcas de tiempo (números,
+    ordenadas) y los registros, de modo que un rango de fechas se resuelve
+    con búsqueda binaria en O(log n + k), donde k es el número de resultados.
+
+    Atributos:
+        listas: Diccionario clave -> (marcas de tiempo, registros)
+    """
+
+    def __init__(self):
+        """Inicializa un índice vacío."""
+        self.listas: Dict[str, Tuple[List[float], List[Dict[str, Any]]]] = {}
+
+    def agregar(self, clave: str, marca: float, registro: Dict[str, Any]) -> None:
+        """
+        Agrega un registro al índice. Si llega en orden cronológico (el caso
+        habitual) se agrega al final en O(1).
+
+        Args:
+            clave: Usuario o ISBN del registro
+            marca: Marca de tiempo (segundos) del registro
+            registro: Registro del préstamo
+        """
+        marcas, registros = self.listas.setdefault(clave, ([], []))
+        if not marcas or marcas[-1] <= marca:
+            marcas.append(marca)
+            registros.append(registro)
+        else:
+            posicion = bisect_right(marcas, marca)
+            marcas.insert(posicion, marca)
+            registros.insert(posicion, registro)
+
+    def eliminar(self, clave: str, marca: float, registro: Dict[str, Any]) -> bool:
+        """
+        Retira un registro concreto del índice.
+
+        Args:
+            clave: Usuario o ISBN del registro
+            marca: Marca de tiempo con la que se agregó
+            registro: Registro a retirar
+
+        Returns:
+            True si se retiró, False si no estaba en el índice
+        """
+        lista = self.listas.get(clave)
+        if lista is None:
+            return False
+        marcas, registros = lista
+        for posicion in range(bisect_left(marcas, marca), bisect_right(marcas, marca)):
+            if registros[posicion] is registro:
+                del marcas[posicion]
+                del registros[posicion]
+                if not marcas:
+                    del self.listas[clave]
+                return True
+        return False
+
+    def en_rango(self, clave: str, desde: Optional[float] = None,
+                 hasta: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros de una clave entre dos fechas (inclusive).
+
+        Args:
+            clave: Usuario o ISBN
+            desde: Marca de tiempo inicial (None = sin límite)
+            hasta: Marca de tiempo final (None = sin límite)
+
+        Returns:
+            Lista de registros en orden cronológico
+        """
+        lista = self.listas.get(clave)
+        if lista is None:
+            return []
+        marcas, registros = lista
+        inicio = bisect_left(marcas, desde) if desde is not None else 0
+        fin = bisect_right(marcas, hasta) if hasta is not None else len(marcas)
+        return registros[inicio:fin]
+
+    def limpiar(self) -> None:
+        """Elimina todos los registros del índice."""
+        self.listas = {}
@@ -0,0 +1,131 @@
+"""
+Módulo que implementa un índice de préstamos activos ordenado por fecha de
+vencimiento, para consultar préstamos vencidos o próximos a vencer sin
+recorrer todo el historial.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+# Vencimiento de los préstamos del formato anterior, que no tienen fecha
+# límite: se pueden cerrar, pero nunca aparecen como vencidos
+SIN_VENCIMIENTO = float("inf")
+
+
+class IndiceVencimientos:
+    """
+    Índice de préstamos activos ordenado por fecha de vencimiento.
+
+    Las claves (vencimiento, secuencia) se mantienen en una lista ordenada,
+    de modo que las consultas por rango de fechas se resuelven con búsqueda
+    binaria en O(log n + k), donde k es el número de resultados.
+
+    Al cerrar un préstamo su clave no se borra de la lista (sería O(n)): se
+    retira del diccionario de préstamos y las consultas la saltan. La lista
+    se depura de una vez cuando las claves cerradas superan a las activas.
+
+    Atributos:
+        claves: Lista ordenada de tuplas (vencimiento, secuencia), incluidas
+                las de préstamos ya cerrados pendientes de depurar
+        prestamos: Diccionario secuencia -> registro del préstamo
+        abiertos: Diccionario (ISBN, usuario) -> claves de sus préstamos activos
+    """
+
+    def __init__(self):
+        """Inicializa un índice vacío."""
+        self.claves: List[Tuple[float, int]] = []
+        self.prestamos: Dict[int, Dict[str, Any]] = {}
+        self.abiertos: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        self._secuencia = 0
+        self._cerradas = 0
+
+    def agregar(self, prestamo: Dict[str, Any], vencimiento: float) -> None:
+        """
+        Agrega un préstamo activo al índice.
+
+        Args:
+            prestamo: Registro del préstamo (con ISBN y Usuario)
+            vencimiento: Marca de tiempo (segundos) del vencimiento
+        """
+        self._secuencia += 1
+        secuencia = self._secuencia
+        insort(self.claves, (vencimiento, secuencia))
+        self.prestamos[secuencia] = prestamo
+        self.abiertos.setdefault((prestamo["ISBN"], prestamo["Usuario"]), []).append(
+            (vencimiento, secuencia))
+
+    def cerrar(self, isbn: str, usuario: str,
+               prestamo: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retira del índice un préstamo activo de un libro y usuario.
+
+        Args:
+            isbn: ISBN del libro devuelto
+            usuario: Nombre del usuario que lo devuelve
+            prestamo: Registro concreto a retirar; si es None se retira el
+                      préstamo activo más antiguo
+
+        Returns:
+            Registro del préstamo cerrado, o None si no había préstamo activo
+        """
+        pendientes = self.abiertos.get((isbn, usuario))
+        if not pendientes:
+            return None
+        posicion = 0
+        if prestamo is not None:
+            for i, (_, secuencia) in enumerate(pendientes):
+                if self.prestamos[secuencia] is prestamo:
+                    posicion = i
+                    break
+            else:
+                return None
+        clave = pendientes.pop(posicion)
+        if not pendientes:
+            del self.abiertos[(isbn, usuario)]
+        cerrado = self.prestamos.pop(clave[1])
+        self._cerradas += 1
+        if self._cerradas > len(self.prestamos):
+            self._depurar()
+        return cerrado
+
+    def _depurar(self) -> None:
+        """Elimina de la lista ordenada las claves de préstamos cerrados."""
+        self.claves = [clave for clave in self.claves if clave[1] in self.prestamos]
+        self._cerradas = 0
+
+    def _activos(self, claves: List[Tuple[float, int]]) -> List[Dict[str, Any]]:
+        """Obtiene los préstamos de unas claves, saltando los ya cerrados."""
+        return [self.prestamos[secuencia] for _, secuencia in claves
+                if secuencia in self.prestamos]
+
+    def vencidos(self, ahora: float) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos activos cuyo vencimiento es anterior a un instante.
+
+        Args:
+            ahora: Marca de tiempo de referencia
+
+        Returns:
+            Lista de préstamos vencidos, del más antiguo al más reciente
+        """
+        fin = bisect_left(self.claves, (ahora, 0))
+        return self._activos(self.claves[:fin])
+
+    def en_rango(self, desde: float, hasta: float) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos activos que vencen en el intervalo [desde, hasta].
+
+        Args:
+            desde: Marca de tiempo inicial
+            hasta: Marca de tiempo final
+
+        Returns:
+            Lista de préstamos ordenada por vencimiento
+        """
+        inicio = bisect_left(self.claves, (desde, 0))
+        fin = bisect_right(self.claves, (hasta, self._secuencia))
+        return self._activos(self.claves[inicio:fin])
+
+    def __len__(self) -> int:
+        """Retorna el número de préstamos activos indexados."""
+        return len(self.prestamos)
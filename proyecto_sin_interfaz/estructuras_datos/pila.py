@@ -3,18 +3,74 @@ Módulo que implementa la estructura de datos Pila (LIFO - Last In First Out)
 para gestionar el historial de préstamos por usuario.
 """
 
-import json
+import heapq
+import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from .eventos import BusEventos, PRESTAMO_REGISTRADO, PRESTAMO_DEVUELTO, HISTORIAL_RECARGADO
+from .indice_vencimientos import IndiceVencimientos, SIN_VENCIMIENTO
+from .indice_temporal import IndiceTemporal
+from persistencia.serializador import escribir_registros, leer_registros
+from persistencia.archivo_historial import ArchivoHistorial
+from persistencia.escritor_diferido import EscritorDiferido
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+def marca_tiempo(fecha: str) -> float:
+    """
+    Convierte una fecha con formato FORMATO_FECHA a marca de tiempo.
+    Evita strptime, que es mucho más lento, porque el formato es fijo.
+    
+    Args:
+        fecha: Fecha en formato "AAAA-MM-DD HH:MM:SS"
+        
+    Returns:
+        Marca de tiempo en segundos
+    """
+    return datetime(int(fecha[0:4]), int(fecha[5:7]), int(fecha[8:10]),
+                    int(fecha[11:13]), int(fecha[14:16]), int(fecha[17:19])).timestamp()
+
+def _mezclar_por_fecha(archivados: List[Dict[str, Any]],
+                       recientes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mezcla dos listas de préstamos ya ordenadas por fecha. Los préstamos
+    activos nunca se archivan, así que un préstamo antiguo aún activo en
+    memoria puede ser anterior a préstamos archivados.
+    
+    Args:
+        archivados: Préstamos archivados en orden cronológico
+        recientes: Préstamos en memoria en orden cronológico
+        
+    Returns:
+        Lista de préstamos en orden cronológico (en un empate, primero los archivados)
+    """
+    if not archivados:
+        return recientes
+    if not recientes:
+        return archivados
+    return list(heapq.merge(archivados, recientes,
+                            key=lambda elem: marca_tiempo(elem["Fecha"])))
 
 class Pila:
     """
     Implementación de una estructura de datos Pila (LIFO - Last In First Out)
     para gestionar el historial de préstamos por usuario.
     
+    Solo los préstamos recientes o activos se mantienen en memoria; compactar
+    mueve los préstamos cerrados antiguos a segmentos comprimidos por mes.
+    La fecha de cada préstamo se convierte a marca de tiempo una sola vez, al
+    indexarlo por usuario y por ISBN, para las consultas por rango de fechas.
+    
     Atributos:
         elementos: Lista que almacena los elementos de la pila
+        activos: Índice de préstamos activos ordenado por fecha de vencimiento
+        por_usuario: Índice de préstamos por usuario ordenado por fecha
+        por_isbn: Índice de préstamos por ISBN ordenado por fecha
+        archivo_historico: Segmentos archivados del historial
+        eventos: Bus donde se emiten los préstamos registrados y devueltos
         archivo: Nombre del archivo JSON donde se persiste la pila
+        autoguardado: Si es True, cada modificación se guarda inmediatamente en el archivo
+        escritor: Escritor diferido que guarda en segundo plano (None = guardar en el momento)
     """
     
     def __init__(self, archivo: str = "historial_prestamos.json"):
@@ -25,10 +81,18 @@ class Pila:
             archivo: Ruta del archivo JSON para persistencia
         """
         self.archivo = archivo
+        self.autoguardado = True
+        self.escritor: Optional[EscritorDiferido] = None
+        self.eventos = BusEventos()
         self.elementos: List[Dict[str, Any]] = []
+        self.activos = IndiceVencimientos()
+        self.por_usuario = IndiceTemporal()
+        self.por_isbn = IndiceTemporal()
+        self.archivo_historico = ArchivoHistorial(os.path.splitext(archivo)[0] + "_archivo")
         self.cargar_desde_archivo()
     
-    def apilar(self, isbn: str, fecha_prestamo: str, usuario: str) -> None:
+    def apilar(self, isbn: str, fecha_prestamo: str, usuario: str,
+               fecha_vencimiento: Optional[str] = None) -> None:
         """
         Agrega un elemento a la cima de la pila.
         
@@ -36,14 +100,70 @@ class Pila:
             isbn: ISBN del libro prestado
             fecha_prestamo: Fecha del préstamo en formato string
             usuario: Nombre del usuario que realiza el préstamo
+            fecha_vencimiento: Fecha límite de devolución en formato string (opcional)
         """
         elemento = {
             "ISBN": isbn,
             "Fecha": fecha_prestamo,
             "Usuario": usuario
         }
+        if fecha_vencimiento is not None:
+            elemento["Vence"] = fecha_vencimiento
+            elemento["Devuelto"] = None
+        self.agregar_registro(elemento)
+        self._guardar_si_corresponde()
+    
+    def agregar_registro(self, elemento: Dict[str, Any]) -> None:
+        """
+        Agrega un registro de préstamo ya construido a la cima de la pila
+        (p. ej. uno recibido de otro proceso), sin guardar el archivo.
+        
+        Args:
+            elemento: Diccionario del préstamo
+        """
+        self._indexar(elemento)
         self.elementos.append(elemento)
-        self.guardar_en_archivo()
+        self.eventos.emitir(PRESTAMO_REGISTRADO, registro=elemento)
+    
+    def _indexar(self, elemento: Dict[str, Any]) -> None:
+        """
+        Agrega un préstamo a los índices por fecha y, si está activo, al de
+        vencimientos. Un préstamo sin devolución registrada está activo; los
+        del formato anterior (sin "Vence" ni "Devuelto") se indexan sin
+        fecha de vencimiento.
+        """
+        marca = marca_tiempo(elemento["Fecha"])
+        self.por_usuario.agregar(elemento["Usuario"], marca, elemento)
+        self.por_isbn.agregar(elemento["ISBN"], marca, elemento)
+        if elemento.get("Devuelto") is None:
+            vence = elemento.get("Vence")
+            self.activos.agregar(elemento, marca_tiempo(vence) if vence else SIN_VENCIMIENTO)
+    
+    def _desindexar(self, elemento: Dict[str, Any]) -> None:
+        """Retira un préstamo de los índices por fecha."""
+        marca = marca_tiempo(elemento["Fecha"])
+        self.por_usuario.eliminar(elemento["Usuario"], marca, elemento)
+        self.por_isbn.eliminar(elemento["ISBN"], marca, elemento)
+    
+    def marcar_devuelto(self, isbn: str, usuario: str, fecha_devolucion: str) -> Optional[Dict[str, Any]]:
+        """
+        Marca como devuelto el préstamo activo más antiguo de un libro y usuario.
+        
+        Args:
+            isbn: ISBN del libro devuelto
+            usuario: Nombre del usuario que lo devuelve
+            fecha_devolucion: Fecha de la devolución en formato string
+            
+        Returns:
+            Diccionario con el préstamo cerrado, o None si no había préstamo activo
+        """
+        elemento = self.activos.cerrar(isbn, usuario)
+        if elemento is None:
+            return None
+        elemento["Devuelto"] = fecha_devolucion
+        self.eventos.emitir(PRESTAMO_DEVUELTO, registro=elemento)
+        self._guardar_si_corresponde()
+        return elemento
     
     def desapilar(self) -> Dict[str, Any]:
         """
@@ -58,7 +178,11 @@ class Pila:
         if self.esta_vacia():
             raise IndexError("La pila está vacía")
         elemento = self.elementos.pop()
-        self.guardar_en_archivo()
+        self._desindexar(elemento)
+        if elemento.get("Devuelto") is None:
+            self.activos.cerrar(elemento["ISBN"], elemento["Usuario"], elemento)
+        self.eventos.emitir(HISTORIAL_RECARGADO)
+        self._guardar_si_corresponde()
         return elemento
     
     def cima(self) -> Dict[str, Any]:
@@ -90,44 +214,173 @@ class Pila:
         """
         return len(self.elementos)
     
-    def obtener_historial_usuario(self, usuario: str) -> List[Dict[str, Any]]:
+    def obtener_historial_usuario(self, usuario: str, desde: Optional[str] = None,
+                                  incluir_archivo: bool = False) -> List[Dict[str, Any]]:
         """
-        Obtiene el historial completo de préstamos de un usuario específico.
+        Obtiene el historial de préstamos de un usuario específico.
+        Los segmentos archivados solo se consultan si se piden expresamente o
+        si la fecha inicial es anterior al último préstamo archivado.
         
         Args:
             usuario: Nombre del usuario
+            desde: Si se indica, solo préstamos con fecha igual o posterior
+            incluir_archivo: Si es True, incluye siempre los préstamos archivados
             
         Returns:
-            Lista de diccionarios con los préstamos del usuario
+            Lista de diccionarios con los préstamos del usuario, en orden cronológico
         """
-        return [elem for elem in self.elementos if elem["Usuario"] == usuario]
+        recientes = self.por_usuario.en_rango(usuario, marca_tiempo(desde) if desde else None)
+        hasta_archivo = self.archivo_historico.hasta
+        if hasta_archivo is None:
+            return recientes
+        if incluir_archivo or (desde is not None and desde <= hasta_archivo):
+            return _mezclar_por_fecha(self.archivo_historico.historial_usuario(usuario, desde), recientes)
+        return recientes
     
+    def historial_rango(self, usuario: Optional[str] = None, isbn: Optional[str] = None,
+                        desde: Optional[str] = None, hasta: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos de un usuario o de un ISBN entre dos fechas
+        con búsqueda binaria sobre los índices por fecha, en O(log n + k).
+        Los segmentos archivados se consultan solo si el rango empieza antes
+        del último préstamo archivado.
+        
+        Args:
+            usuario: Nombre del usuario
+            isbn: ISBN del libro (si se indican ambos, préstamos de ese libro a ese usuario)
+            desde: Fecha inicial en formato FORMATO_FECHA (None = sin límite)
+            hasta: Fecha final, inclusive (None = sin límite)
+            
+        Returns:
+            Lista de diccionarios con los préstamos, en orden cronológico
+            
+        Raises:
+            ValueError: Si no se indica usuario ni ISBN
+        """
+        desde_marca = marca_tiempo(desde) if desde else None
+        hasta_marca = marca_tiempo(hasta) if hasta else None
+        if usuario is not None:
+            recientes = self.por_usuario.en_rango(usuario, desde_marca, hasta_marca)
+            if isbn is not None:
+                recientes = [elem for elem in recientes if elem["ISBN"] == isbn]
+        elif isbn is not None:
+            recientes = self.por_isbn.en_rango(isbn, desde_marca, hasta_marca)
+        else:
+            raise ValueError("Se debe indicar un usuario o un ISBN")
+        
+        hasta_archivo = self.archivo_historico.hasta
+        if hasta_archivo is None or (desde is not None and desde > hasta_archivo):
+            return recientes
+        return _mezclar_por_fecha(self.archivo_historico.registros_en_rango(desde, hasta, usuario, isbn),
+                                  recientes)
+    
+    def compactar(self, antes_de: str) -> int:
+        """
+        Mueve al archivo histórico los préstamos cerrados anteriores a una fecha.
+        Los préstamos activos se mantienen siempre en memoria, sin importar
+        su antigüedad, incluidos los del formato anterior (sin fecha de
+        vencimiento) que no tienen devolución registrada.
+        
+        Args:
+            antes_de: Fecha de corte en formato FORMATO_FECHA
+            
+        Returns:
+            Número de préstamos archivados
+        """
+        archivables = []
+        recientes = []
+        for elem in self.elementos:
+            cerrado = elem.get("Devuelto") is not None
+            if cerrado and elem["Fecha"] < antes_de:
+                archivables.append(elem)
+            else:
+                recientes.append(elem)
+        if not archivables:
+            return 0
+        
+        # Primero se escriben los segmentos y luego el archivo principal: si
+        # el proceso se interrumpe entre ambos, un préstamo puede quedar
+        # duplicado en el archivo, pero nunca se pierde
+        try:
+            self.archivo_historico.archivar(archivables)
+        except Exception as e:
+            print(f"Error al archivar el historial: {e}")
+            return 0
+        self.elementos = recientes
+        for elem in archivables:
+            self._desindexar(elem)
+        self.guardar_en_archivo()
+        # archivados indica que los préstamos solo cambiaron de lugar
+        self.eventos.emitir(HISTORIAL_RECARGADO, archivados=len(archivables))
+        return len(archivables)
+    
+    def _guardar_si_corresponde(self) -> None:
+        """
+        Guarda en el archivo si el guardado automático está activo. Con un
+        escritor diferido solo se programa la escritura de una copia de la pila.
+        """
+        if not self.autoguardado:
+            return
+        if self.escritor is None:
+            self._escribir(self.elementos)
+        else:
+            self.escritor.programar(self, self._escribir, self._instantanea())
+
     def guardar_en_archivo(self) -> None:
-        """Guarda el estado actual de la pila en un archivo JSON."""
+        """
+        Guarda el estado actual de la pila en un archivo JSON. Con un escritor
+        diferido, la escritura reemplaza a la que estuviera pendiente.
+        """
+        if self.escritor is None:
+            self._escribir(self.elementos)
+        else:
+            self.escritor.escribir(self, self._escribir, self._instantanea())
+
+    def _instantanea(self) -> List[Dict[str, Any]]:
+        """
+        Copia los préstamos para el escritor diferido: marcar_devuelto
+        modifica los registros en memoria mientras el escritor los serializa.
+        """
+        return [dict(elem) for elem in self.elementos]
+
+    def _escribir(self, elementos: List[Dict[str, Any]]) -> bool:
+        """Escribe los préstamos en el archivo JSON (True si se escribió)."""
         try:
             import os
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, self.archivo)
-            with open(ruta_archivo, "w", encoding="utf-8") as f:
-                json.dump(self.elementos, f, indent=4, ensure_ascii=False)
+            escribir_registros(ruta_archivo, elementos)
+            return True
         except Exception as e:
             print(f"Error al guardar en archivo: {e}")
+            return False
     
     def cargar_desde_archivo(self) -> None:
         """Carga el estado de la pila desde un archivo JSON si existe."""
+        # Lo pendiente se escribe antes, para no leer un archivo desactualizado
+        if self.escritor is not None:
+            self.escritor.vaciar(self)
         try:
             import os
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, self.archivo)
-            with open(ruta_archivo, "r", encoding="utf-8") as f:
-                self.elementos = json.load(f)
+            self.elementos = list(leer_registros(ruta_archivo))
         except FileNotFoundError:
             self.elementos = []
         except Exception as e:
             print(f"Error al cargar desde archivo: {e}")
             self.elementos = []
+        
+        # Reconstruir los índices; en el de vencimientos solo entran los
+        # préstamos que siguen activos (no los registros antiguos sin vencimiento)
+        self.activos = IndiceVencimientos()
+        self.por_usuario.limpiar()
+        self.por_isbn.limpiar()
+        for elem in self.elementos:
+            self._indexar(elem)
+        self.eventos.emitir(HISTORIAL_RECARGADO)
 
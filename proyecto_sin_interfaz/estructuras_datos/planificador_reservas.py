@@ -0,0 +1,335 @@
+"""
+Módulo que implementa el planificador de reservas: una cola de espera con
+prioridades por ISBN y vencimiento de las reservas.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from .cola import Cola
+from .eventos import (BusEventos, RESERVA_ENCOLADA, RESERVA_ATENDIDA, RESERVA_RETIRADA,
+                      RESERVAS_RECARGADAS)
+from .pila import FORMATO_FECHA, marca_tiempo
+
+PRIORIDAD_PERSONAL = 0
+PRIORIDAD_ACCESIBILIDAD = 1
+PRIORIDAD_GENERAL = 2
+
+NOMBRES_PRIORIDAD = {
+    PRIORIDAD_PERSONAL: "Personal",
+    PRIORIDAD_ACCESIBILIDAD: "Accesibilidad",
+    PRIORIDAD_GENERAL: "General",
+}
+
+
+class PlanificadorReservas(Cola):
+    """
+    Cola de reservas con prioridades y vencimiento.
+
+    Cada ISBN tiene su propio montículo ordenado por (prioridad, llegada),
+    de modo que el siguiente usuario en espera se obtiene en O(log n).
+    Un montículo adicional ordenado por fecha de expiración permite eliminar
+    las reservas vencidas en tiempo proporcional a las que expiraron.
+    Las reservas atendidas o eliminadas se descartan de los montículos de
+    forma perezosa al llegar a la cima.
+
+    Atributos:
+        horas_vigencia: Horas que permanece activa una reserva (None = sin vencimiento)
+        reservas: Diccionario identificador -> reserva activa, en orden de llegada
+        eventos: Bus donde se emiten las reservas encoladas, atendidas y retiradas
+    """
+
+    def __init__(self, archivo: str = "reservas.json", horas_vigencia: Optional[float] = 72):
+        """
+        Inicializa el planificador y carga las reservas desde archivo si existe.
+
+        Args:
+            archivo: Ruta del archivo JSON para persistencia
+            horas_vigencia: Horas que permanece activa una reserva (None = sin vencimiento)
+        """
+        self.horas_vigencia = horas_vigencia
+        self.eventos = BusEventos()
+        self.reservas: Dict[int, Dict[str, Any]] = {}
+        self._colas: Dict[str, List[Tuple[int, float, int]]] = {}
+        self._expiraciones: List[Tuple[float, int]] = []
+        self._siguiente_id = 0
+        # Lista de reservas en orden de llegada; se reconstruye solo tras un cambio
+        self._lista: Optional[List[Dict[str, Any]]] = None
+        super().__init__(archivo)
+
+    @property
+    def elementos(self) -> List[Dict[str, Any]]:
+        """Lista de reservas activas en orden de llegada (solo lectura)."""
+        if self._lista is None:
+            self._lista = list(self.reservas.values())
+        return self._lista
+
+    @elementos.setter
+    def elementos(self, elementos: List[Dict[str, Any]]) -> None:
+        """Reemplaza las reservas activas y reconstruye los índices."""
+        self.reservas = {}
+        self._lista = None
+        self._colas = {}
+        self._expiraciones = []
+        self._reservas_por_isbn = {}
+        for posicion, elemento in enumerate(elementos):
+            # Las reservas sin fecha de llegada (formato anterior) conservan
+            # su orden FIFO y quedan antes que cualquier reserva nueva
+            self._indexar_registro(elemento, float(posicion))
+        self.eventos.emitir(RESERVAS_RECARGADAS)
+    
+    def _indexar_registro(self, elemento: Dict[str, Any], llegada_predeterminada: float) -> None:
+        """Indexa una reserva ya construida a partir de sus fechas en texto."""
+        llegada = elemento.get("Llegada")
+        llegada_ts = marca_tiempo(llegada) if llegada else llegada_predeterminada
+        expira = elemento.get("Expira")
+        expira_ts = marca_tiempo(expira) if expira else None
+        self._indexar(elemento, llegada_ts, expira_ts)
+    
+    def agregar_registro(self, elemento: Dict[str, Any]) -> None:
+        """
+        Agrega una reserva ya construida (p. ej. recibida de otro proceso),
+        sin guardar el archivo.
+        
+        Args:
+            elemento: Diccionario de la reserva
+        """
+        self._indexar_registro(elemento, 0.0)
+        self.eventos.emitir(RESERVA_ENCOLADA, reserva=elemento)
+    
+    def retirar_registro(self, elemento: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Retira la reserva activa que coincide con un registro (mismo ISBN,
+        usuario, prioridad y fecha de llegada), sin guardar el archivo. Si
+        hay varias iguales se retira la más antigua, igual que en
+        siguiente_reserva.
+        
+        Args:
+            elemento: Diccionario de la reserva
+            
+        Returns:
+            Reserva retirada, o None si no se encontró
+        """
+        clave = (elemento["Usuario"], elemento.get("Prioridad"), elemento.get("Llegada"))
+        coincidencias = []
+        for _, _, identificador in self._colas.get(elemento["ISBN"], []):
+            reserva = self.reservas.get(identificador)
+            if (reserva is not None and
+                    (reserva["Usuario"], reserva.get("Prioridad"), reserva.get("Llegada")) == clave):
+                coincidencias.append(identificador)
+        if not coincidencias:
+            return None
+        return self._retirar(min(coincidencias))
+
+    def _indexar(self, elemento: Dict[str, Any], llegada_ts: float, expira_ts: Optional[float]) -> None:
+        """
+        Registra una reserva en los índices del planificador.
+
+        Args:
+            elemento: Reserva a registrar
+            llegada_ts: Marca de tiempo de llegada
+            expira_ts: Marca de tiempo de expiración (None = sin vencimiento)
+        """
+        self._siguiente_id += 1
+        identificador = self._siguiente_id
+        isbn = elemento["ISBN"]
+        self.reservas[identificador] = elemento
+        self._lista = None
+        heapq.heappush(self._colas.setdefault(isbn, []),
+                       (elemento.get("Prioridad", PRIORIDAD_GENERAL), llegada_ts, identificador))
+        if expira_ts is not None:
+            heapq.heappush(self._expiraciones, (expira_ts, identificador))
+        self._reservas_por_isbn[isbn] = self._reservas_por_isbn.get(isbn, 0) + 1
+
+    def _retirar(self, identificador: int, tipo: str = RESERVA_RETIRADA) -> Dict[str, Any]:
+        """
+        Marca una reserva como atendida o eliminada.
+
+        Args:
+            identificador: Identificador de la reserva
+            tipo: Evento a emitir (RESERVA_ATENDIDA o RESERVA_RETIRADA)
+
+        Returns:
+            Reserva retirada
+        """
+        elemento = self.reservas.pop(identificador)
+        self._lista = None
+        self._descontar_reserva(elemento["ISBN"])
+        if not self._reservas_por_isbn.get(elemento["ISBN"]):
+            self._colas.pop(elemento["ISBN"], None)
+        self.eventos.emitir(tipo, reserva=elemento)
+        return elemento
+
+    def encolar(self, isbn: str, usuario: str, prioridad: int = PRIORIDAD_GENERAL,
+                ahora: Optional[datetime] = None) -> None:
+        """
+        Agrega una reserva a la lista de espera de un libro.
+
+        Args:
+            isbn: ISBN del libro reservado
+            usuario: Nombre del usuario que solicita la reserva
+            prioridad: Clase de prioridad (menor valor = se atiende antes)
+            ahora: Fecha de la reserva (por defecto, la fecha actual)
+        """
+        ahora = ahora or datetime.now()
+        elemento = {
+            "ISBN": isbn,
+            "Usuario": usuario,
+            "Prioridad": prioridad,
+            "Llegada": ahora.strftime(FORMATO_FECHA),
+            "Expira": None
+        }
+        expira_ts = None
+        if self.horas_vigencia is not None:
+            expira = ahora + timedelta(hours=self.horas_vigencia)
+            elemento["Expira"] = expira.strftime(FORMATO_FECHA)
+            expira_ts = expira.timestamp()
+        self._indexar(elemento, ahora.timestamp(), expira_ts)
+        self.eventos.emitir(RESERVA_ENCOLADA, reserva=elemento)
+        self._guardar_si_corresponde()
+
+    def siguiente_reserva(self, isbn: str, ahora: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retira y retorna la siguiente reserva vigente de un ISBN según
+        prioridad y orden de llegada. Las reservas expiradas que se
+        encuentren en el camino se descartan.
+
+        Args:
+            isbn: ISBN del libro devuelto
+            ahora: Fecha de referencia (por defecto, la fecha actual)
+
+        Returns:
+            Diccionario con la reserva, o None si no hay reservas vigentes
+        """
+        ahora_ts = (ahora or datetime.now()).timestamp()
+        monticulo = self._colas.get(isbn)
+        seleccionada = None
+        retiradas = 0
+        while monticulo:
+            _, _, identificador = heapq.heappop(monticulo)
+            elemento = self.reservas.get(identificador)
+            if elemento is None:
+                continue
+            retiradas += 1
+            expira = elemento.get("Expira")
+            if expira and marca_tiempo(expira) <= ahora_ts:
+                self._retirar(identificador)
+                continue
+            self._retirar(identificador, RESERVA_ATENDIDA)
+            seleccionada = elemento
+            break
+        if not monticulo:
+            self._colas.pop(isbn, None)
+        if retiradas:
+            self._guardar_si_corresponde()
+        return seleccionada
+
+    def desencolar(self, isbn: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Elimina y retorna una reserva.
+
+        Args:
+            isbn: Si se indica, la siguiente reserva vigente de ese ISBN;
+                  si no, la reserva más antigua de la cola
+
+        Returns:
+            Diccionario con la información de la reserva
+
+        Raises:
+            IndexError: Si no hay reservas que desencolar
+        """
+        if isbn is not None:
+            elemento = self.siguiente_reserva(isbn)
+            if elemento is None:
+                raise IndexError(f"No hay reservas vigentes para el ISBN {isbn}")
+            return elemento
+        if self.esta_vacia():
+            raise IndexError("La cola está vacía")
+        elemento = self._retirar(next(iter(self.reservas)), RESERVA_ATENDIDA)
+        self._guardar_si_corresponde()
+        return elemento
+
+    def frente(self) -> Dict[str, Any]:
+        """
+        Retorna la reserva más antigua sin eliminarla.
+
+        Returns:
+            Diccionario con la reserva más antigua, o None si no hay reservas
+        """
+        if self.esta_vacia():
+            return None
+        return next(iter(self.reservas.values()))
+
+    def esta_vacia(self) -> bool:
+        """
+        Verifica si no hay reservas activas.
+
+        Returns:
+            True si no hay reservas, False en caso contrario
+        """
+        return len(self.reservas) == 0
+
+    def tamanio(self) -> int:
+        """
+        Retorna el número de reservas activas.
+
+        Returns:
+            Número de reservas activas
+        """
+        return len(self.reservas)
+
+    def obtener_reservas_isbn(self, isbn: str) -> List[Dict[str, Any]]:
+        """
+        Obtiene las reservas activas de un ISBN en el orden en que serán atendidas.
+
+        Args:
+            isbn: ISBN del libro
+
+        Returns:
+            Lista de diccionarios con las reservas del ISBN
+        """
+        entradas = sorted(self._colas.get(isbn, []))
+        return [self.reservas[identificador] for _, _, identificador in entradas
+                if identificador in self.reservas]
+
+    def eliminar_reserva(self, isbn: str, usuario: str) -> bool:
+        """
+        Elimina la reserva de un usuario para un ISBN.
+
+        Args:
+            isbn: ISBN del libro
+            usuario: Nombre del usuario
+
+        Returns:
+            True si se eliminó la reserva, False si no se encontró
+        """
+        # La reserva que se atendería primero es la menor entrada del
+        # montículo que coincide; basta un recorrido, sin ordenarlo
+        entrada = min((entrada for entrada in self._colas.get(isbn, [])
+                       if self.reservas.get(entrada[2], {}).get("Usuario") == usuario),
+                      default=None)
+        if entrada is None:
+            return False
+        self._retirar(entrada[2])
+        self._guardar_si_corresponde()
+        return True
+
+    def barrer_expiradas(self, ahora: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Elimina las reservas cuya vigencia terminó.
+
+        Args:
+            ahora: Fecha de referencia (por defecto, la fecha actual)
+
+        Returns:
+            Lista de reservas expiradas eliminadas
+        """
+        ahora_ts = (ahora or datetime.now()).timestamp()
+        expiradas = []
+        while self._expiraciones and self._expiraciones[0][0] <= ahora_ts:
+            _, identificador = heapq.heappop(self._expiraciones)
+            if identificador in self.reservas:
+                expiradas.append(self._retirar(identificador))
+        if expiradas:
+            self._guardar_si_corresponde()
+        return expiradas
@@ -0,0 +1,160 @@
+"""
+Módulo que implementa estructuras de conteo aproximado de memoria acotada
+para flujos de datos sin fin (p. ej. todos los préstamos de la historia).
+
+- CountMinSketch estima cuántas veces apareció cualquier elemento con una
+  matriz de contadores de tamaño fijo; nunca subestima y el error es a lo
+  sumo total * e / ancho con alta probabilidad.
+- ElementosFrecuentes (algoritmo Space-Saving) mantiene solo los k
+  elementos más frecuentes con su cuenta y una cota del error, así que la
+  consulta de los N más frecuentes cuesta O(k) sin importar el largo del flujo.
+
+Los hashes se calculan con zlib.crc32 y no con hash(), que cambia entre
+ejecuciones, para que el sketch de dos procesos sea comparable.
+"""
+
+import heapq
+import zlib
+from typing import Dict, List, Tuple
+
+# Primo de Mersenne para la familia de hashes (a * x + b) mod p
+_PRIMO = (1 << 61) - 1
+
+
+class CountMinSketch:
+    """
+    Sketch Count-Min: estimación de frecuencias con memoria fija.
+
+    Atributos:
+        ancho: Contadores por fila (controla el error)
+        profundidad: Número de filas (controla la probabilidad de error)
+        total: Suma de todas las cantidades agregadas
+    """
+
+    def __init__(self, ancho: int = 2048, profundidad: int = 4):
+        """
+        Inicializa un sketch vacío.
+
+        Args:
+            ancho: Contadores por fila
+            profundidad: Número de filas (funciones de hash)
+        """
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self.total = 0
+        self._filas: List[List[int]] = [[0] * ancho for _ in range(profundidad)]
+        # Coeficientes fijos por fila, derivados del número de fila
+        self._coeficientes = [(2 * fila + 1) * 0x9E3779B97F4A7C15 % _PRIMO or 1
+                              for fila in range(profundidad)]
+        self._desplazamientos = [(fila + 1) * 0x632BE59BD9B4E019 % _PRIMO
+                                 for fila in range(profundidad)]
+
+    def _posiciones(self, elemento: str) -> List[int]:
+        """Calcula la columna del elemento en cada fila."""
+        base = zlib.crc32(elemento.encode("utf-8"))
+        return [((a * base + b) % _PRIMO) % self.ancho
+                for a, b in zip(self._coeficientes, self._desplazamientos)]
+
+    def agregar(self, elemento: str, cantidad: int = 1) -> None:
+        """
+        Suma una cantidad a las apariciones de un elemento.
+
+        Args:
+            elemento: Elemento observado
+            cantidad: Número de apariciones
+        """
+        for fila, columna in zip(self._filas, self._posiciones(elemento)):
+            fila[columna] += cantidad
+        self.total += cantidad
+
+    def estimar(self, elemento: str) -> int:
+        """
+        Estima las apariciones de un elemento.
+
+        Args:
+            elemento: Elemento a consultar
+
+        Returns:
+            Cota superior de las apariciones (el mínimo de sus contadores)
+        """
+        return min(fila[columna] for fila, columna in zip(self._filas, self._posiciones(elemento)))
+
+
+class ElementosFrecuentes:
+    """
+    Resumen Space-Saving de los elementos más frecuentes de un flujo.
+
+    Guarda a lo sumo `capacidad` contadores. Cuando llega un elemento nuevo
+    y no hay espacio, reemplaza al de menor cuenta y hereda esa cuenta como
+    error; todo elemento con más de total / capacidad apariciones está
+    garantizado en el resumen.
+
+    Atributos:
+        capacidad: Número máximo de elementos vigilados
+        total: Suma de todas las cantidades agregadas
+    """
+
+    def __init__(self, capacidad: int = 100):
+        """
+        Inicializa un resumen vacío.
+
+        Args:
+            capacidad: Número máximo de elementos vigilados
+        """
+        self.capacidad = capacidad
+        self.total = 0
+        self._cuentas: Dict[str, List[int]] = {}
+        # Montículo (cuenta, elemento) con entradas obsoletas que se descartan
+        # al llegar a la cima; se reconstruye si crece demasiado
+        self._monticulo: List[Tuple[int, str]] = []
+
+    def _minimo(self) -> str:
+        """Retorna el elemento vigilado de menor cuenta."""
+        while True:
+            cuenta, elemento = self._monticulo[0]
+            actual = self._cuentas.get(elemento)
+            if actual is not None and actual[0] == cuenta:
+                return elemento
+            heapq.heappop(self._monticulo)
+
+    def agregar(self, elemento: str, cantidad: int = 1) -> None:
+        """
+        Suma una cantidad a las apariciones de un elemento.
+
+        Args:
+            elemento: Elemento observado
+            cantidad: Número de apariciones
+        """
+        self.total += cantidad
+        actual = self._cuentas.get(elemento)
+        if actual is None:
+            if len(self._cuentas) < self.capacidad:
+                actual = self._cuentas[elemento] = [0, 0]
+            else:
+                reemplazado = self._minimo()
+                heapq.heappop(self._monticulo)
+                minimo = self._cuentas.pop(reemplazado)[0]
+                actual = self._cuentas[elemento] = [minimo, minimo]
+        actual[0] += cantidad
+        heapq.heappush(self._monticulo, (actual[0], elemento))
+        if len(self._monticulo) > 4 * self.capacidad:
+            self._monticulo = [(cuenta, clave) for clave, (cuenta, _) in self._cuentas.items()]
+            heapq.heapify(self._monticulo)
+
+    def mas_frecuentes(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """
+        Obtiene los elementos más frecuentes.
+
+        Args:
+            n: Número de elementos a retornar
+
+        Returns:
+            Lista de tuplas (elemento, cuenta, error), de mayor a menor cuenta;
+            las apariciones reales están entre cuenta - error y cuenta
+        """
+        mayores = heapq.nlargest(n, self._cuentas.items(), key=lambda par: (par[1][0], par[0]))
+        return [(elemento, cuenta, error) for elemento, (cuenta, error) in mayores]
+
+    def __len__(self) -> int:
+        """Retorna el número de elementos vigilados."""
+        return len(self._cuentas)
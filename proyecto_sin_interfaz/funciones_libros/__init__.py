@@ -1,5 +1,10 @@
+from .isbn import ISBNInvalido, clave_isbn, es_isbn_valido
 from .libro import Libro
 from .gestor_libros import GestorLibros
+from .catalogo_mapeado import CatalogoMapeado
+from .indice_numerico import IndiceNumerico
+from .indice_valor import IndiceValor
+from .catalogo_particionado import CatalogoParticionado
 
-__all__ = ['Libro', 'GestorLibros']
-
+__all__ = ['ISBNInvalido', 'clave_isbn', 'es_isbn_valido', 'Libro', 'GestorLibros', 'CatalogoMapeado',
+           'IndiceNumerico', 'IndiceValor', 'CatalogoParticionado']
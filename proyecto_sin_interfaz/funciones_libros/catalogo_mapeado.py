@@ -0,0 +1,261 @@
+"""
+Módulo que implementa un formato alternativo de catálogo de solo lectura
+pensado para kioscos de consulta.
+
+El archivo contiene registros de ancho fijo ordenados por la clave del ISBN y
+una sección de cadenas (heap) con ISBN, títulos y autores. Se accede mediante
+mmap, de modo que varios procesos comparten la misma caché de páginas del
+sistema operativo y solo se construyen objetos Libro para los resultados.
+
+Estructura del archivo:
+    Encabezado:  firma (8 bytes), número de registros, desplazamiento de los
+                 registros y desplazamiento del heap de cadenas
+    Registros:   clave del ISBN (ISBN-13 entero), peso, valor, cantidad, cantidad presente y
+                 pares (desplazamiento, longitud) de ISBN, título y autor
+    Heap:        cadenas UTF-8 concatenadas
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional
+from .libro import Libro
+from .isbn import clave_isbn_o_none
+from persistencia.serializador import sincronizar
+
+FIRMA = b"SGBCAT01"
+ENCABEZADO = struct.Struct("<8sIQQ")
+REGISTRO = struct.Struct("<QdqIIIIIIII")
+# Las cantidades se guardan como enteros sin signo de 32 bits
+MAXIMO_CANTIDAD = 2 ** 32 - 1
+
+
+class CatalogoMapeado:
+    """
+    Catálogo de solo lectura respaldado por un archivo mapeado en memoria.
+
+    Atributos:
+        archivo: Ruta del archivo de catálogo
+        total: Número de registros del catálogo
+    """
+
+    def __init__(self, archivo: str = "catalogo.sgbc"):
+        """
+        Abre el archivo de catálogo y lo mapea en memoria.
+
+        Args:
+            archivo: Ruta del archivo de catálogo
+
+        Raises:
+            ValueError: Si el archivo no tiene el formato esperado
+        """
+        self.archivo = archivo
+        ruta_archivo = self._ruta_archivo(archivo)
+
+        self._archivo = open(ruta_archivo, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._archivo.close()
+            raise
+
+        firma, total, inicio_registros, inicio_heap = ENCABEZADO.unpack_from(self._mapa, 0)
+        if firma != FIRMA:
+            self.cerrar()
+            raise ValueError(f"El archivo {archivo} no es un catálogo mapeado válido")
+
+        self.total = total
+        self._inicio_registros = inicio_registros
+        self._inicio_heap = inicio_heap
+
+    @staticmethod
+    def _ruta_archivo(archivo: str) -> str:
+        """
+        Obtiene la ruta del archivo relativa al directorio del proyecto.
+
+        Args:
+            archivo: Nombre o ruta del archivo
+
+        Returns:
+            Ruta completa del archivo
+        """
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        return os.path.join(dir_proyecto, archivo)
+
+    @classmethod
+    def escribir(cls, libros: List[Libro], archivo: str = "catalogo.sgbc") -> int:
+        """
+        Genera un archivo de catálogo mapeable a partir de una lista de libros.
+
+        Los libros con ISBN repetido se omiten. El archivo se escribe en un
+        temporal que reemplaza al anterior al terminar, de modo que los
+        procesos que ya lo tienen mapeado siguen leyendo la versión previa.
+
+        Args:
+            libros: Lista de objetos Libro
+            archivo: Ruta del archivo de catálogo a generar
+
+        Returns:
+            Número de registros escritos
+
+        Raises:
+            ValueError: Si la cantidad de algún libro es negativa o no cabe en el formato
+        """
+        entradas = []
+        vistos = set()
+        for libro in libros:
+            clave = libro.clave
+            if clave in vistos:
+                continue
+            for cantidad in (libro.cantidad, libro.cantidad_presente):
+                if not 0 <= cantidad <= MAXIMO_CANTIDAD:
+                    raise ValueError(f"Cantidad no válida ({cantidad}) en el libro "
+                                     f"con ISBN {libro.isbn}")
+            vistos.add(clave)
+            entradas.append((clave, libro))
+        entradas.sort(key=lambda entrada: entrada[0])
+
+        heap = bytearray()
+        registros = bytearray()
+        for clave, libro in entradas:
+            campos = []
+            for texto in (libro.isbn, libro.titulo, libro.autor):
+                datos = texto.encode("utf-8")
+                campos.extend((len(heap), len(datos)))
+                heap += datos
+            registros += REGISTRO.pack(clave, libro.peso, libro.valor, libro.cantidad,
+                                       libro.cantidad_presente, *campos)
+
+        inicio_registros = ENCABEZADO.size
+        inicio_heap = inicio_registros + len(registros)
+
+        ruta_archivo = cls._ruta_archivo(archivo)
+        temporal = ruta_archivo + ".tmp"
+        try:
+            with open(temporal, "wb") as f:
+                f.write(ENCABEZADO.pack(FIRMA, len(entradas), inicio_registros, inicio_heap))
+                f.write(registros)
+                f.write(heap)
+            sincronizar(temporal)
+            os.replace(temporal, ruta_archivo)
+            sincronizar(os.path.dirname(ruta_archivo), directorio=True)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        return len(entradas)
+
+    def _clave(self, posicion: int) -> int:
+        """
+        Lee la clave ISBN de un registro directamente de los bytes mapeados.
+
+        Args:
+            posicion: Posición del registro
+
+        Returns:
+            Clave entera del ISBN
+        """
+        return struct.unpack_from("<Q", self._mapa,
+                                  self._inicio_registros + posicion * REGISTRO.size)[0]
+
+    def _cadena(self, desplazamiento: int, longitud: int) -> str:
+        """
+        Decodifica una cadena del heap.
+
+        Args:
+            desplazamiento: Desplazamiento dentro del heap
+            longitud: Longitud en bytes
+
+        Returns:
+            Cadena decodificada
+        """
+        inicio = self._inicio_heap + desplazamiento
+        return self._mapa[inicio:inicio + longitud].decode("utf-8")
+
+    def busqueda_binaria(self, isbn: str) -> Optional[int]:
+        """
+        Busca un ISBN con búsqueda binaria sobre los registros mapeados,
+        sin decodificar ningún libro.
+
+        Args:
+            isbn: ISBN a buscar
+
+        Returns:
+            Posición del registro si se encuentra, None en caso contrario
+        """
+        isbn_int = clave_isbn_o_none(isbn)
+        if isbn_int is None:
+            return None
+
+        izquierda = 0
+        derecha = self.total - 1
+        while izquierda <= derecha:
+            medio = (izquierda + derecha) // 2
+            clave_medio = self._clave(medio)
+            if clave_medio == isbn_int:
+                return medio
+            elif clave_medio < isbn_int:
+                izquierda = medio + 1
+            else:
+                derecha = medio - 1
+        return None
+
+    def obtener(self, posicion: int) -> Libro:
+        """
+        Decodifica el registro de una posición como objeto Libro.
+
+        Args:
+            posicion: Posición del registro
+
+        Returns:
+            Objeto Libro con los datos del registro
+
+        Raises:
+            IndexError: Si la posición está fuera de rango
+        """
+        if not 0 <= posicion < self.total:
+            raise IndexError("Posición fuera del catálogo")
+        (_, peso, valor, cantidad, cantidad_presente,
+         isbn_desp, isbn_long, titulo_desp, titulo_long,
+         autor_desp, autor_long) = REGISTRO.unpack_from(
+            self._mapa, self._inicio_registros + posicion * REGISTRO.size)
+        return Libro(self._cadena(isbn_desp, isbn_long),
+                     self._cadena(titulo_desp, titulo_long),
+                     self._cadena(autor_desp, autor_long),
+                     peso, valor, cantidad, cantidad_presente)
+
+    def buscar_por_isbn(self, isbn: str) -> Optional[Libro]:
+        """
+        Busca un libro por ISBN y lo decodifica solo si existe.
+
+        Args:
+            isbn: ISBN a buscar
+
+        Returns:
+            Objeto Libro si se encuentra, None en caso contrario
+        """
+        posicion = self.busqueda_binaria(isbn)
+        if posicion is None:
+            return None
+        return self.obtener(posicion)
+
+    def __len__(self) -> int:
+        """Retorna el número de registros del catálogo."""
+        return self.total
+
+    def __iter__(self) -> Iterator[Libro]:
+        """Recorre el catálogo en orden de ISBN decodificando cada libro."""
+        for posicion in range(self.total):
+            yield self.obtener(posicion)
+
+    def cerrar(self) -> None:
+        """Libera el mapeo en memoria y cierra el archivo."""
+        self._mapa.close()
+        self._archivo.close()
+
+    def __enter__(self) -> 'CatalogoMapeado':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.cerrar()
@@ -0,0 +1,366 @@
+"""
+Módulo que implementa un catálogo de consulta particionado por rangos de
+ISBN entre varios procesos.
+
+El catálogo se divide en N particiones contiguas de clave de ISBN, cada
+una atendida por un proceso propio. Las búsquedas por ISBN se dirigen solo
+a la partición dueña del rango; las búsquedas por título o autor y los
+reportes se envían a todas las particiones a la vez (cada una trabaja en su
+propio núcleo) y los resultados parciales, ya ordenados, se combinan; los
+reportes por valor con una mezcla de k vías (heapq.merge).
+
+Pensado para catálogos colectivos de millones de títulos en modo consulta:
+los préstamos y devoluciones se siguen registrando con GestorLibros.
+"""
+
+import heapq
+import os
+from bisect import bisect_left, bisect_right
+from multiprocessing import Pipe, Process
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .libro import Libro
+from .isbn import clave_isbn, clave_isbn_o_none, registros_validos
+from .texto import normalizar_texto
+from persistencia.serializador import leer_registros
+
+
+class _Particion:
+    """
+    Datos de búsqueda de una partición, dentro del proceso que la atiende.
+    Las consultas devuelven posiciones dentro de la partición (en orden de
+    ISBN): enviar enteros entre procesos es mucho más barato que enviar
+    objetos Libro, y el proceso principal ya tiene los libros.
+
+    Atributos:
+        textos: Título y autor normalizados (sin mayúsculas ni tildes) de cada posición
+        autores: Autor normalizado de cada posición
+        valores: Valor de cada posición
+        pesos: Peso de cada posición
+        orden_valor: Posiciones ordenadas por valor (desempate por ISBN)
+    """
+
+    def __init__(self, columnas: List[Tuple[str, str, float, float]]):
+        """
+        Construye la partición.
+
+        Args:
+            columnas: Tuplas (título, autor, peso, valor) en orden de ISBN
+        """
+        self.textos = [(normalizar_texto(titulo), normalizar_texto(autor)) for titulo, autor, _, _ in columnas]
+        self.autores = [autor for _, autor in self.textos]
+        self.pesos = [peso for _, _, peso, _ in columnas]
+        self.valores = [valor for _, _, _, valor in columnas]
+        # Las posiciones siguen el orden de ISBN, así que sirven de desempate
+        self.orden_valor = sorted(range(len(columnas)), key=lambda i: (self.valores[i], i))
+        self._valores_ordenados = [self.valores[i] for i in self.orden_valor]
+
+    def buscar_por_titulo_autor(self, termino: str) -> List[int]:
+        """Posiciones de los libros cuyo título o autor contiene el término."""
+        termino = normalizar_texto(termino)
+        return [posicion for posicion, (titulo, autor) in enumerate(self.textos)
+                if termino in titulo or termino in autor]
+
+    def en_orden_valor(self) -> List[int]:
+        """Posiciones ordenadas por valor."""
+        return self.orden_valor
+
+    def en_rango_valor(self, minimo: float, maximo: float) -> List[int]:
+        """Posiciones con valor entre dos montos, ordenadas por valor."""
+        inicio = bisect_left(self._valores_ordenados, minimo)
+        fin = bisect_right(self._valores_ordenados, maximo)
+        return self.orden_valor[inicio:fin]
+
+    def totales_autor(self, autor: str) -> Tuple[int, float, float]:
+        """Número de libros, valor total y peso total de un autor."""
+        autor = normalizar_texto(autor)
+        cantidad = 0
+        valor = 0.0
+        peso = 0.0
+        for posicion, nombre in enumerate(self.autores):
+            if nombre == autor:
+                cantidad += 1
+                valor += self.valores[posicion]
+                peso += self.pesos[posicion]
+        return (cantidad, valor, peso)
+
+
+def _atender_particion(conexion, columnas: List[Tuple[str, str, float, float]]) -> None:
+    """
+    Bucle del proceso de una partición: recibe (operación, argumentos),
+    ejecuta el método de la partición y envía (éxito, resultado).
+    Termina al recibir None.
+
+    Args:
+        conexion: Extremo de la tubería con el proceso principal
+        columnas: Tuplas (título, autor, peso, valor) en orden de ISBN
+    """
+    particion = _Particion(columnas)
+    del columnas
+    while True:
+        mensaje = conexion.recv()
+        if mensaje is None:
+            break
+        operacion, argumentos = mensaje
+        try:
+            conexion.send((True, getattr(particion, operacion)(*argumentos)))
+        except Exception as e:
+            conexion.send((False, e))
+    conexion.close()
+
+
+class CatalogoParticionado:
+    """
+    Catálogo de consulta repartido por rangos de ISBN entre procesos.
+
+    El proceso principal conserva los libros de cada partición (en orden de
+    ISBN) para construir los resultados; los procesos de las particiones
+    guardan solo los datos de búsqueda y responden con posiciones.
+
+    Atributos:
+        limites: Clave de ISBN del primer libro de cada partición (salvo la primera)
+        total_libros: Número de libros del catálogo
+    """
+
+    def __init__(self, libros: Iterable[Libro], particiones: Optional[int] = None):
+        """
+        Reparte los libros en particiones de igual tamaño por rango de ISBN
+        e inicia un proceso por partición.
+
+        Args:
+            libros: Libros del catálogo
+            particiones: Número de procesos (por defecto, uno por núcleo)
+        """
+        ordenados = sorted(libros, key=lambda libro: libro.clave)
+        self.total_libros = len(ordenados)
+        particiones = max(1, min(particiones or os.cpu_count() or 1, self.total_libros or 1))
+        tamanio = max(1, -(-self.total_libros // particiones))
+
+        self.limites: List[int] = []
+        self._libros: List[List[Libro]] = []
+        self._claves: List[List[int]] = []
+        self._conexiones = []
+        self._procesos: List[Process] = []
+        for inicio in range(0, max(self.total_libros, 1), tamanio):
+            bloque = ordenados[inicio:inicio + tamanio]
+            claves = [libro.clave for libro in bloque]
+            if inicio > 0:
+                self.limites.append(claves[0])
+            self._libros.append(bloque)
+            self._claves.append(claves)
+
+            local, remota = Pipe()
+            columnas = [(libro.titulo, libro.autor, libro.peso, libro.valor) for libro in bloque]
+            proceso = Process(target=_atender_particion, args=(remota, columnas), daemon=True)
+            proceso.start()
+            remota.close()
+            self._conexiones.append(local)
+            self._procesos.append(proceso)
+
+    @classmethod
+    def desde_archivo(cls, archivo: str = "libros.json",
+                      particiones: Optional[int] = None) -> 'CatalogoParticionado':
+        """
+        Crea el catálogo a partir de un archivo de inventario. Los registros
+        con ISBN inválido o repetido se omiten, igual que en GestorLibros.
+
+        Args:
+            archivo: Ruta del archivo de inventario (relativa al proyecto)
+            particiones: Número de procesos (por defecto, uno por núcleo)
+
+        Returns:
+            Catálogo particionado
+        """
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        ruta_archivo = os.path.join(dir_proyecto, archivo)
+        return cls((Libro.from_dict(registro)
+                    for _, registro in registros_validos(leer_registros(ruta_archivo))),
+                   particiones)
+
+    @property
+    def particiones(self) -> int:
+        """Número de particiones (procesos) del catálogo."""
+        return len(self._conexiones)
+
+    def _recibir(self, conexion) -> Any:
+        """Recibe la respuesta de una partición y propaga sus errores."""
+        exito, resultado = conexion.recv()
+        if not exito:
+            raise resultado
+        return resultado
+
+    def _difundir(self, operacion: str, *argumentos) -> List[Any]:
+        """
+        Envía una operación a todas las particiones antes de esperar
+        respuestas, para que se ejecuten en paralelo.
+
+        Args:
+            operacion: Nombre del método de la partición
+            *argumentos: Argumentos del método
+
+        Returns:
+            Resultados de cada partición, en orden de ISBN
+        """
+        for conexion in self._conexiones:
+            conexion.send((operacion, argumentos))
+        return [self._recibir(conexion) for conexion in self._conexiones]
+
+    def _mezclar_por_valor(self, parciales: List[List[int]]) -> Iterator[Libro]:
+        """
+        Mezcla de k vías de las posiciones ordenadas por valor de cada
+        partición. Los empates de valor se resuelven por partición y
+        posición, que es el orden de ISBN.
+
+        Args:
+            parciales: Posiciones ordenadas por valor de cada partición
+
+        Returns:
+            Iterador de libros ordenados por valor
+        """
+        def claves(particion: int, posiciones: List[int]) -> Iterator[Tuple[float, int, int]]:
+            libros = self._libros[particion]
+            for posicion in posiciones:
+                yield (libros[posicion].valor, particion, posicion)
+
+        secuencias = [claves(particion, posiciones) for particion, posiciones in enumerate(parciales)]
+        for _, particion, posicion in heapq.merge(*secuencias):
+            yield self._libros[particion][posicion]
+
+    def particion_de(self, isbn: str) -> int:
+        """
+        Obtiene la partición dueña del rango que contiene un ISBN.
+
+        Args:
+            isbn: ISBN a ubicar
+
+        Returns:
+            Índice de la partición
+
+        Raises:
+            ISBNInvalido: Si el ISBN no es válido
+        """
+        return bisect_right(self.limites, clave_isbn(isbn))
+
+    def buscar_por_isbn_binaria(self, isbn: str) -> Optional[Libro]:
+        """
+        Busca un libro por ISBN con búsqueda binaria solo en la partición
+        dueña del rango. Al ser O(log n) se resuelve en el proceso principal,
+        sin el costo de ida y vuelta a otro proceso.
+
+        Args:
+            isbn: ISBN a buscar
+
+        Returns:
+            Objeto Libro si se encuentra, None en caso contrario
+        """
+        clave = clave_isbn_o_none(isbn)
+        if clave is None or not self.total_libros:
+            return None
+        particion = bisect_right(self.limites, clave)
+        claves = self._claves[particion]
+        posicion = bisect_left(claves, clave)
+        if posicion < len(claves) and claves[posicion] == clave:
+            return self._libros[particion][posicion]
+        return None
+
+    def buscar_por_titulo_autor(self, termino: str) -> List[Libro]:
+        """
+        Busca libros por título o autor en todas las particiones a la vez.
+
+        Args:
+            termino: Término de búsqueda (título o autor)
+
+        Returns:
+            Lista de objetos Libro que coinciden, en orden de ISBN
+        """
+        resultados = []
+        # Los rangos de ISBN de las particiones no se solapan y están en
+        # orden, así que concatenarlas ya da el orden de ISBN
+        for libros, posiciones in zip(self._libros, self._difundir("buscar_por_titulo_autor", termino)):
+            resultados.extend(libros[posicion] for posicion in posiciones)
+        return resultados
+
+    def obtener_inventario_por_valor(self) -> List[Libro]:
+        """
+        Retorna el catálogo completo ordenado por valor (desempate por ISBN).
+
+        Returns:
+            Lista de objetos Libro ordenada por valor
+        """
+        return list(self._mezclar_por_valor(self._difundir("en_orden_valor")))
+
+    def libros_en_rango_valor(self, minimo: float, maximo: float) -> List[Libro]:
+        """
+        Obtiene los libros cuyo valor está entre dos montos (inclusive).
+
+        Args:
+            minimo: Valor mínimo en pesos colombianos
+            maximo: Valor máximo en pesos colombianos
+
+        Returns:
+            Lista de objetos Libro ordenada por valor
+        """
+        return list(self._mezclar_por_valor(self._difundir("en_rango_valor", minimo, maximo)))
+
+    def generar_reporte_por_valor(self, archivo: str = "reporte_por_valor.json",
+                                  formato: Optional[str] = None,
+                                  comprimir: Optional[bool] = None) -> None:
+        """
+        Genera el reporte por valor del catálogo completo. Los libros se
+        escriben a medida que salen de la mezcla, sin reordenarlos.
+
+        Args:
+            archivo: Nombre del archivo del reporte
+            formato: "json", "json_indentado" o "jsonl" (ver persistencia.serializador)
+            comprimir: Si es True se comprime con gzip
+        """
+        from algoritmos_ordenamiento.ordenamiento import Ordenamiento
+        Ordenamiento().generar_reporte_por_valor(self._mezclar_por_valor(self._difundir("en_orden_valor")),
+                                                 archivo, ordenado=True, formato=formato,
+                                                 comprimir=comprimir)
+
+    def totales_autor(self, autor: str) -> Dict[str, float]:
+        """
+        Calcula los totales de un autor sumando los de cada partición.
+
+        Args:
+            autor: Nombre del autor (sin distinguir mayúsculas ni tildes)
+
+        Returns:
+            Diccionario con cantidad, valor_total y peso_promedio
+        """
+        cantidad = 0
+        valor = 0.0
+        peso = 0.0
+        for parcial in self._difundir("totales_autor", autor):
+            cantidad += parcial[0]
+            valor += parcial[1]
+            peso += parcial[2]
+        return {
+            "cantidad": cantidad,
+            "valor_total": valor,
+            "peso_promedio": peso / cantidad if cantidad else 0.0,
+        }
+
+    def cerrar(self) -> None:
+        """Detiene los procesos de las particiones."""
+        for conexion in self._conexiones:
+            try:
+                conexion.send(None)
+            except OSError:
+                pass
+            conexion.close()
+        for proceso in self._procesos:
+            proceso.join(timeout=5)
+        self._conexiones = []
+        self._procesos = []
+
+    def __enter__(self) -> 'CatalogoParticionado':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+    def __len__(self) -> int:
+        """Retorna el número de libros del catálogo."""
+        return self.total_libros
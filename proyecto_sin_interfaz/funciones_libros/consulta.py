@@ -0,0 +1,198 @@
+"""
+Módulo que implementa las consultas del catálogo con varios criterios
+(autor, rango de valor, peso máximo, solo disponibles, término en el título
+o autor), ordenamiento y límite.
+
+El planificador estima cuántos libros aporta cada índice disponible para
+los criterios de la consulta (ISBN, autor, valor, peso, disponibles) y recorre el
+más selectivo; los demás criterios se aplican como filtros perezosos sobre
+un generador, de modo que con un límite el recorrido se detiene en cuanto
+hay suficientes resultados. GestorLibros.consultar(..., explicar=True)
+retorna el plan elegido. Autores, títulos y términos se comparan y ordenan
+sin distinguir mayúsculas ni tildes.
+"""
+
+import heapq
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from .isbn import clave_isbn_o_none
+from .libro import Libro
+from .texto import normalizar_termino
+
+if TYPE_CHECKING:
+    from .gestor_libros import GestorLibros
+
+# Clave de ordenamiento de cada campo; el ISBN desempata para un orden estable
+CLAVES_ORDEN = {
+    "isbn": lambda libro: libro.clave,
+    "titulo": lambda libro: (libro.titulo_normalizado, libro.clave),
+    "autor": lambda libro: (libro.autor_normalizado, libro.clave),
+    "valor": lambda libro: (libro.valor, libro.clave),
+    "peso": lambda libro: (libro.peso, libro.clave),
+}
+
+
+class PlanConsulta:
+    """
+    Clase que describe cómo se resolverá una consulta.
+
+    Atributos:
+        indice: Índice que genera los candidatos ("isbn", "autor", "valor", "peso",
+                "disponibles" o "recorrido" si se recorre todo el inventario)
+        candidatos: Número estimado de libros que aporta el índice
+        filtros: Descripción de los criterios que se aplican sobre los candidatos
+        orden: Campo de ordenamiento, o None
+        orden_por_indice: True si el índice ya entrega los libros en ese orden
+        limite: Número máximo de resultados, o None
+        alternativas: Estimación de candidatos de cada índice considerado
+    """
+
+    def __init__(self, indice: str, candidatos: int, generar: Callable[[], Iterable[Libro]],
+                 orden_indice: Optional[str]):
+        """
+        Inicializa el plan con el índice elegido.
+
+        Args:
+            indice: Nombre del índice que genera los candidatos
+            candidatos: Número estimado de candidatos
+            generar: Función que retorna los candidatos del índice
+            orden_indice: Campo por el que el índice entrega los libros ordenados
+        """
+        self.indice = indice
+        self.candidatos = candidatos
+        self.generar = generar
+        self.orden_indice = orden_indice
+        self.filtros: List[str] = []
+        self.orden: Optional[str] = None
+        self.orden_por_indice = False
+        self.limite: Optional[int] = None
+        self.alternativas: List[Tuple[str, int]] = []
+
+    def __str__(self) -> str:
+        """Retorna el plan en texto, un paso por línea."""
+        lineas = [f"Índice: {self.indice} (~{self.candidatos} candidato(s))"]
+        if self.alternativas:
+            lineas.append("Alternativas: " + ", ".join(f"{nombre} (~{cantidad})"
+                                                       for nombre, cantidad in self.alternativas))
+        lineas.append("Filtros: " + (", ".join(self.filtros) if self.filtros else "ninguno"))
+        if self.orden is None:
+            lineas.append("Orden: el del índice")
+        elif self.orden_por_indice:
+            lineas.append(f"Orden: {self.orden} (lo entrega el índice, sin ordenar)")
+        elif self.limite is not None:
+            lineas.append(f"Orden: {self.orden} (los {self.limite} primeros con un montículo)")
+        else:
+            lineas.append(f"Orden: {self.orden} (ordenamiento de los resultados)")
+        if self.limite is not None:
+            lineas.append(f"Límite: {self.limite}")
+        return "\n".join(lineas)
+
+
+def planificar(gestor: 'GestorLibros', isbn: Optional[str] = None, autor: Optional[str] = None,
+               termino: Optional[str] = None, valor_min: Optional[float] = None,
+               valor_max: Optional[float] = None, peso_max: Optional[float] = None,
+               solo_disponibles: bool = False, ordenar_por: Optional[str] = None,
+               limite: Optional[int] = None) -> Tuple[PlanConsulta, List[Callable[[Libro], bool]]]:
+    """
+    Elige el índice más selectivo para una consulta y arma los filtros.
+
+    Args:
+        gestor: Gestor de libros con los índices
+        (demás argumentos: ver GestorLibros.consultar)
+
+    Returns:
+        Tupla (plan, filtros), donde filtros son funciones que reciben un libro
+
+    Raises:
+        ValueError: Si el campo de ordenamiento no existe
+    """
+    if ordenar_por is not None and ordenar_por not in CLAVES_ORDEN:
+        raise ValueError(f"No se puede ordenar por '{ordenar_por}' "
+                         f"(opciones: {', '.join(CLAVES_ORDEN)})")
+
+    # Cada alternativa: (candidatos estimados, nombre, generador, orden que entrega)
+    alternativas: List[Tuple[int, str, Callable[[], Iterable[Libro]], Optional[str]]] = [
+        (len(gestor.inventario_ordenado), "recorrido", lambda: gestor.inventario_ordenado, "isbn")
+    ]
+    if isbn is not None:
+        libro = gestor.buscar_por_isbn_binaria(isbn) if clave_isbn_o_none(isbn) is not None else None
+        encontrados = [libro] if libro is not None else []
+        alternativas.append((len(encontrados), "isbn", lambda: encontrados, "isbn"))
+    if autor is not None:
+        del_autor = gestor.indice_autor.get(normalizar_termino(autor), [])
+        alternativas.append((len(del_autor), "autor", lambda: del_autor, None))
+    if valor_min is not None or valor_max is not None:
+        inicio, fin = gestor.indice_valor.posiciones_rango(valor_min, valor_max)
+        alternativas.append((fin - inicio, "valor",
+                             lambda: islice(gestor.indice_valor.libros, inicio, fin), "valor"))
+    if peso_max is not None:
+        fin_peso = gestor.indice_peso.posiciones_rango(None, peso_max)[1]
+        alternativas.append((fin_peso, "peso", lambda: islice(gestor.indice_peso.libros, fin_peso), "peso"))
+    if solo_disponibles:
+        disponibles = gestor.disponibles
+        alternativas.append((len(disponibles), "disponibles", lambda: list(disponibles.values()), None))
+
+    # Menos candidatos primero; a igual cantidad, el índice que ya entrega el orden pedido
+    candidatos, indice, generar, orden_indice = min(
+        alternativas, key=lambda alternativa: (alternativa[0], alternativa[3] != ordenar_por))
+    plan = PlanConsulta(indice, candidatos, generar, orden_indice)
+    plan.alternativas = [(nombre, cantidad) for cantidad, nombre, _, _ in alternativas if nombre != indice]
+    plan.orden = ordenar_por
+    plan.orden_por_indice = ordenar_por is not None and ordenar_por == orden_indice
+    plan.limite = limite
+
+    # Los criterios que el índice elegido no resuelve se aplican como filtros
+    filtros: List[Callable[[Libro], bool]] = []
+    if isbn is not None and indice != "isbn":
+        clave = clave_isbn_o_none(isbn)
+        filtros.append(lambda libro: libro.clave == clave)
+        plan.filtros.append(f"ISBN = {isbn}")
+    if autor is not None and indice != "autor":
+        autor_normalizado = normalizar_termino(autor)
+        filtros.append(lambda libro: libro.autor_normalizado == autor_normalizado)
+        plan.filtros.append(f"autor = {autor}")
+    if (valor_min is not None or valor_max is not None) and indice != "valor":
+        minimo = valor_min if valor_min is not None else float("-inf")
+        maximo = valor_max if valor_max is not None else float("inf")
+        filtros.append(lambda libro: minimo <= libro.valor <= maximo)
+        plan.filtros.append(f"{minimo:,.0f} <= valor <= {maximo:,.0f}")
+    if peso_max is not None and indice != "peso":
+        filtros.append(lambda libro: libro.peso <= peso_max)
+        plan.filtros.append(f"peso <= {peso_max} Kg")
+    if solo_disponibles and indice != "disponibles":
+        filtros.append(Libro.esta_disponible)
+        plan.filtros.append("solo disponibles")
+    if termino:
+        termino_normalizado = normalizar_termino(termino)
+        filtros.append(lambda libro: termino_normalizado in libro.titulo_normalizado or
+                       termino_normalizado in libro.autor_normalizado)
+        plan.filtros.append(f"título o autor contiene '{termino}'")
+    return plan, filtros
+
+
+def ejecutar(plan: PlanConsulta, filtros: List[Callable[[Libro], bool]],
+             descendente: bool = False) -> List[Libro]:
+    """
+    Ejecuta un plan: recorre los candidatos del índice, aplica los filtros
+    de forma perezosa y ordena o corta según el plan.
+
+    Args:
+        plan: Plan elegido por planificar
+        filtros: Funciones que debe cumplir cada libro
+        descendente: Si es True, el orden es de mayor a menor
+
+    Returns:
+        Lista de libros que cumplen todos los criterios
+    """
+    resultados: Iterator[Libro] = iter(plan.generar())
+    for filtro in filtros:
+        resultados = filter(filtro, resultados)
+
+    if plan.orden is None or (plan.orden_por_indice and not descendente):
+        return list(islice(resultados, plan.limite))
+    clave: Callable[[Libro], Any] = CLAVES_ORDEN[plan.orden]
+    if plan.limite is not None:
+        # Con límite basta un montículo de tamaño k: O(n log k) en vez de ordenar todo
+        seleccionar = heapq.nlargest if descendente else heapq.nsmallest
+        return seleccionar(plan.limite, resultados, key=clave)
+    return sorted(resultados, key=clave, reverse=descendente)
@@ -2,23 +2,51 @@
 Módulo que gestiona el inventario de libros del sistema.
 """
 
-import json
 import os
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
 from .libro import Libro
+from .isbn import registros_validos
+from .texto import normalizar_termino
+from .indice_valor import IndiceValor
+from .indice_numerico import IndiceNumerico
+from .consulta import PlanConsulta, ejecutar, planificar
 from algoritmos_ordenamiento.ordenamiento import Ordenamiento
+from estructuras_datos.eventos import (BusEventos, Evento, LIBRO_AGREGADO, LIBRO_ELIMINADO, LIBRO_ACTUALIZADO,
+                                      CATALOGO_RECARGADO)
+from persistencia.serializador import escribir_registros, leer_registros
+from persistencia.escritor_diferido import EscritorDiferido
 
 class GestorLibros:
     """
     Clase que gestiona el inventario de libros del sistema.
     Mantiene dos listas: Inventario General (desordenado) e Inventario Ordenado (por ISBN).
     
+    Las búsquedas por título o autor se guardan en una caché LRU acotada.
+    La caché depende solo de version_catalogo, que aumenta cuando se agrega,
+    elimina o recarga un libro; los préstamos y devoluciones solo cambian la
+    disponibilidad de los mismos objetos Libro, por lo que no la invalidan.
+    
     Atributos:
         inventario_general: Lista desordenada de objetos Libro
         inventario_ordenado: Lista ordenada por ISBN de objetos Libro
         archivo: Ruta del archivo JSON donde se persiste el inventario
+        autoguardado: Si es True, cada modificación se guarda inmediatamente en el archivo
+        escritor: Escritor diferido que guarda en segundo plano (None = guardar en el momento)
+        indice_valor: Índice de libros ordenado por valor (desempate por ISBN)
+        indice_peso: Índice de libros ordenado por peso (desempate por ISBN)
+        indice_autor: Diccionario autor normalizado (sin mayúsculas ni tildes) -> libros de ese autor
+        disponibles: Diccionario clave del ISBN -> libro con ejemplares disponibles
+        registros_rechazados: Registros del archivo omitidos al cargar (ISBN inválido o
+                              duplicado); se vuelven a escribir tal cual al guardar
+        version_catalogo: Contador que aumenta con cada cambio en el conjunto de libros
+        estadisticas_cache: Contadores de aciertos, fallos, desalojos e invalidaciones de la caché
+        eventos: Bus donde se emiten los libros agregados y eliminados y las recargas
+                 (GestorPrestamos emite en el mismo bus los cambios de disponibilidad)
     """
     
+    TAMANIO_CACHE = 256
+    
     def __init__(self, archivo: str = "libros.json"):
         """
         Inicializa el gestor de libros y carga el inventario desde archivo.
@@ -27,15 +55,36 @@ class GestorLibros:
             archivo: Ruta del archivo JSON con el inventario
         """
         self.archivo = archivo
+        self.autoguardado = True
+        self.escritor: Optional[EscritorDiferido] = None
         self.inventario_general: List[Libro] = []
         self.inventario_ordenado: List[Libro] = []
+        self.registros_rechazados: List[Dict] = []
+        self.indice_valor = IndiceValor()
+        self.indice_peso = IndiceNumerico("peso")
         self.ordenamiento = Ordenamiento()
+        self.version_catalogo = 0
+        self.eventos = BusEventos()
+        self.indice_autor: Dict[str, List[Libro]] = {}
+        self.disponibles: Dict[int, Libro] = {}
+        # Los préstamos y devoluciones cambian la disponibilidad sin pasar por
+        # este gestor; el índice de disponibles se mantiene con sus eventos
+        self.eventos.suscribir(self._actualizar_disponibilidad, (LIBRO_ACTUALIZADO,))
+        self._cache_consultas: "OrderedDict[str, List[Libro]]" = OrderedDict()
+        self._version_cache = 0
+        self.estadisticas_cache: Dict[str, int] = {
+            "aciertos": 0, "fallos": 0, "desalojos": 0, "invalidaciones": 0
+        }
         self.cargar_inventario()
     
     def cargar_inventario(self) -> None:
         """
         Carga el inventario desde el archivo JSON y actualiza ambas listas.
         """
+        self.version_catalogo += 1
+        # Lo pendiente se escribe antes, para no leer un archivo desactualizado
+        if self.escritor is not None:
+            self.escritor.vaciar(self)
         try:
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
@@ -44,38 +93,84 @@ class GestorLibros:
             
             if not os.path.exists(ruta_archivo):
                 # Si el archivo no existe, crear uno vacío
-                with open(ruta_archivo, "w", encoding="utf-8") as f:
-                    json.dump([], f, indent=4, ensure_ascii=False)
+                escribir_registros(ruta_archivo, [])
                 self.inventario_general = []
                 self.inventario_ordenado = []
+                self.registros_rechazados = []
+                self.indice_valor.construir([])
+                self.indice_peso.construir([])
                 return
             
-            with open(ruta_archivo, "r", encoding="utf-8") as f:
-                datos = json.load(f)
-            
-            self.inventario_general = [Libro.from_dict(libro) for libro in datos]
+            self.inventario_general = []
+            self.registros_rechazados = []
+            # Los ISBN inválidos o repetidos se omiten y se guardan aparte
+            for _, registro in registros_validos(leer_registros(ruta_archivo),
+                                                 self.registros_rechazados):
+                self.inventario_general.append(Libro.from_dict(registro))
             # Ordenar el inventario ordenado por ISBN usando ordenamiento por inserción
             self.inventario_ordenado = self.ordenamiento.ordenamiento_insercion(
                 [libro for libro in self.inventario_general]
             )
+            self.indice_valor.construir(self.inventario_general)
+            self.indice_peso.construir(self.inventario_general)
         except Exception as e:
             print(f"Error al cargar inventario: {e}")
             self.inventario_general = []
             self.inventario_ordenado = []
+            self.registros_rechazados = []
+            self.indice_valor.construir([])
+            self.indice_peso.construir([])
+        finally:
+            self.indice_autor = {}
+            self.disponibles = {}
+            for libro in self.inventario_general:
+                self._indexar_consulta(libro)
+            self.eventos.emitir(CATALOGO_RECARGADO)
+    
+    def guardar_si_corresponde(self) -> None:
+        """
+        Guarda el inventario si el guardado automático está activo. Con un
+        escritor diferido solo se programa la escritura de una instantánea
+        de los libros.
+        """
+        if not self.autoguardado:
+            return
+        if self.escritor is None:
+            self._escribir(self._instantanea())
+        else:
+            self.escritor.programar(self, self._escribir, self._instantanea())
     
     def guardar_inventario(self) -> None:
-        """Guarda el inventario general en el archivo JSON."""
+        """
+        Guarda el inventario general en el archivo JSON. Con un escritor
+        diferido, la escritura reemplaza a la que estuviera pendiente.
+        """
+        if self.escritor is None:
+            self._escribir(self._instantanea())
+        else:
+            self.escritor.escribir(self, self._escribir, self._instantanea())
+    
+    def _instantanea(self) -> List[Dict]:
+        """
+        Copia los libros como diccionarios en el hilo que los modificó, para
+        que el escritor diferido no lea objetos Libro que siguen cambiando.
+        """
+        return [libro.to_dict() for libro in self.inventario_general]
+    
+    def _escribir(self, registros: List[Dict]) -> bool:
+        """Escribe los registros de los libros en el archivo JSON (True si se escribió)."""
         try:
             # Obtener el directorio del script actual
             dir_actual = os.path.dirname(os.path.abspath(__file__))
             dir_proyecto = os.path.dirname(dir_actual)
             ruta_archivo = os.path.join(dir_proyecto, self.archivo)
             
-            datos = [libro.to_dict() for libro in self.inventario_general]
-            with open(ruta_archivo, "w", encoding="utf-8") as f:
-                json.dump(datos, f, indent=4, ensure_ascii=False)
+            # Los registros omitidos al cargar se conservan para no perder datos del usuario
+            escribir_registros(ruta_archivo, registros + self.registros_rechazados)
+            return True
         except Exception as e:
             print(f"Error al guardar inventario: {e}")
+            return False
     
     def agregar_libro(self, libro: Libro) -> bool:
         """
@@ -94,13 +189,18 @@ class GestorLibros:
         
         # Agregar al inventario general (desordenado)
         self.inventario_general.append(libro)
+        self.indice_valor.agregar(libro)
+        self.indice_peso.agregar(libro)
+        self._indexar_consulta(libro)
+        self.version_catalogo += 1
         
         # Agregar al inventario ordenado usando ordenamiento por inserción
         self.inventario_ordenado = self.ordenamiento.ordenamiento_insercion(
             [libro for libro in self.inventario_general]
         )
         
-        self.guardar_inventario()
+        self.guardar_si_corresponde()
+        self.eventos.emitir(LIBRO_AGREGADO, libro=libro)
         return True
     
     def cargar_libro_manual(self, isbn: str, titulo: str, autor: str, 
@@ -142,6 +242,7 @@ class GestorLibros:
     def buscar_por_titulo_autor(self, termino: str) -> List[Libro]:
         """
         Busca libros por título o autor usando búsqueda lineal en el inventario general.
+        Los resultados se reutilizan desde la caché mientras no cambie el catálogo.
         
         Args:
             termino: Término de búsqueda (título o autor)
@@ -149,9 +250,29 @@ class GestorLibros:
         Returns:
             Lista de objetos Libro que coinciden con el término
         """
+        if self._version_cache != self.version_catalogo:
+            if self._cache_consultas:
+                self.estadisticas_cache["invalidaciones"] += 1
+                self._cache_consultas.clear()
+            self._version_cache = self.version_catalogo
+        
+        # La búsqueda no distingue mayúsculas ni tildes, así que esa es la clave normalizada
+        clave = normalizar_termino(termino)
+        resultados = self._cache_consultas.get(clave)
+        if resultados is not None:
+            self._cache_consultas.move_to_end(clave)
+            self.estadisticas_cache["aciertos"] += 1
+            return list(resultados)
+        
+        self.estadisticas_cache["fallos"] += 1
         from algoritmos_busqueda.busqueda import Busqueda
         busqueda = Busqueda()
-        return busqueda.busqueda_lineal(self.inventario_general, termino)
+        resultados = busqueda.busqueda_lineal(self.inventario_general, termino)
+        self._cache_consultas[clave] = resultados
+        if len(self._cache_consultas) > self.TAMANIO_CACHE:
+            self._cache_consultas.popitem(last=False)
+            self.estadisticas_cache["desalojos"] += 1
+        return list(resultados)
     
     def obtener_inventario_ordenado(self) -> List[Libro]:
         """
@@ -171,6 +292,119 @@ class GestorLibros:
         """
         return self.inventario_general
     
+    def obtener_inventario_por_valor(self) -> List[Libro]:
+        """
+        Retorna el inventario ordenado por valor ascendente (desempate por ISBN).
+        Se obtiene del índice por valor, sin volver a ordenar.
+        
+        Returns:
+            Lista de objetos Libro ordenada por valor
+        """
+        return self.indice_valor.en_orden()
+    
+    def libros_en_rango_valor(self, minimo: float, maximo: float) -> List[Libro]:
+        """
+        Obtiene los libros cuyo valor está entre dos montos (inclusive).
+        
+        Args:
+            minimo: Valor mínimo en pesos colombianos
+            maximo: Valor máximo en pesos colombianos
+            
+        Returns:
+            Lista de objetos Libro ordenada por valor
+        """
+        return self.indice_valor.en_rango(minimo, maximo)
+    
+    def libros_en_rango_peso(self, minimo: float, maximo: float) -> List[Libro]:
+        """
+        Obtiene los libros cuyo peso está entre dos valores (inclusive),
+        p. ej. los que caben en un estante.
+        
+        Args:
+            minimo: Peso mínimo en kilogramos
+            maximo: Peso máximo en kilogramos
+            
+        Returns:
+            Lista de objetos Libro ordenada por peso
+        """
+        return self.indice_peso.en_rango(minimo, maximo)
+    
+    def _indexar_consulta(self, libro: Libro) -> None:
+        """Agrega un libro a los índices de autor y de disponibles."""
+        self.indice_autor.setdefault(libro.autor_normalizado, []).append(libro)
+        if libro.esta_disponible():
+            self.disponibles[libro.clave] = libro
+    
+    def _desindexar_consulta(self, libro: Libro) -> None:
+        """Retira un libro de los índices de autor y de disponibles."""
+        del_autor = self.indice_autor.get(libro.autor_normalizado, [])
+        if libro in del_autor:
+            del_autor.remove(libro)
+            if not del_autor:
+                del self.indice_autor[libro.autor_normalizado]
+        if self.disponibles.get(libro.clave) is libro:
+            del self.disponibles[libro.clave]
+    
+    def _actualizar_disponibilidad(self, evento: Evento) -> None:
+        """Actualiza el índice de disponibles cuando cambia la disponibilidad de un libro."""
+        libro = evento.datos["libro"]
+        if libro.esta_disponible():
+            self.disponibles[libro.clave] = libro
+        elif self.disponibles.get(libro.clave) is libro:
+            del self.disponibles[libro.clave]
+    
+    def consultar(self, isbn: Optional[str] = None, autor: Optional[str] = None,
+                  termino: Optional[str] = None, valor_min: Optional[float] = None,
+                  valor_max: Optional[float] = None, peso_max: Optional[float] = None,
+                  solo_disponibles: bool = False, ordenar_por: Optional[str] = None,
+                  descendente: bool = False, limite: Optional[int] = None,
+                  explicar: bool = False) -> Union[List[Libro], PlanConsulta]:
+        """
+        Busca libros que cumplan todos los criterios indicados, p. ej. los
+        disponibles de un autor con valor entre dos montos y peso máximo,
+        ordenados por título. Se recorre solo el índice más selectivo (ISBN,
+        autor, valor, peso o disponibles) y los demás criterios se aplican como
+        filtros; ver funciones_libros.consulta.
+        
+        Args:
+            isbn: ISBN exacto
+            autor: Autor exacto (sin distinguir mayúsculas)
+            termino: Texto contenido en el título o el autor
+            valor_min: Valor mínimo en pesos colombianos (inclusive)
+            valor_max: Valor máximo en pesos colombianos (inclusive)
+            peso_max: Peso máximo en kilogramos (inclusive)
+            solo_disponibles: Si es True, solo libros con ejemplares disponibles
+            ordenar_por: "isbn", "titulo", "autor", "valor" o "peso" (None = orden del índice)
+            descendente: Si es True, orden de mayor a menor
+            limite: Número máximo de resultados
+            explicar: Si es True, no se ejecuta la consulta y se retorna el plan elegido
+            
+        Returns:
+            Lista de objetos Libro, o el PlanConsulta si explicar es True
+            
+        Raises:
+            ValueError: Si el campo de ordenamiento no existe
+        """
+        plan, filtros = planificar(self, isbn, autor, termino, valor_min, valor_max, peso_max,
+                                   solo_disponibles, ordenar_por, limite)
+        if explicar:
+            return plan
+        return ejecutar(plan, filtros, descendente)
+    
+    def exportar_catalogo_mapeado(self, archivo: str = "catalogo.sgbc") -> int:
+        """
+        Exporta el inventario al formato de catálogo mapeado en memoria
+        para kioscos de solo consulta.
+        
+        Args:
+            archivo: Ruta del archivo de catálogo a generar
+            
+        Returns:
+            Número de libros exportados
+        """
+        from .catalogo_mapeado import CatalogoMapeado
+        return CatalogoMapeado.escribir(self.inventario_ordenado, archivo)
+    
     def eliminar_libro(self, isbn: str) -> bool:
         """
         Elimina un libro del inventario.
@@ -184,9 +418,14 @@ class GestorLibros:
         libro = self.buscar_por_isbn_binaria(isbn)
         if libro:
             self.inventario_general.remove(libro)
+            self.indice_valor.eliminar(libro)
+            self.indice_peso.eliminar(libro)
+            self._desindexar_consulta(libro)
+            self.version_catalogo += 1
             self.inventario_ordenado = self.ordenamiento.ordenamiento_insercion(
                 [libro for libro in self.inventario_general]
             )
-            self.guardar_inventario()
+            self.guardar_si_corresponde()
+            self.eventos.emitir(LIBRO_ELIMINADO, libro=libro)
             return True
         return False
@@ -0,0 +1,148 @@
+"""
+Módulo que implementa un índice de libros ordenado por un campo numérico
+(valor o peso), para consultar rangos sin recorrer ni reordenar el inventario.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .libro import Libro
+
+
+class IndiceNumerico:
+    """
+    Índice de libros ordenado por un campo numérico, con el ISBN como
+    criterio de desempate.
+
+    Los valores del campo y las claves de ISBN se guardan en arreglos
+    compactos (array) y los libros en una lista, los tres en la misma
+    posición. Agregar o eliminar un libro cuesta una búsqueda binaria más el
+    desplazamiento de los arreglos, el recorrido en orden es directo y los
+    rangos se resuelven con búsqueda binaria en O(log n + k), donde k es el
+    número de resultados.
+
+    Atributos:
+        campo: Atributo numérico del libro por el que se ordena
+        valores: Valor del campo de cada posición (array de dobles)
+        claves: Clave del ISBN de cada posición (array de enteros de 64 bits)
+        libros: Libro de cada posición
+    """
+
+    def __init__(self, campo: str, libros: Iterable[Libro] = ()):
+        """
+        Inicializa el índice.
+
+        Args:
+            campo: Atributo numérico del libro ("valor" o "peso")
+            libros: Libros con los que se construye el índice
+        """
+        self.campo = campo
+        self.valores = array("d")
+        self.claves = array("q")
+        self.libros: List[Libro] = []
+        self.construir(libros)
+
+    def construir(self, libros: Iterable[Libro]) -> None:
+        """
+        Reconstruye el índice completo con un único ordenamiento.
+
+        Args:
+            libros: Libros a indexar
+        """
+        campo = self.campo
+        ordenados = sorted(libros, key=lambda libro: (getattr(libro, campo), libro.clave))
+        self.valores = array("d", (getattr(libro, campo) for libro in ordenados))
+        self.claves = array("q", (libro.clave for libro in ordenados))
+        self.libros = ordenados
+
+    def _posicion(self, libro: Libro) -> Tuple[int, int]:
+        """
+        Obtiene el intervalo de posiciones con el mismo valor y clave de un libro.
+
+        Returns:
+            Tupla (inicio, fin) del intervalo
+        """
+        valor = getattr(libro, self.campo)
+        inicio = bisect_left(self.valores, valor)
+        fin = bisect_right(self.valores, valor, inicio)
+        return (bisect_left(self.claves, libro.clave, inicio, fin),
+                bisect_right(self.claves, libro.clave, inicio, fin))
+
+    def agregar(self, libro: Libro) -> None:
+        """
+        Agrega un libro en su posición ordenada.
+
+        Args:
+            libro: Libro a agregar
+        """
+        _, posicion = self._posicion(libro)
+        self.valores.insert(posicion, getattr(libro, self.campo))
+        self.claves.insert(posicion, libro.clave)
+        self.libros.insert(posicion, libro)
+
+    def eliminar(self, libro: Libro) -> bool:
+        """
+        Elimina un libro del índice.
+
+        Args:
+            libro: Libro a eliminar
+
+        Returns:
+            True si se eliminó, False si no estaba en el índice
+        """
+        inicio, fin = self._posicion(libro)
+        for posicion in range(inicio, fin):
+            if self.libros[posicion] is libro:
+                del self.valores[posicion]
+                del self.claves[posicion]
+                del self.libros[posicion]
+                return True
+        return False
+
+    def en_orden(self) -> List[Libro]:
+        """
+        Retorna los libros en orden ascendente del campo.
+
+        Returns:
+            Lista de libros (copia) ordenada por el campo e ISBN
+        """
+        return list(self.libros)
+
+    def posiciones_rango(self, minimo: Optional[float] = None,
+                         maximo: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Obtiene las posiciones de los libros cuyo campo está en [minimo, maximo],
+        sin copiarlos; sirve también para saber cuántos son en O(log n).
+
+        Args:
+            minimo: Valor mínimo (None = sin límite)
+            maximo: Valor máximo (None = sin límite)
+
+        Returns:
+            Tupla (inicio, fin) del intervalo de posiciones en libros
+        """
+        inicio = bisect_left(self.valores, minimo) if minimo is not None else 0
+        fin = bisect_right(self.valores, maximo) if maximo is not None else len(self.valores)
+        return inicio, max(inicio, fin)
+
+    def en_rango(self, minimo: Optional[float] = None, maximo: Optional[float] = None) -> List[Libro]:
+        """
+        Obtiene los libros cuyo campo está en el intervalo [minimo, maximo].
+
+        Args:
+            minimo: Valor mínimo (None = sin límite)
+            maximo: Valor máximo (None = sin límite)
+
+        Returns:
+            Lista de libros ordenada por el campo
+        """
+        inicio, fin = self.posiciones_rango(minimo, maximo)
+        return self.libros[inicio:fin]
+
+    def __iter__(self) -> Iterator[Libro]:
+        """Recorre los libros en orden del campo."""
+        return iter(self.libros)
+
+    def __len__(self) -> int:
+        """Retorna el número de libros indexados."""
+        return len(self.libros)
@@ -0,0 +1,24 @@
+"""
+Módulo que implementa un índice de libros ordenado por valor, para generar
+el reporte por valor y consultar rangos de precio sin reordenar el inventario.
+"""
+
+from typing import Iterable
+from .indice_numerico import IndiceNumerico
+from .libro import Libro
+
+
+class IndiceValor(IndiceNumerico):
+    """
+    Índice de libros ordenado por valor, con el ISBN como criterio de
+    desempate (ver IndiceNumerico).
+    """
+
+    def __init__(self, libros: Iterable[Libro] = ()):
+        """
+        Inicializa el índice.
+
+        Args:
+            libros: Libros con los que se construye el índice
+        """
+        super().__init__("valor", libros)
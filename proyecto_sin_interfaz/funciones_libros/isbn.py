@@ -0,0 +1,149 @@
+"""
+Módulo que centraliza el tratamiento de los ISBN: normalización,
+validación del dígito de control y clave entera canónica.
+
+La clave de un libro es su ISBN-13 como entero (13 dígitos). Los ISBN-10
+se convierten a ISBN-13 con el prefijo 978, así que "84-376-0494-7" y
+"978-84-376-0494-7" tienen la misma clave. Libro calcula su clave una sola
+vez al construirse; el ordenamiento, la búsqueda binaria y los índices
+comparan esa clave en lugar de volver a limpiar el texto del ISBN.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class ISBNInvalido(ValueError):
+    """Error que indica un ISBN mal formado o con dígito de control incorrecto."""
+
+
+def limpiar_isbn(isbn: str) -> str:
+    """
+    Elimina guiones y espacios de un ISBN.
+
+    Args:
+        isbn: ISBN tal como se escribió
+
+    Returns:
+        ISBN sin separadores (la X final de un ISBN-10 en mayúscula)
+    """
+    return isbn.replace("-", "").replace(" ", "").upper()
+
+
+def _control_isbn13(digitos: str) -> int:
+    """Calcula el dígito de control de los 12 primeros dígitos de un ISBN-13."""
+    suma = 0
+    for posicion, digito in enumerate(digitos[:12]):
+        suma += int(digito) * (3 if posicion % 2 else 1)
+    return (10 - suma % 10) % 10
+
+
+def _isbn10_valido(digitos: str) -> bool:
+    """Verifica el dígito de control (módulo 11) de un ISBN-10 sin separadores."""
+    suma = 0
+    for posicion, digito in enumerate(digitos):
+        valor = 10 if digito == "X" and posicion == 9 else int(digito)
+        suma += valor * (10 - posicion)
+    return suma % 11 == 0
+
+
+def clave_isbn(isbn: str) -> int:
+    """
+    Obtiene la clave entera canónica (ISBN-13) de un ISBN-10 o ISBN-13.
+
+    Args:
+        isbn: ISBN con o sin guiones y espacios
+
+    Returns:
+        ISBN-13 como entero
+
+    Raises:
+        ISBNInvalido: Si el ISBN no tiene 10 o 13 dígitos o su dígito de control es incorrecto
+    """
+    digitos = limpiar_isbn(isbn)
+    if len(digitos) == 13 and digitos.isdigit():
+        if int(digitos[12]) != _control_isbn13(digitos):
+            raise ISBNInvalido(f"Dígito de control incorrecto en el ISBN '{isbn}'")
+        return int(digitos)
+    if len(digitos) == 10 and digitos[:9].isdigit() and (digitos[9].isdigit() or digitos[9] == "X"):
+        if not _isbn10_valido(digitos):
+            raise ISBNInvalido(f"Dígito de control incorrecto en el ISBN '{isbn}'")
+        cuerpo = "978" + digitos[:9]
+        return int(cuerpo + str(_control_isbn13(cuerpo)))
+    raise ISBNInvalido(f"ISBN mal formado: '{isbn}' (se esperan 10 o 13 dígitos)")
+
+
+def clave_isbn_o_none(isbn: str) -> Optional[int]:
+    """
+    Obtiene la clave de un ISBN de búsqueda sin lanzar errores.
+
+    Args:
+        isbn: ISBN a buscar
+
+    Returns:
+        Clave entera del ISBN, o None si no es un ISBN válido
+    """
+    try:
+        return clave_isbn(isbn)
+    except ISBNInvalido:
+        return None
+
+
+def es_isbn_valido(isbn: str) -> bool:
+    """
+    Indica si un ISBN-10 o ISBN-13 es válido.
+
+    Args:
+        isbn: ISBN con o sin separadores
+
+    Returns:
+        True si el formato y el dígito de control son correctos
+    """
+    return clave_isbn_o_none(isbn) is not None
+
+
+def isbn13(clave: int) -> str:
+    """
+    Convierte una clave entera en el texto del ISBN-13 (sin separadores).
+
+    Args:
+        clave: Clave entera del ISBN
+
+    Returns:
+        ISBN-13 de 13 dígitos
+    """
+    return f"{clave:013d}"
+
+
+def registros_validos(registros: Iterable[Dict[str, Any]],
+                      rechazados: Optional[List[Dict[str, Any]]] = None
+                      ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Recorre los registros de un archivo de inventario omitiendo los que
+    tienen un ISBN inválido o repetido (dos escrituras del mismo ISBN son
+    un solo libro). Es la regla que aplican todos los que cargan el
+    inventario, para que coincidan en qué libros existen.
+
+    Args:
+        registros: Registros del inventario
+        rechazados: Lista donde se agregan los registros omitidos (opcional)
+
+    Returns:
+        Iterador de tuplas (clave del ISBN, registro) de los registros válidos
+    """
+    claves = set()
+    for registro in registros:
+        try:
+            clave = clave_isbn(registro["ISBN"])
+        except ISBNInvalido as e:
+            # Un ISBN inválido descarta solo ese libro, no todo el inventario
+            print(f"Libro omitido al cargar inventario: {e}")
+            if rechazados is not None:
+                rechazados.append(registro)
+            continue
+        if clave in claves:
+            print(f"Libro omitido al cargar inventario: ISBN '{registro['ISBN']}' duplicado")
+            if rechazados is not None:
+                rechazados.append(registro)
+            continue
+        claves.add(clave)
+        yield clave, registro
@@ -3,6 +3,8 @@ Módulo que define la clase Libro para representar un libro en el sistema.
 """
 
 from typing import Dict, Any
+from .isbn import clave_isbn
+from .texto import normalizar_texto
 
 class Libro:
     """
@@ -10,8 +12,11 @@ class Libro:
     
     Atributos:
         isbn: Identificador único del libro
+        clave: ISBN-13 como entero, calculado una vez al asignar el ISBN
         titulo: Título del libro
         autor: Autor del libro
+        titulo_normalizado: Título sin mayúsculas ni tildes, para comparar (ver texto.py)
+        autor_normalizado: Autor sin mayúsculas ni tildes, para comparar
         peso: Peso del libro en kilogramos
         valor: Valor del libro en pesos colombianos
         cantidad: Cantidad total de ejemplares
@@ -31,6 +36,9 @@ class Libro:
             valor: Valor del libro en pesos colombianos
             cantidad: Cantidad total de ejemplares
             cantidad_presente: Cantidad de ejemplares disponibles (por defecto igual a cantidad)
+            
+        Raises:
+            ISBNInvalido: Si el ISBN está mal formado o su dígito de control es incorrecto
         """
         self.isbn = isbn
         self.titulo = titulo
@@ -40,6 +48,53 @@ class Libro:
         self.cantidad = cantidad
         self.cantidad_presente = cantidad_presente if cantidad_presente is not None else cantidad
     
+    @property
+    def isbn(self) -> str:
+        """ISBN del libro tal como se registró."""
+        return self._isbn
+    
+    @isbn.setter
+    def isbn(self, isbn: str) -> None:
+        """Asigna el ISBN y calcula su clave; rechaza los ISBN inválidos."""
+        self.clave = clave_isbn(isbn)
+        self._isbn = isbn
+    
+    @property
+    def titulo(self) -> str:
+        """Título del libro."""
+        return self._titulo
+    
+    @titulo.setter
+    def titulo(self, titulo: str) -> None:
+        """Asigna el título y descarta su forma normalizada anterior."""
+        self._titulo = titulo
+        self._titulo_normalizado = None
+    
+    @property
+    def titulo_normalizado(self) -> str:
+        """Título sin mayúsculas ni tildes, calculado la primera vez que se usa."""
+        if self._titulo_normalizado is None:
+            self._titulo_normalizado = normalizar_texto(self._titulo)
+        return self._titulo_normalizado
+    
+    @property
+    def autor(self) -> str:
+        """Autor del libro."""
+        return self._autor
+    
+    @autor.setter
+    def autor(self, autor: str) -> None:
+        """Asigna el autor y descarta su forma normalizada anterior."""
+        self._autor = autor
+        self._autor_normalizado = None
+    
+    @property
+    def autor_normalizado(self) -> str:
+        """Autor sin mayúsculas ni tildes, calculado la primera vez que se usa."""
+        if self._autor_normalizado is None:
+            self._autor_normalizado = normalizar_texto(self._autor)
+        return self._autor_normalizado
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convierte el objeto Libro a un diccionario.
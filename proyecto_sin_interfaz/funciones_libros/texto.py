@@ -0,0 +1,44 @@
+"""
+Módulo que centraliza la normalización de textos para comparar títulos y
+autores sin distinguir mayúsculas ni tildes.
+
+La forma normalizada se obtiene con casefold y eliminando las marcas
+diacríticas (descomposición NFKD), de modo que "García", "GARCIA" y
+"garcia" coinciden. Libro guarda la forma normalizada de su título y su
+autor la primera vez que se usa; las búsquedas, los totales por autor y
+los ordenamientos por nombre comparan esas formas en lugar de convertir
+el texto de cada libro en cada consulta.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Obtiene la forma de comparación de un texto: sin distinción de
+    mayúsculas y sin tildes ni otras marcas diacríticas.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Texto normalizado
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+
+@lru_cache(maxsize=256)
+def normalizar_termino(termino: str) -> str:
+    """
+    Normaliza un término de consulta (ver normalizar_texto). Los términos
+    se repiten entre consultas, así que sus formas se guardan en caché.
+
+    Args:
+        termino: Término de búsqueda o nombre consultado
+
+    Returns:
+        Término normalizado
+    """
+    return normalizar_texto(termino)
@@ -0,0 +1,238 @@
+"""
+Módulo de analítica de circulación: libros más prestados, usuarios más
+activos y préstamos por día.
+
+Los contadores se actualizan de forma incremental con los eventos
+PRESTAMO_REGISTRADO del bus de eventos, así que las consultas no vuelven a
+recorrer el historial ni a convertir fechas. Se mantienen dos niveles:
+- una ventana reciente (por defecto 30 días) con contadores exactos por
+  día, por ISBN y por usuario
+- toda la historia (incluido el archivo histórico) con sketches
+  Count-Min y resúmenes Space-Saving de memoria acotada, de modo que las
+  consultas de los N más frecuentes cuestan O(k) sin importar cuántos
+  préstamos se hayan registrado
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+from estructuras_datos.eventos import Evento, PRESTAMO_REGISTRADO, HISTORIAL_RECARGADO
+from estructuras_datos.sketches import CountMinSketch, ElementosFrecuentes
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+
+FORMATO_DIA = "%Y-%m-%d"
+
+
+class AnaliticaCirculacion:
+    """
+    Clase que agrega los préstamos en contadores para los tableros de
+    circulación.
+
+    Los contadores se construyen la primera vez que se consultan (recorriendo
+    una sola vez el historial en memoria y los segmentos archivados) y desde
+    entonces solo se actualizan con los préstamos nuevos. Archivar préstamos
+    no cambia los conteos (solo los mueve al archivo histórico); si el
+    historial se recarga de verdad (desde el archivo o al desapilar un
+    préstamo), se reconstruyen en la siguiente consulta.
+
+    Atributos:
+        gestor_prestamos: Gestor de préstamos observado
+        dias_ventana: Días de la ventana reciente con contadores exactos
+        libros: Resumen Space-Saving de los ISBN más prestados de toda la historia
+        usuarios: Resumen Space-Saving de los usuarios más activos de toda la historia
+        sketch_libros: Sketch Count-Min de préstamos por ISBN
+        sketch_usuarios: Sketch Count-Min de préstamos por usuario
+    """
+
+    def __init__(self, gestor_prestamos: GestorPrestamos, dias_ventana: int = 30,
+                 capacidad: int = 100, ancho_sketch: int = 2048):
+        """
+        Inicializa la analítica y se suscribe a los préstamos nuevos.
+
+        Args:
+            gestor_prestamos: Gestor de préstamos observado
+            dias_ventana: Días de la ventana reciente con contadores exactos
+            capacidad: Elementos vigilados por los resúmenes de más frecuentes
+            ancho_sketch: Contadores por fila de los sketches Count-Min
+        """
+        self.gestor_prestamos = gestor_prestamos
+        self.dias_ventana = dias_ventana
+        self.capacidad = capacidad
+        self.ancho_sketch = ancho_sketch
+        self._iniciada = False
+        gestor_prestamos.eventos.suscribir(self._recibir, (PRESTAMO_REGISTRADO, HISTORIAL_RECARGADO))
+
+    def _reiniciar(self) -> None:
+        """Deja todos los contadores en cero."""
+        self.libros = ElementosFrecuentes(self.capacidad)
+        self.usuarios = ElementosFrecuentes(self.capacidad)
+        self.sketch_libros = CountMinSketch(self.ancho_sketch)
+        self.sketch_usuarios = CountMinSketch(self.ancho_sketch)
+        self.total_prestamos = 0
+        # Ventana reciente: día -> (préstamos, por ISBN, por usuario), más
+        # los totales de la ventana para responder sin sumar los días
+        self._dias: Dict[str, Tuple[List[int], Counter, Counter]] = {}
+        self._ventana_libros: Counter = Counter()
+        self._ventana_usuarios: Counter = Counter()
+        self._ultimo_dia = ""
+        self._corte = ""
+
+    def _iniciar(self, ahora: Optional[datetime] = None) -> None:
+        """
+        Construye los contadores si aún no existen y descarta de la ventana
+        los días que quedaron fuera.
+
+        Args:
+            ahora: Fecha de referencia de la ventana (por defecto, la fecha actual)
+        """
+        hoy = (ahora or datetime.now()).strftime(FORMATO_DIA)
+        if not self._iniciada:
+            self._reiniciar()
+            self._avanzar(hoy)
+            historial = self.gestor_prestamos.historial
+            for registro in chain(historial.archivo_historico.iterar_registros(), historial.elementos):
+                self._registrar(registro)
+            self._iniciada = True
+        elif hoy > self._ultimo_dia:
+            self._avanzar(hoy)
+
+    def _recibir(self, evento: Evento) -> None:
+        """Actualiza los contadores con un evento del historial."""
+        if not self._iniciada:
+            return
+        if evento.tipo == HISTORIAL_RECARGADO:
+            if "archivados" not in evento.datos:
+                self._iniciada = False
+        else:
+            self._registrar(evento.datos["registro"])
+
+    def _avanzar(self, dia: str) -> None:
+        """
+        Mueve la ventana para que termine en un día y descarta los días
+        anteriores al nuevo corte.
+
+        Args:
+            dia: Último día de la ventana (AAAA-MM-DD)
+        """
+        self._ultimo_dia = dia
+        fin = datetime(int(dia[0:4]), int(dia[5:7]), int(dia[8:10]))
+        self._corte = (fin - timedelta(days=self.dias_ventana - 1)).strftime(FORMATO_DIA)
+        for viejo in [d for d in self._dias if d < self._corte]:
+            _, por_libro, por_usuario = self._dias.pop(viejo)
+            self._ventana_libros -= por_libro
+            self._ventana_usuarios -= por_usuario
+
+    def _registrar(self, registro: Dict[str, Any]) -> None:
+        """
+        Suma un préstamo a los contadores.
+
+        Args:
+            registro: Diccionario del préstamo (ISBN, Fecha, Usuario)
+        """
+        isbn = registro["ISBN"]
+        usuario = registro["Usuario"]
+        self.total_prestamos += 1
+        self.libros.agregar(isbn)
+        self.usuarios.agregar(usuario)
+        self.sketch_libros.agregar(isbn)
+        self.sketch_usuarios.agregar(usuario)
+
+        # El día son los 10 primeros caracteres de la fecha: no hace falta convertirla
+        dia = registro["Fecha"][:10]
+        if dia < self._corte:
+            return
+        if dia > self._ultimo_dia:
+            self._avanzar(dia)
+        contadores = self._dias.get(dia)
+        if contadores is None:
+            contadores = self._dias[dia] = ([0], Counter(), Counter())
+        contadores[0][0] += 1
+        contadores[1][isbn] += 1
+        contadores[2][usuario] += 1
+        self._ventana_libros[isbn] += 1
+        self._ventana_usuarios[usuario] += 1
+
+    def libros_mas_prestados(self, n: int = 10, recientes: bool = False,
+                             ahora: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """
+        Obtiene los ISBN más prestados.
+
+        Args:
+            n: Número de libros a retornar
+            recientes: Si es True, cuenta exacta de la ventana reciente; si no,
+                       cuenta aproximada (cota superior) de toda la historia
+            ahora: Fecha de referencia de la ventana (por defecto, la fecha actual)
+
+        Returns:
+            Lista de tuplas (ISBN, préstamos), de mayor a menor
+        """
+        self._iniciar(ahora)
+        if recientes:
+            return self._ventana_libros.most_common(n)
+        return [(isbn, cuenta) for isbn, cuenta, _ in self.libros.mas_frecuentes(n)]
+
+    def usuarios_mas_activos(self, n: int = 10, recientes: bool = False,
+                             ahora: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """
+        Obtiene los usuarios con más préstamos.
+
+        Args:
+            n: Número de usuarios a retornar
+            recientes: Si es True, cuenta exacta de la ventana reciente; si no,
+                       cuenta aproximada (cota superior) de toda la historia
+            ahora: Fecha de referencia de la ventana (por defecto, la fecha actual)
+
+        Returns:
+            Lista de tuplas (usuario, préstamos), de mayor a menor
+        """
+        self._iniciar(ahora)
+        if recientes:
+            return self._ventana_usuarios.most_common(n)
+        return [(usuario, cuenta) for usuario, cuenta, _ in self.usuarios.mas_frecuentes(n)]
+
+    def prestamos_por_dia(self, ahora: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """
+        Obtiene la cantidad exacta de préstamos de cada día de la ventana.
+
+        Args:
+            ahora: Fecha de referencia de la ventana (por defecto, la fecha actual)
+
+        Returns:
+            Lista de tuplas (día AAAA-MM-DD, préstamos) en orden cronológico,
+            incluidos los días sin préstamos
+        """
+        self._iniciar(ahora)
+        fin = datetime.strptime(self._ultimo_dia, FORMATO_DIA)
+        resultado = []
+        for atras in range(self.dias_ventana - 1, -1, -1):
+            dia = (fin - timedelta(days=atras)).strftime(FORMATO_DIA)
+            contadores = self._dias.get(dia)
+            resultado.append((dia, contadores[0][0] if contadores else 0))
+        return resultado
+
+    def prestamos_libro(self, isbn: str) -> int:
+        """
+        Estima los préstamos de un ISBN en toda la historia.
+
+        Args:
+            isbn: ISBN del libro
+
+        Returns:
+            Cota superior de los préstamos del libro
+        """
+        self._iniciar()
+        return self.sketch_libros.estimar(isbn)
+
+    def prestamos_usuario(self, usuario: str) -> int:
+        """
+        Estima los préstamos de un usuario en toda la historia.
+
+        Args:
+            usuario: Nombre del usuario
+
+        Returns:
+            Cota superior de los préstamos del usuario
+        """
+        self._iniciar()
+        return self.sketch_usuarios.estimar(usuario)
@@ -2,68 +2,286 @@
 Módulo que gestiona los usuarios del sistema.
 """
 
-from typing import List, Optional
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from funciones_libros.texto import normalizar_texto
+from persistencia.diario import DiarioCambios
+from persistencia.serializador import escribir_registros, leer_registros
 
 class Usuario:
     """
     Clase que representa un usuario del sistema.
-    
+
     Atributos:
         nombre: Nombre del usuario
         identificacion: Identificación única del usuario
     """
-    
+
     def __init__(self, nombre: str, identificacion: str):
         """
         Inicializa un usuario.
-        
+
         Args:
             nombre: Nombre del usuario
             identificacion: Identificación única
         """
         self.nombre = nombre
         self.identificacion = identificacion
-    
+
+    def to_dict(self) -> dict:
+        """
+        Convierte el usuario a un diccionario para serialización JSON.
+
+        Returns:
+            Diccionario con los atributos del usuario
+        """
+        return {
+            "Nombre": self.nombre,
+            "Identificacion": self.identificacion
+        }
+
+    @classmethod
+    def from_dict(cls, datos: dict) -> 'Usuario':
+        """
+        Crea un objeto Usuario desde un diccionario.
+
+        Args:
+            datos: Diccionario con los datos del usuario
+
+        Returns:
+            Objeto Usuario
+        """
+        return cls(nombre=datos["Nombre"], identificacion=datos["Identificacion"])
+
     def __str__(self) -> str:
         """Retorna una representación en string del usuario."""
         return f"Usuario: {self.nombre} (ID: {self.identificacion})"
 
+# Cambios en el diario de usuarios a partir de los cuales se escribe la instantánea
+LIMITE_DIARIO = 1000
+
 class GestorUsuario:
     """
     Clase que gestiona los usuarios del sistema.
+
+    Los usuarios se indexan por identificación en un diccionario (búsqueda
+    O(1) y sin duplicados) y por nombre normalizado en un índice secundario.
+    La persistencia combina una instantánea JSON completa con un diario de
+    cambios: cada alta o baja individual solo agrega una línea al diario, y
+    guardar_usuarios escribe la instantánea y vacía el diario. La
+    instantánea se escribe sola cuando el diario llega a limite_diario
+    cambios, para que no crezca sin límite ni alargue la carga al iniciar.
+
+    Atributos:
+        indice_id: Diccionario identificación -> Usuario, en orden de registro
+        indice_nombre: Diccionario nombre normalizado -> lista de usuarios
+        archivo: Ruta del archivo JSON con la instantánea de usuarios
+        diario: Diario de cambios pendientes de consolidar
+        autoguardado: Si es True, cada modificación se registra inmediatamente en el diario
+        limite_diario: Cambios en el diario a partir de los cuales se consolida
     """
-    
-    def __init__(self):
-        """Inicializa el gestor de usuarios."""
-        self.usuarios: List[Usuario] = []
-    
-    def agregar_usuario(self, nombre: str, identificacion: str) -> Usuario:
+
+    def __init__(self, archivo: str = "usuarios.json", limite_diario: int = LIMITE_DIARIO):
+        """
+        Inicializa el gestor de usuarios y carga los usuarios desde archivo.
+
+        Args:
+            archivo: Ruta del archivo JSON con los usuarios
+            limite_diario: Cambios en el diario a partir de los cuales se consolida
+        """
+        self.archivo = archivo
+        self.limite_diario = limite_diario
+        self.diario = DiarioCambios(archivo + ".diario")
+        self.autoguardado = True
+        self.indice_id: Dict[str, Usuario] = {}
+        self.indice_nombre: Dict[str, List[Usuario]] = {}
+        self.cargar_usuarios()
+
+    @property
+    def usuarios(self) -> List[Usuario]:
+        """Lista de usuarios en orden de registro."""
+        return list(self.indice_id.values())
+
+    @staticmethod
+    def _normalizar_nombre(nombre: str) -> str:
+        """Normaliza un nombre para el índice secundario (sin tildes, mayúsculas ni espacios repetidos)."""
+        return " ".join(normalizar_texto(nombre).split())
+
+    def _ruta_archivo(self) -> str:
+        """Obtiene la ruta completa del archivo de usuarios."""
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(os.path.dirname(dir_actual))
+        return os.path.join(dir_proyecto, self.archivo)
+
+    def _indexar(self, usuario: Usuario) -> bool:
+        """
+        Agrega un usuario a los índices.
+
+        Args:
+            usuario: Usuario a indexar
+
+        Returns:
+            True si se agregó, False si la identificación ya existía
+        """
+        if usuario.identificacion in self.indice_id:
+            return False
+        self.indice_id[usuario.identificacion] = usuario
+        self.indice_nombre.setdefault(self._normalizar_nombre(usuario.nombre), []).append(usuario)
+        return True
+
+    def _desindexar(self, identificacion: str) -> Optional[Usuario]:
+        """
+        Retira un usuario de los índices.
+
+        Args:
+            identificacion: Identificación del usuario
+
+        Returns:
+            Usuario retirado, o None si no existía
+        """
+        usuario = self.indice_id.pop(identificacion, None)
+        if usuario is None:
+            return None
+        clave = self._normalizar_nombre(usuario.nombre)
+        homonimos = self.indice_nombre.get(clave, [])
+        homonimos.remove(usuario)
+        if not homonimos:
+            self.indice_nombre.pop(clave, None)
+        return usuario
+
+    def cargar_usuarios(self) -> None:
+        """
+        Carga la instantánea de usuarios y aplica los cambios del diario.
+        """
+        self.indice_id = {}
+        self.indice_nombre = {}
+        try:
+            ruta_archivo = self._ruta_archivo()
+            if os.path.exists(ruta_archivo):
+                for registro in leer_registros(ruta_archivo):
+                    self._indexar(Usuario.from_dict(registro))
+
+            # Los cambios se aplican de forma idempotente: un alta repetida o
+            # una baja inexistente (p. ej. tras una consolidación interrumpida)
+            # no alteran el resultado
+            for operacion, registro in self.diario.leer():
+                if operacion == "alta":
+                    self._indexar(Usuario.from_dict(registro))
+                elif operacion == "baja":
+                    self._desindexar(registro["Identificacion"])
+        except Exception as e:
+            print(f"Error al cargar usuarios: {e}")
+            self.indice_id = {}
+            self.indice_nombre = {}
+
+    def guardar_usuarios(self) -> None:
+        """Guarda la instantánea completa de usuarios y vacía el diario."""
+        try:
+            escribir_registros(self._ruta_archivo(),
+                               (usuario.to_dict() for usuario in self.indice_id.values()))
+            self.diario.vaciar()
+        except Exception as e:
+            print(f"Error al guardar usuarios: {e}")
+
+    def consolidar(self) -> None:
+        """Guarda la instantánea si el diario tiene cambios (p. ej. al cerrar la aplicación)."""
+        if self.diario.entradas:
+            self.guardar_usuarios()
+
+    def _anexar_al_diario(self, operacion: str, datos: Dict[str, Any]) -> None:
+        """Registra un cambio en el diario y lo consolida si llegó al límite."""
+        self.diario.anexar(operacion, datos)
+        if self.diario.entradas >= self.limite_diario:
+            self.guardar_usuarios()
+
+    def agregar_usuario(self, nombre: str, identificacion: str) -> Optional[Usuario]:
         """
         Agrega un nuevo usuario al sistema.
-        
+
         Args:
             nombre: Nombre del usuario
             identificacion: Identificación única
-            
+
         Returns:
-            Objeto Usuario creado
+            Objeto Usuario creado, o None si la identificación ya estaba registrada
         """
         usuario = Usuario(nombre, identificacion)
-        self.usuarios.append(usuario)
+        if not self._indexar(usuario):
+            return None
+        if self.autoguardado:
+            self._anexar_al_diario("alta", usuario.to_dict())
         return usuario
-    
+
+    def registrar_masivo(self, registros: Iterable[Union[Usuario, Dict[str, Any], Tuple[str, str]]]) -> Tuple[int, int]:
+        """
+        Registra muchos usuarios en una sola pasada, sin escribir en el
+        diario por cada uno. Al terminar se guarda una única instantánea.
+
+        Args:
+            registros: Usuarios, diccionarios con Nombre e Identificacion,
+                       o tuplas (nombre, identificación)
+
+        Returns:
+            Tupla (usuarios agregados, duplicados descartados)
+        """
+        agregados = 0
+        duplicados = 0
+        for registro in registros:
+            if isinstance(registro, Usuario):
+                usuario = registro
+            elif isinstance(registro, dict):
+                usuario = Usuario.from_dict(registro)
+            else:
+                usuario = Usuario(registro[0], registro[1])
+            if self._indexar(usuario):
+                agregados += 1
+            else:
+                duplicados += 1
+        if agregados and self.autoguardado:
+            self.guardar_usuarios()
+        return (agregados, duplicados)
+
+    def eliminar_usuario(self, identificacion: str) -> bool:
+        """
+        Elimina un usuario del sistema.
+
+        Args:
+            identificacion: Identificación del usuario
+
+        Returns:
+            True si se eliminó, False si no existía
+        """
+        if self._desindexar(identificacion) is None:
+            return False
+        if self.autoguardado:
+            self._anexar_al_diario("baja", {"Identificacion": identificacion})
+        return True
+
     def buscar_usuario(self, identificacion: str) -> Optional[Usuario]:
         """
-        Busca un usuario por identificación.
-        
+        Busca un usuario por identificación en O(1).
+
         Args:
             identificacion: Identificación del usuario
-            
+
         Returns:
             Objeto Usuario si se encuentra, None en caso contrario
         """
-        for usuario in self.usuarios:
-            if usuario.identificacion == identificacion:
-                return usuario
-        return None
+        return self.indice_id.get(identificacion)
+
+    def buscar_por_nombre(self, nombre: str) -> List[Usuario]:
+        """
+        Busca los usuarios con un nombre dado (sin distinguir mayúsculas,
+        tildes ni espacios repetidos), p. ej. "José" y "jose".
+
+        Args:
+            nombre: Nombre del usuario
+
+        Returns:
+            Lista de usuarios con ese nombre
+        """
+        return list(self.indice_nombre.get(self._normalizar_nombre(nombre), []))
 
+    def __len__(self) -> int:
+        """Retorna el número de usuarios registrados."""
+        return len(self.indice_id)
@@ -2,72 +2,183 @@
 Módulo que gestiona los préstamos y devoluciones de libros.
 """
 
-from datetime import datetime
-from typing import Optional, Tuple
-from estructuras_datos.pila import Pila
-from estructuras_datos.cola import Cola
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from estructuras_datos.eventos import LIBRO_ACTUALIZADO
+from estructuras_datos.pila import Pila, FORMATO_FECHA
+from estructuras_datos.planificador_reservas import PlanificadorReservas, PRIORIDAD_GENERAL
 from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario, Usuario
 from algoritmos_busqueda.busqueda import Busqueda
+from persistencia.escritor_diferido import EscritorDiferido
 
 class GestorPrestamos:
     """
     Clase que gestiona los préstamos y devoluciones de libros.
-    Utiliza pilas para el historial y colas para las reservas.
+    Utiliza pilas para el historial y colas con prioridad para las reservas.
+    
+    Todos los cambios (disponibilidad de libros, historial y reservas) se
+    emiten en el bus de eventos del gestor de libros, de modo que un solo
+    suscriptor recibe los de todo el sistema en orden.
     
     Atributos:
         gestor_libros: Instancia del gestor de libros
+        eventos: Bus de eventos compartido con el gestor de libros
         historial: Pila que almacena el historial de préstamos
-        reservas: Cola que almacena las reservas de libros agotados
+        reservas: Planificador que almacena las reservas de libros agotados
         busqueda: Instancia de la clase de búsqueda
+        dias_prestamo: Días de préstamo antes del vencimiento
+        gestor_usuarios: Gestor de usuarios registrados (opcional)
+        escritor: Escritor diferido con el que se guardan los archivos (None = guardar en el momento)
     """
     
-    def __init__(self, gestor_libros: GestorLibros):
+    def __init__(self, gestor_libros: GestorLibros,
+                 archivo_historial: str = "historial_prestamos.json",
+                 archivo_reservas: str = "reservas.json",
+                 dias_prestamo: int = 14,
+                 gestor_usuarios: Optional[GestorUsuario] = None):
         """
         Inicializa el gestor de préstamos.
         
         Args:
             gestor_libros: Instancia del gestor de libros
+            archivo_historial: Ruta del archivo JSON del historial de préstamos
+            archivo_reservas: Ruta del archivo JSON de las reservas
+            dias_prestamo: Días de préstamo antes del vencimiento
+            gestor_usuarios: Gestor de usuarios registrados; si se indica, los
+                             usuarios pueden identificarse por su identificación
         """
         self.gestor_libros = gestor_libros
-        self.historial = Pila()
-        self.reservas = Cola()
+        self.dias_prestamo = dias_prestamo
+        self.historial = Pila(archivo_historial)
+        self.reservas = PlanificadorReservas(archivo_reservas)
+        self.eventos = gestor_libros.eventos
+        self.historial.eventos = self.reservas.eventos = self.eventos
         self.busqueda = Busqueda()
+        self.gestor_usuarios = gestor_usuarios
+        self.escritor: Optional[EscritorDiferido] = None
+    
+    def usar_escritor(self, escritor: Optional[EscritorDiferido]) -> None:
+        """
+        Hace que el inventario, el historial y las reservas se guarden en
+        segundo plano: cada cambio solo programa la escritura y el escritor
+        agrupa los cambios cercanos en una sola escritura por archivo.
+        
+        Args:
+            escritor: Escritor diferido (None = volver a guardar en el momento)
+        """
+        if self.escritor is not None:
+            self.escritor.vaciar()
+        self.escritor = escritor
+        for almacen in (self.gestor_libros, self.historial, self.reservas):
+            almacen.escritor = escritor
+    
+    def resolver_usuario(self, referencia: str) -> Optional[Usuario]:
+        """
+        Obtiene el usuario registrado que corresponde a una referencia.
+        Se busca primero por identificación y luego por nombre, ambos en O(1).
+        
+        Args:
+            referencia: Identificación o nombre del usuario
+            
+        Returns:
+            Objeto Usuario, o None si no hay gestor de usuarios, no existe o
+            el nombre corresponde a varios usuarios
+        """
+        if self.gestor_usuarios is None:
+            return None
+        usuario = self.gestor_usuarios.buscar_usuario(referencia)
+        if usuario is not None:
+            return usuario
+        homonimos = self.gestor_usuarios.buscar_por_nombre(referencia)
+        return homonimos[0] if len(homonimos) == 1 else None
     
-    def prestar_libro(self, isbn: str, usuario: str) -> Tuple[bool, str]:
+    def _nombre_usuario(self, referencia: str) -> str:
+        """
+        Obtiene el nombre con el que se registra un usuario en el historial y
+        las reservas: el nombre del usuario registrado si la referencia es su
+        identificación, o la propia referencia en caso contrario.
+        
+        Args:
+            referencia: Identificación o nombre del usuario
+            
+        Returns:
+            Nombre del usuario
+        """
+        if self.gestor_usuarios is None:
+            return referencia
+        usuario = self.gestor_usuarios.buscar_usuario(referencia)
+        return usuario.nombre if usuario is not None else referencia
+    
+    def prestar_libro(self, isbn: str, usuario: str, 
+                      prioridad: int = PRIORIDAD_GENERAL) -> Tuple[bool, str]:
         """
         Presta un libro a un usuario.
         Si el libro no está disponible, se agrega a la cola de reservas.
         
         Args:
             isbn: ISBN del libro a prestar
-            usuario: Nombre del usuario
+            usuario: Nombre o identificación del usuario
+            prioridad: Prioridad de la reserva si el libro no está disponible
             
         Returns:
             Tupla (éxito, mensaje)
         """
+        usuario = self._nombre_usuario(usuario)
+        
         # Buscar el libro usando búsqueda binaria (crítica)
         libro = self.gestor_libros.buscar_por_isbn_binaria(isbn)
         
         if libro is None:
             return (False, f"Libro con ISBN {isbn} no encontrado.")
         
+        # El historial y las reservas se registran con el ISBN del libro, no
+        # con la escritura usada en la consulta (ISBN-10, ISBN-13, con guiones)
+        isbn = libro.isbn
+        
         if libro.esta_disponible():
             # Prestar el libro
             libro.prestar()
-            fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.eventos.emitir(LIBRO_ACTUALIZADO, libro=libro)
+            ahora = datetime.now()
+            fecha = ahora.strftime(FORMATO_FECHA)
+            vence = (ahora + timedelta(days=self.dias_prestamo)).strftime(FORMATO_FECHA)
             
             # Apilar en el historial (Pila LIFO)
-            self.historial.apilar(isbn, fecha, usuario)
+            self.historial.apilar(isbn, fecha, usuario, vence)
             
             # Guardar cambios en el inventario
-            self.gestor_libros.guardar_inventario()
+            self.gestor_libros.guardar_si_corresponde()
             
             return (True, f"Libro '{libro.titulo}' prestado exitosamente a {usuario}.")
         else:
-            # Agregar a la cola de reservas (Cola FIFO)
-            self.reservas.encolar(isbn, usuario)
+            # Agregar a la cola de reservas (por prioridad y orden de llegada)
+            self.reservas.encolar(isbn, usuario, prioridad)
             return (False, f"Libro '{libro.titulo}' no disponible. Se agregó a la lista de espera.")
     
+    def reservar_libro(self, isbn: str, usuario: str, 
+                       prioridad: int = PRIORIDAD_GENERAL) -> Tuple[bool, str]:
+        """
+        Agrega directamente una reserva a la cola de espera de un libro.
+        
+        Args:
+            isbn: ISBN del libro a reservar
+            usuario: Nombre o identificación del usuario
+            prioridad: Clase de prioridad de la reserva
+            
+        Returns:
+            Tupla (éxito, mensaje)
+        """
+        usuario = self._nombre_usuario(usuario)
+        libro = self.gestor_libros.buscar_por_isbn_binaria(isbn)
+        
+        if libro is None:
+            return (False, f"Libro con ISBN {isbn} no encontrado.")
+        
+        self.reservas.encolar(libro.isbn, usuario, prioridad)
+        return (True, f"Reserva de '{libro.titulo}' registrada para {usuario}.")
+    
     def devolver_libro(self, isbn: str, usuario: str) -> Tuple[bool, str]:
         """
         Devuelve un libro al inventario.
@@ -75,48 +186,190 @@ class GestorPrestamos:
         
         Args:
             isbn: ISBN del libro a devolver
-            usuario: Nombre del usuario
+            usuario: Nombre o identificación del usuario
             
         Returns:
             Tupla (éxito, mensaje)
         """
+        usuario = self._nombre_usuario(usuario)
+        
         # Buscar el libro usando búsqueda binaria (crítica)
         libro = self.gestor_libros.buscar_por_isbn_binaria(isbn)
         
         if libro is None:
             return (False, f"Libro con ISBN {isbn} no encontrado.")
+        isbn = libro.isbn
         
-        # Devolver el libro
+        # Cerrar el préstamo activo; sin préstamo no se repone el ejemplar
+        prestamo = self.historial.marcar_devuelto(isbn, usuario,
+                                                  datetime.now().strftime(FORMATO_FECHA))
+        if prestamo is None:
+            return (False, f"{usuario} no tiene un préstamo activo de '{libro.titulo}'.")
         libro.devolver()
+        self.eventos.emitir(LIBRO_ACTUALIZADO, libro=libro)
         
         # Verificar si hay reservas pendientes para este ISBN
-        reservas_isbn = self.reservas.obtener_reservas_isbn(isbn)
-        
         mensaje = f"Libro '{libro.titulo}' devuelto exitosamente."
         
-        if reservas_isbn:
-            # Asignar a la primera persona en la cola (FIFO)
-            reserva = self.reservas.desencolar()
+        # Asignar al siguiente usuario en espera de este ISBN (por prioridad y llegada)
+        reserva = self.reservas.siguiente_reserva(isbn) if self.reservas.tiene_reservas(isbn) else None
+        if reserva is not None:
             mensaje += f"\nSe asignó automáticamente a {reserva['Usuario']} (reserva pendiente)."
             
             # Prestar inmediatamente al usuario de la reserva
             self.prestar_libro(isbn, reserva['Usuario'])
         
         # Guardar cambios
-        self.gestor_libros.guardar_inventario()
+        self.gestor_libros.guardar_si_corresponde()
         return (True, mensaje)
     
-    def obtener_historial_usuario(self, usuario: str) -> list:
+    def guardar_todo(self) -> None:
+        """Guarda el inventario, el historial y las reservas en sus archivos."""
+        self.gestor_libros.guardar_inventario()
+        self.historial.guardar_en_archivo()
+        self.reservas.guardar_en_archivo()
+    
+    @contextmanager
+    def modo_lote(self) -> Iterator['GestorPrestamos']:
+        """
+        Contexto para aplicar muchas operaciones seguidas sin guardar los
+        archivos después de cada una. Al salir se guarda todo una sola vez
+        y se restaura el guardado automático.
+        
+        Returns:
+            El propio gestor de préstamos
+        """
+        almacenes = (self.gestor_libros, self.historial, self.reservas)
+        anteriores = [almacen.autoguardado for almacen in almacenes]
+        for almacen in almacenes:
+            almacen.autoguardado = False
+        try:
+            yield self
+        finally:
+            for almacen, anterior in zip(almacenes, anteriores):
+                almacen.autoguardado = anterior
+            self.guardar_todo()
+    
+    def obtener_historial_usuario(self, usuario: str, desde: Union[datetime, str, None] = None,
+                                  incluir_archivo: bool = False) -> list:
         """
         Obtiene el historial de préstamos de un usuario.
         
         Args:
-            usuario: Nombre del usuario
+            usuario: Nombre o identificación del usuario
+            desde: Si se indica (datetime o AAAA-MM-DD [HH:MM:SS]), solo
+                   préstamos con fecha igual o posterior
+            incluir_archivo: Si es True, incluye los préstamos archivados
             
         Returns:
             Lista de diccionarios con el historial
         """
-        return self.historial.obtener_historial_usuario(usuario)
+        return self.historial.obtener_historial_usuario(self._nombre_usuario(usuario),
+                                                        self._texto_fecha(desde, False),
+                                                        incluir_archivo)
+    
+    @staticmethod
+    def _texto_fecha(fecha: Union[datetime, str, None], fin_del_dia: bool) -> Optional[str]:
+        """
+        Convierte un límite de rango al formato del historial. Una fecha sin
+        hora (AAAA-MM-DD) abarca el día completo.
+        
+        Args:
+            fecha: datetime o texto AAAA-MM-DD [HH:MM:SS]
+            fin_del_dia: Si es True, una fecha sin hora se toma al final del día
+            
+        Returns:
+            Fecha en formato FORMATO_FECHA, o None si no se indicó
+        """
+        if fecha is None:
+            return None
+        if isinstance(fecha, datetime):
+            return fecha.strftime(FORMATO_FECHA)
+        if len(fecha) == 10:
+            return fecha + (" 23:59:59" if fin_del_dia else " 00:00:00")
+        return fecha
+    
+    def historial_rango(self, usuario: Optional[str] = None, isbn: Optional[str] = None,
+                        desde: Union[datetime, str, None] = None,
+                        hasta: Union[datetime, str, None] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos de un usuario o de un ISBN entre dos fechas,
+        p. ej. lo que prestó un usuario entre marzo y junio, o los préstamos
+        de un libro en la última semana. Usa los índices por fecha del
+        historial, sin recorrerlo.
+        
+        Args:
+            usuario: Nombre o identificación del usuario
+            isbn: ISBN del libro
+            desde: Fecha inicial (datetime o texto AAAA-MM-DD [HH:MM:SS]); None = sin límite
+            hasta: Fecha final, inclusive; None = sin límite
+            
+        Returns:
+            Lista de diccionarios con los préstamos, en orden cronológico
+            
+        Raises:
+            ValueError: Si no se indica usuario ni ISBN
+        """
+        if isbn is not None:
+            libro = self.gestor_libros.buscar_por_isbn_binaria(isbn)
+            if libro is not None:
+                isbn = libro.isbn
+        return self.historial.historial_rango(
+            self._nombre_usuario(usuario) if usuario is not None else None, isbn,
+            self._texto_fecha(desde, False), self._texto_fecha(hasta, True))
+    
+    def compactar_historial(self, dias: int = 365, ahora: Optional[datetime] = None) -> int:
+        """
+        Archiva los préstamos cerrados con más de cierta antigüedad en
+        segmentos comprimidos por mes, para que no se carguen al iniciar.
+        
+        Args:
+            dias: Antigüedad mínima en días de los préstamos a archivar
+            ahora: Fecha de referencia (por defecto, la fecha actual)
+            
+        Returns:
+            Número de préstamos archivados
+        """
+        corte = (ahora or datetime.now()) - timedelta(days=dias)
+        return self.historial.compactar(corte.strftime(FORMATO_FECHA))
+    
+    def prestamos_vencidos(self, ahora: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos activos cuya fecha de vencimiento ya pasó.
+        Usa el índice de vencimientos, sin recorrer el historial.
+        
+        Args:
+            ahora: Fecha de referencia (por defecto, la fecha actual)
+            
+        Returns:
+            Lista de préstamos vencidos, del más atrasado al más reciente
+        """
+        ahora = ahora or datetime.now()
+        return self.historial.activos.vencidos(ahora.timestamp())
+    
+    def proximos_a_vencer(self, horas: float, ahora: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos activos que vencen dentro de las próximas horas.
+        
+        Args:
+            horas: Ventana de tiempo en horas
+            ahora: Fecha de referencia (por defecto, la fecha actual)
+            
+        Returns:
+            Lista de préstamos ordenada por fecha de vencimiento
+        """
+        ahora = ahora or datetime.now()
+        return self.historial.activos.en_rango(ahora.timestamp(), 
+                                               (ahora + timedelta(hours=horas)).timestamp())
+    
+    def barrer_reservas_expiradas(self) -> List[Dict[str, Any]]:
+        """
+        Elimina las reservas cuya vigencia terminó.
+        
+        Returns:
+            Lista de reservas expiradas eliminadas
+        """
+        return self.reservas.barrer_expiradas()
     
     def obtener_reservas_pendientes(self) -> list:
         """
@@ -125,5 +378,5 @@ class GestorPrestamos:
         Returns:
             Lista de diccionarios con las reservas
         """
-        return self.reservas.elementos
+        return list(self.reservas.elementos)
 
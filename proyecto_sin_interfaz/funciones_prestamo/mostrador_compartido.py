@@ -0,0 +1,387 @@
+"""
+Módulo que permite operar varios mostradores (procesos) a la vez sobre los
+mismos archivos de datos sin perder actualizaciones.
+
+Cada operación que modifica datos se ejecuta con un bloqueo exclusivo:
+primero se aplican los cambios que otros procesos registraron desde la
+última versión vista, luego se ejecuta la operación (que guarda los
+archivos como siempre) y por último se publican sus cambios en el registro
+compartido con una versión creciente. Los demás procesos aplican solo esos
+cambios, sin releer los archivos completos. Cuando el registro supera un
+tamaño máximo, se guardan todos los archivos y el registro se trunca.
+
+Se activa en la interfaz gráfica con la variable de entorno SGB_MULTIPROCESO=1.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from estructuras_datos import eventos as ev
+from funciones_libros.libro import Libro
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from persistencia.sincronizacion import RegistroCambios
+
+# Tamaño del registro de cambios (bytes) a partir del cual se trunca
+LIMITE_REGISTRO = 1024 * 1024
+
+ALMACEN_POR_TIPO = {
+    "libro": "libros",
+    "libro_eliminado": "libros",
+    "historial_alta": "historial",
+    "historial_devuelto": "historial",
+    "reserva_alta": "reservas",
+    "reserva_baja": "reservas",
+}
+
+# Almacén que se recarga por completo con cada evento de recarga
+ALMACEN_RECARGA = {
+    ev.CATALOGO_RECARGADO: "libros",
+    ev.HISTORIAL_RECARGADO: "historial",
+    ev.RESERVAS_RECARGADAS: "reservas",
+}
+
+
+class MostradorCompartido:
+    """
+    Clase que coordina un GestorPrestamos con otros procesos mediante un
+    bloqueo de archivo y un registro de cambios compartido.
+
+    Atributos:
+        gestor_prestamos: Gestor de préstamos local
+        registro: Registro de cambios compartido
+        limite_registro: Tamaño en bytes a partir del cual se trunca el registro
+    """
+
+    def __init__(self, gestor_prestamos: GestorPrestamos, archivo_cambios: str = "cambios.log",
+                 limite_registro: int = LIMITE_REGISTRO):
+        """
+        Inicializa el mostrador. Los archivos de datos se recargan con el
+        bloqueo adquirido para partir de un estado coherente con el registro.
+
+        Args:
+            gestor_prestamos: Gestor de préstamos local
+            archivo_cambios: Ruta del archivo del registro de cambios
+            limite_registro: Tamaño en bytes a partir del cual se trunca el registro
+        """
+        self.gestor_prestamos = gestor_prestamos
+        self.registro = RegistroCambios(archivo_cambios)
+        self.limite_registro = limite_registro
+        self._pendientes: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+        gestor_prestamos.eventos.suscribir(self._capturar)
+
+        with self.registro.bloqueo.adquirir():
+            self._recargar("libros")
+            self._recargar("historial")
+            self._recargar("reservas")
+            self._recargar("usuarios")
+            self.registro.posicionar_al_final()
+
+    @property
+    def version(self) -> int:
+        """Última versión del registro aplicada por este proceso."""
+        return self.registro.version
+
+    def _capturar(self, evento: ev.Evento) -> None:
+        """
+        Traduce un evento local al cambio que se publicará al terminar la
+        operación. Fuera de una operación (p. ej. al aplicar cambios ajenos)
+        los eventos se ignoran.
+
+        Args:
+            evento: Evento emitido por los gestores
+        """
+        if self._pendientes is None:
+            return
+        tipo = evento.tipo
+        datos = evento.datos
+        if tipo in (ev.LIBRO_AGREGADO, ev.LIBRO_ACTUALIZADO):
+            cambio = ("libro", datos["libro"].to_dict())
+        elif tipo == ev.LIBRO_ELIMINADO:
+            cambio = ("libro_eliminado", {"ISBN": datos["libro"].isbn})
+        elif tipo == ev.PRESTAMO_REGISTRADO:
+            cambio = ("historial_alta", dict(datos["registro"]))
+        elif tipo == ev.PRESTAMO_DEVUELTO:
+            registro = datos["registro"]
+            cambio = ("historial_devuelto", {"ISBN": registro["ISBN"], "Usuario": registro["Usuario"],
+                                             "Devuelto": registro["Devuelto"]})
+        elif tipo == ev.RESERVA_ENCOLADA:
+            cambio = ("reserva_alta", dict(datos["reserva"]))
+        elif tipo in (ev.RESERVA_ATENDIDA, ev.RESERVA_RETIRADA):
+            cambio = ("reserva_baja", dict(datos["reserva"]))
+        elif tipo in ALMACEN_RECARGA:
+            cambio = ("recarga", {"almacen": ALMACEN_RECARGA[tipo]})
+        else:
+            return
+        self._pendientes.append(cambio)
+
+    def _recargar(self, almacen: str) -> None:
+        """Vuelve a cargar un archivo de datos completo."""
+        if almacen == "libros":
+            self.gestor_prestamos.gestor_libros.cargar_inventario()
+        elif almacen == "historial":
+            self.gestor_prestamos.historial.archivo_historico.cargar_indice()
+            self.gestor_prestamos.historial.cargar_desde_archivo()
+        elif almacen == "reservas":
+            self.gestor_prestamos.reservas.cargar_desde_archivo()
+        elif almacen == "usuarios" and self.gestor_prestamos.gestor_usuarios is not None:
+            self.gestor_prestamos.gestor_usuarios.cargar_usuarios()
+
+    def _actualizar_libro(self, datos: Dict[str, Any]) -> None:
+        """Aplica el estado de un libro recibido de otro proceso."""
+        gestor_libros = self.gestor_prestamos.gestor_libros
+        nuevo = Libro.from_dict(datos)
+        libro = gestor_libros.buscar_por_isbn_binaria(nuevo.isbn)
+        if libro is None:
+            gestor_libros.agregar_libro(nuevo)
+        elif ((libro.titulo, libro.autor, libro.valor, libro.peso) !=
+              (nuevo.titulo, nuevo.autor, nuevo.valor, nuevo.peso)):
+            # Cambió un dato indexado: reemplazar el libro para actualizar los índices
+            gestor_libros.eliminar_libro(nuevo.isbn)
+            gestor_libros.agregar_libro(nuevo)
+        else:
+            libro.cantidad = nuevo.cantidad
+            libro.cantidad_presente = nuevo.cantidad_presente
+            gestor_libros.eventos.emitir(ev.LIBRO_ACTUALIZADO, libro=libro)
+
+    def _aplicar(self, cambio: Dict[str, Any]) -> None:
+        """
+        Aplica un cambio de otro proceso sobre el estado en memoria.
+
+        Args:
+            cambio: Cambio leído del registro
+        """
+        tipo = cambio["tipo"]
+        datos = cambio["datos"]
+        if tipo == "libro":
+            self._actualizar_libro(datos)
+        elif tipo == "libro_eliminado":
+            self.gestor_prestamos.gestor_libros.eliminar_libro(datos["ISBN"])
+        elif tipo == "historial_alta":
+            self.gestor_prestamos.historial.agregar_registro(datos)
+        elif tipo == "historial_devuelto":
+            self.gestor_prestamos.historial.marcar_devuelto(datos["ISBN"], datos["Usuario"],
+                                                            datos["Devuelto"])
+        elif tipo == "reserva_alta":
+            self.gestor_prestamos.reservas.agregar_registro(datos)
+        elif tipo == "reserva_baja":
+            self.gestor_prestamos.reservas.retirar_registro(datos)
+
+    @contextmanager
+    def _sin_efectos(self) -> Iterator[None]:
+        """
+        Contexto para aplicar cambios ajenos: sin guardar archivos (el otro
+        proceso ya los guardó). Los eventos se siguen emitiendo para que la
+        interfaz se actualice, pero no se publican porque no hay una
+        operación en curso.
+        """
+        almacenes = (self.gestor_prestamos.gestor_libros, self.gestor_prestamos.historial,
+                     self.gestor_prestamos.reservas)
+        anteriores = [almacen.autoguardado for almacen in almacenes]
+        for almacen in almacenes:
+            almacen.autoguardado = False
+        try:
+            yield
+        finally:
+            for almacen, anterior in zip(almacenes, anteriores):
+                almacen.autoguardado = anterior
+
+    @staticmethod
+    def _recargas(cambios: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Obtiene los almacenes que deben recargarse por completo para aplicar
+        unos cambios. Si el registro se truncó con cambios sin leer, se
+        recargan todos.
+
+        Args:
+            cambios: Cambios leídos del registro
+
+        Returns:
+            Conjunto de almacenes a recargar
+        """
+        if cambios and cambios[0]["tipo"] == RegistroCambios.BASE:
+            return {"libros", "historial", "reservas", "usuarios"}
+        return {cambio["datos"]["almacen"] for cambio in cambios if cambio["tipo"] == "recarga"}
+
+    def _sincronizar_con_bloqueo(self) -> int:
+        """Aplica los cambios nuevos; requiere el bloqueo exclusivo."""
+        return self._aplicar_cambios(self.registro.leer_nuevos())
+
+    def _aplicar_cambios(self, cambios: List[Dict[str, Any]]) -> int:
+        """
+        Aplica cambios leídos del registro. Si alguno requiere recargar un
+        almacén, debe llamarse con el bloqueo exclusivo.
+
+        Args:
+            cambios: Cambios leídos del registro
+
+        Returns:
+            Número de cambios aplicados
+        """
+        if not cambios:
+            return 0
+        # Si otro proceso pidió recargar un archivo, se recarga una sola vez;
+        # como se tiene el bloqueo, el archivo ya incluye todos los cambios
+        # posteriores de ese almacén, que por eso no se vuelven a aplicar
+        recargas = self._recargas(cambios)
+        with self._sin_efectos():
+            for almacen in sorted(recargas):
+                self._recargar(almacen)
+            for cambio in cambios:
+                if (cambio["tipo"] not in ("recarga", RegistroCambios.BASE) and
+                        ALMACEN_POR_TIPO.get(cambio["tipo"]) not in recargas):
+                    self._aplicar(cambio)
+        return len(cambios)
+
+    def _guardar_instantanea(self) -> bool:
+        """
+        Escribe el inventario, el historial y las reservas completos, sin
+        pasar por el escritor diferido. Requiere el bloqueo exclusivo.
+
+        Returns:
+            True si se escribieron los tres archivos
+        """
+        gestor = self.gestor_prestamos
+        if gestor.escritor is not None:
+            gestor.escritor.vaciar()
+        escritos = [gestor.gestor_libros._escribir(gestor.gestor_libros._instantanea()),
+                    gestor.historial._escribir(gestor.historial._instantanea()),
+                    gestor.reservas._escribir(list(gestor.reservas.elementos))]
+        return all(escritos)
+
+    def _truncar_si_corresponde(self) -> None:
+        """
+        Trunca el registro de cambios si superó el tamaño máximo, solo
+        después de guardar con éxito una instantánea de todos los archivos.
+        Requiere el bloqueo exclusivo.
+        """
+        if self.registro.tamanio() <= self.limite_registro:
+            return
+        if self._guardar_instantanea():
+            self.registro.truncar()
+        else:
+            print("No se truncó el registro de cambios: falló el guardado de los archivos")
+
+    def sincronizar(self) -> int:
+        """
+        Aplica los cambios que otros procesos registraron desde la última
+        versión vista.
+
+        Returns:
+            Número de cambios aplicados
+        """
+        if not self.registro.hay_cambios():
+            return 0
+        with self.registro.bloqueo.adquirir(exclusivo=False):
+            marca = self.registro.marca()
+            cambios = self.registro.leer_nuevos()
+            if not self._recargas(cambios):
+                return self._aplicar_cambios(cambios)
+            # Recargar un archivo puede escribir (crearlo si falta o vaciar el
+            # escritor diferido): se vuelve a leer con el bloqueo exclusivo
+            self.registro.volver_a(marca)
+        with self.registro.bloqueo.adquirir():
+            return self._sincronizar_con_bloqueo()
+
+    def _ejecutar(self, operacion: Callable[[], Any]) -> Any:
+        """
+        Ejecuta una operación local con el bloqueo exclusivo y publica los
+        cambios que emitió.
+
+        Args:
+            operacion: Función sin argumentos que realiza la operación
+
+        Returns:
+            Resultado de la operación
+        """
+        with self.registro.bloqueo.adquirir():
+            self._sincronizar_con_bloqueo()
+            self._pendientes = []
+            try:
+                resultado = operacion()
+                cambios = self._pendientes
+            finally:
+                self._pendientes = None
+                # Con un escritor diferido, los archivos deben quedar escritos
+                # antes de soltar el bloqueo: otro proceso puede recargarlos
+                if self.gestor_prestamos.escritor is not None:
+                    self.gestor_prestamos.escritor.vaciar()
+            if cambios:
+                self.registro.anexar(cambios)
+                self._truncar_si_corresponde()
+            return resultado
+
+    def prestar_libro(self, isbn: str, usuario: str, *args, **kwargs) -> Tuple[bool, str]:
+        """Presta un libro (ver GestorPrestamos.prestar_libro)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.prestar_libro(isbn, usuario, *args, **kwargs))
+
+    def reservar_libro(self, isbn: str, usuario: str, *args, **kwargs) -> Tuple[bool, str]:
+        """Reserva un libro (ver GestorPrestamos.reservar_libro)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.reservar_libro(isbn, usuario, *args, **kwargs))
+
+    def devolver_libro(self, isbn: str, usuario: str) -> Tuple[bool, str]:
+        """Devuelve un libro (ver GestorPrestamos.devolver_libro)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.devolver_libro(isbn, usuario))
+
+    def barrer_reservas_expiradas(self) -> List[Dict[str, Any]]:
+        """Elimina las reservas expiradas (ver GestorPrestamos.barrer_reservas_expiradas)."""
+        return self._ejecutar(self.gestor_prestamos.barrer_reservas_expiradas)
+
+    def compactar_historial(self, *args, **kwargs) -> int:
+        """Archiva el historial antiguo (ver GestorPrestamos.compactar_historial)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.compactar_historial(*args, **kwargs))
+
+    def agregar_libro(self, libro: Libro) -> bool:
+        """Agrega un libro al inventario (ver GestorLibros.agregar_libro)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.gestor_libros.agregar_libro(libro))
+
+    def eliminar_libro(self, isbn: str) -> bool:
+        """Elimina un libro del inventario (ver GestorLibros.eliminar_libro)."""
+        return self._ejecutar(lambda: self.gestor_prestamos.gestor_libros.eliminar_libro(isbn))
+
+    def _ejecutar_usuarios(self, operacion: Callable[[Any], Any],
+                           hubo_cambios: Callable[[Any], bool] = bool) -> Any:
+        """
+        Ejecuta una operación sobre el gestor de usuarios con el bloqueo
+        exclusivo. GestorUsuario no emite eventos: si la operación cambió
+        algo, se publica una recarga del almacén de usuarios.
+
+        Args:
+            operacion: Función que recibe el gestor de usuarios
+            hubo_cambios: Indica, a partir del resultado, si la operación cambió algo
+
+        Returns:
+            Resultado de la operación
+
+        Raises:
+            ValueError: Si el gestor de préstamos no tiene gestor de usuarios
+        """
+        gestor_usuarios = self.gestor_prestamos.gestor_usuarios
+        if gestor_usuarios is None:
+            raise ValueError("El gestor de préstamos no tiene gestor de usuarios")
+
+        def ejecutar() -> Any:
+            resultado = operacion(gestor_usuarios)
+            if hubo_cambios(resultado):
+                self._pendientes.append(("recarga", {"almacen": "usuarios"}))
+            return resultado
+        return self._ejecutar(ejecutar)
+
+    def agregar_usuario(self, nombre: str, identificacion: str) -> Any:
+        """Registra un usuario (ver GestorUsuario.agregar_usuario)."""
+        return self._ejecutar_usuarios(lambda gestor: gestor.agregar_usuario(nombre, identificacion))
+
+    def registrar_masivo(self, registros: Iterable[Any]) -> Tuple[int, int]:
+        """Registra muchos usuarios (ver GestorUsuario.registrar_masivo)."""
+        return self._ejecutar_usuarios(lambda gestor: gestor.registrar_masivo(registros),
+                                       lambda resultado: resultado[0] > 0)
+
+    def eliminar_usuario(self, identificacion: str) -> bool:
+        """Elimina un usuario (ver GestorUsuario.eliminar_usuario)."""
+        return self._ejecutar_usuarios(lambda gestor: gestor.eliminar_usuario(identificacion))
+
+    def consolidar_usuarios(self) -> None:
+        """
+        Escribe la instantánea de usuarios y vacía su diario (ver
+        GestorUsuario.consolidar). Los usuarios no cambian, así que no se
+        publica ninguna recarga.
+        """
+        self._ejecutar_usuarios(lambda gestor: gestor.consolidar(), lambda _: False)
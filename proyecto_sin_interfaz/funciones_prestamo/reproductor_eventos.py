@@ -0,0 +1,210 @@
+"""
+Módulo que reproduce eventos de circulación (préstamos, devoluciones y
+reservas) sin interfaz gráfica, para migraciones y pruebas de carga.
+
+Los eventos se leen en streaming desde un archivo CSV (con encabezado
+tipo,isbn,usuario) o JSON Lines (un objeto {"tipo", "isbn", "usuario"} por
+línea) y se aplican sobre GestorPrestamos en modo lote: los archivos solo se
+guardan en cada punto de control y al terminar.
+
+Uso (desde el directorio del proyecto):
+    python -m funciones_prestamo.reproductor_eventos eventos.jsonl --punto-control 100000
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+
+TIPOS_EVENTO = ("prestar", "devolver", "reservar")
+
+
+def leer_eventos(ruta_archivo: str, formato: Optional[str] = None) -> Iterator[Tuple[str, str, str]]:
+    """
+    Lee eventos de circulación de un archivo sin cargarlo completo en memoria.
+
+    Args:
+        ruta_archivo: Ruta del archivo de eventos
+        formato: "csv" o "jsonl"; si es None se deduce de la extensión
+
+    Returns:
+        Iterador de tuplas (tipo, isbn, usuario); las líneas mal formadas
+        producen una tupla con tipo vacío
+    """
+    if formato is None:
+        formato = "csv" if ruta_archivo.lower().endswith(".csv") else "jsonl"
+
+    with open(ruta_archivo, "r", encoding="utf-8", newline="") as f:
+        if formato == "csv":
+            for fila in csv.DictReader(f):
+                yield ((fila.get("tipo") or "").strip().lower(),
+                       (fila.get("isbn") or "").strip(),
+                       (fila.get("usuario") or "").strip())
+        else:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                try:
+                    evento = json.loads(linea)
+                    yield (str(evento.get("tipo", "")).strip().lower(),
+                           str(evento.get("isbn", "")).strip(),
+                           str(evento.get("usuario", "")).strip())
+                except (ValueError, AttributeError):
+                    yield ("", "", "")
+
+
+class ReproductorEventos:
+    """
+    Clase que aplica un flujo de eventos de circulación sobre GestorPrestamos.
+
+    Atributos:
+        gestor_prestamos: Gestor de préstamos sobre el que se aplican los eventos
+        punto_control: Número de eventos entre guardados de los archivos
+        estadisticas: Contadores de eventos aplicados, fallidos e inválidos
+    """
+
+    def __init__(self, gestor_prestamos: GestorPrestamos, punto_control: int = 100000):
+        """
+        Inicializa el reproductor.
+
+        Args:
+            gestor_prestamos: Gestor de préstamos sobre el que se aplican los eventos
+            punto_control: Número de eventos entre guardados de los archivos
+        """
+        self.gestor_prestamos = gestor_prestamos
+        self.punto_control = punto_control
+        self.estadisticas: Dict[str, Any] = {}
+
+    def aplicar(self, tipo: str, isbn: str, usuario: str) -> Tuple[bool, str]:
+        """
+        Aplica un evento sobre el gestor de préstamos.
+
+        Args:
+            tipo: Tipo de evento (prestar, devolver o reservar)
+            isbn: ISBN del libro
+            usuario: Nombre del usuario
+
+        Returns:
+            Tupla (éxito, mensaje)
+        """
+        if tipo == "prestar":
+            return self.gestor_prestamos.prestar_libro(isbn, usuario)
+        if tipo == "devolver":
+            return self.gestor_prestamos.devolver_libro(isbn, usuario)
+        if tipo == "reservar":
+            return self.gestor_prestamos.reservar_libro(isbn, usuario)
+        return (False, f"Tipo de evento desconocido: '{tipo}'")
+
+    def reproducir(self, eventos: Iterator[Tuple[str, str, str]],
+                   progreso: bool = False) -> Dict[str, Any]:
+        """
+        Reproduce un flujo de eventos en modo lote.
+
+        Args:
+            eventos: Iterador de tuplas (tipo, isbn, usuario)
+            progreso: Si es True, informa el avance en cada punto de control
+
+        Returns:
+            Diccionario con las estadísticas de la reproducción
+        """
+        estadisticas = {
+            "eventos": 0,
+            "aplicados": 0,
+            "en_espera": 0,
+            "fallidos": 0,
+            "invalidos": 0,
+            "por_tipo": {tipo: 0 for tipo in TIPOS_EVENTO},
+            "puntos_control": 0,
+        }
+        inicio = time.perf_counter()
+
+        with self.gestor_prestamos.modo_lote():
+            for tipo, isbn, usuario in eventos:
+                estadisticas["eventos"] += 1
+                if tipo not in TIPOS_EVENTO or not isbn or not usuario:
+                    estadisticas["invalidos"] += 1
+                else:
+                    estadisticas["por_tipo"][tipo] += 1
+                    reservas_previas = self.gestor_prestamos.reservas.tamanio()
+                    exito, _ = self.aplicar(tipo, isbn, usuario)
+                    if exito:
+                        estadisticas["aplicados"] += 1
+                    elif (tipo == "prestar"
+                          and self.gestor_prestamos.reservas.tamanio() > reservas_previas):
+                        # Un préstamo sin ejemplares queda en la lista de espera:
+                        # no es un fallo, el evento se registró como reserva
+                        estadisticas["en_espera"] += 1
+                    else:
+                        estadisticas["fallidos"] += 1
+
+                if estadisticas["eventos"] % self.punto_control == 0:
+                    self.gestor_prestamos.guardar_todo()
+                    estadisticas["puntos_control"] += 1
+                    if progreso:
+                        transcurrido = time.perf_counter() - inicio
+                        print(f"{estadisticas['eventos']:,} eventos "
+                              f"({estadisticas['eventos'] / transcurrido:,.0f} eventos/s)",
+                              file=sys.stderr)
+
+        duracion = time.perf_counter() - inicio
+        estadisticas["duracion_s"] = duracion
+        estadisticas["eventos_por_segundo"] = estadisticas["eventos"] / duracion if duracion > 0 else 0.0
+        estadisticas["estado_final"] = self.estado_final()
+        self.estadisticas = estadisticas
+        return estadisticas
+
+    def estado_final(self) -> Dict[str, int]:
+        """
+        Resume el estado del sistema tras la reproducción.
+
+        Returns:
+            Diccionario con totales de libros, ejemplares, historial y reservas
+        """
+        inventario = self.gestor_prestamos.gestor_libros.obtener_inventario_general()
+        return {
+            "libros": len(inventario),
+            "ejemplares": sum(libro.cantidad for libro in inventario),
+            "ejemplares_disponibles": sum(libro.cantidad_presente for libro in inventario),
+            "historial": self.gestor_prestamos.historial.tamanio(),
+            "reservas_pendientes": self.gestor_prestamos.reservas.tamanio(),
+        }
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de la línea de comandos.
+
+    Args:
+        argumentos: Argumentos de la línea de comandos (sys.argv si es None)
+
+    Returns:
+        Código de salida: 0 si no hubo eventos inválidos, 1 en caso contrario
+    """
+    parser = argparse.ArgumentParser(description="Reproductor de eventos de circulación")
+    parser.add_argument("eventos", help="Archivo de eventos (CSV o JSON Lines)")
+    parser.add_argument("--formato", choices=["csv", "jsonl"],
+                        help="Formato del archivo (por defecto se deduce de la extensión)")
+    parser.add_argument("--libros", default="libros.json", help="Archivo del inventario")
+    parser.add_argument("--historial", default="historial_prestamos.json",
+                        help="Archivo del historial de préstamos")
+    parser.add_argument("--reservas", default="reservas.json", help="Archivo de reservas")
+    parser.add_argument("--punto-control", type=int, default=100000,
+                        help="Eventos entre guardados de los archivos")
+    args = parser.parse_args(argumentos)
+
+    gestor_libros = GestorLibros(args.libros)
+    gestor_prestamos = GestorPrestamos(gestor_libros, args.historial, args.reservas)
+    reproductor = ReproductorEventos(gestor_prestamos, max(1, args.punto_control))
+
+    estadisticas = reproductor.reproducir(leer_eventos(args.eventos, args.formato), progreso=True)
+    json.dump(estadisticas, sys.stdout, indent=4, ensure_ascii=False)
+    print()
+    return 1 if estadisticas["invalidos"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
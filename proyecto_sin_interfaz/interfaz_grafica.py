@@ -11,10 +11,25 @@ import os
 from funciones_libros.gestor_libros import GestorLibros
 from funciones_prestamo.gestor_prestamos import GestorPrestamos
 from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+from funciones_prestamo.mostrador_compartido import MostradorCompartido
+from funciones_prestamo.analitica_circulacion import AnaliticaCirculacion
 from problemas_resueltos.estanteria import Estanteria
 from recursion.funciones_recursivas import FuncionesRecursivas
+from recursion.reporte_autores import ReporteAutores
 from algoritmos_ordenamiento.ordenamiento import Ordenamiento
 from funciones_libros.libro import Libro
+from funciones_libros.isbn import ISBNInvalido
+from estructuras_datos.planificador_reservas import NOMBRES_PRIORIDAD, PRIORIDAD_GENERAL
+from estructuras_datos import eventos as ev
+from persistencia.escritor_diferido import EscritorDiferido
+from diagnostico.metricas import (metricas, activar_instrumentacion,
+                                  desactivar_instrumentacion, instrumentacion_activa)
+
+# Cada cuánto se aplican los cambios de otros mostradores (modo multiproceso)
+INTERVALO_SINCRONIZACION_MS = 2000
+
+# Segundos máximos que un cambio espera antes de escribirse en segundo plano
+LATENCIA_GUARDADO_S = 0.5
 
 class InterfazGestionBibliotecas:
     """
@@ -35,14 +50,172 @@ class InterfazGestionBibliotecas:
         
         # Inicializar componentes del sistema
         self.gestor_libros = GestorLibros()
-        self.gestor_prestamos = GestorPrestamos(self.gestor_libros)
         self.gestor_usuario = GestorUsuario()
+        self.gestor_prestamos = GestorPrestamos(self.gestor_libros, gestor_usuarios=self.gestor_usuario)
         self.estanteria = Estanteria()
         self.recursion = FuncionesRecursivas()
+        self.reporte_autores = ReporteAutores()
         self.ordenamiento = Ordenamiento()
+        self.analitica = AnaliticaCirculacion(self.gestor_prestamos)
+        
+        # Los archivos se escriben en un hilo aparte para no detener la
+        # interfaz; al cerrar la ventana se escriben los cambios pendientes
+        self.escritor = EscritorDiferido(LATENCIA_GUARDADO_S)
+        self.gestor_prestamos.usar_escritor(self.escritor)
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        
+        # Las vistas abiertas se actualizan con los eventos de cambio, agrupados
+        # hasta que Tk queda inactivo: varias operaciones seguidas (o los
+        # cambios de otro mostrador) producen una sola actualización por fila
+        self._vistas = []
+        self.agrupador = ev.AgrupadorEventos(self.root.after_idle, self._aplicar_eventos)
+        self.gestor_libros.eventos.suscribir(self.agrupador.recibir)
+        
+        # Modo multiproceso: las operaciones pasan por el mostrador compartido,
+        # que las coordina con otros procesos que usan los mismos archivos
+        self.mostrador = None
+        if os.environ.get("SGB_MULTIPROCESO") == "1":
+            self.mostrador = MostradorCompartido(self.gestor_prestamos)
+            self.root.after(INTERVALO_SINCRONIZACION_MS, self.sincronizar_mostrador)
         
         # Crear interfaz
         self.crear_interfaz()
+        self.root.after_idle(self._avisar_registros_rechazados)
+    
+    def _avisar_registros_rechazados(self):
+        """Advierte de los libros del inventario que no se cargaron (ISBN inválido o repetido)."""
+        rechazados = self.gestor_libros.registros_rechazados
+        if not rechazados:
+            return
+        detalle = "\n".join(f"- {registro.get('ISBN', '?')}: {registro.get('Título', '')}"
+                             for registro in rechazados[:10])
+        if len(rechazados) > 10:
+            detalle += f"\n... y {len(rechazados) - 10} más"
+        messagebox.showwarning(
+            "Inventario",
+            f"No se cargaron {len(rechazados)} libro(s) por tener un ISBN inválido o repetido.\n"
+            f"Se conservan en el archivo del inventario; corrija su ISBN para usarlos.\n\n{detalle}")
+    
+    def cerrar(self):
+        """Escribe los cambios pendientes y cierra la ventana."""
+        self.escritor.detener()
+        # Consolidar el diario de usuarios para que el próximo inicio no lo reproduzca
+        if self.mostrador is not None:
+            self.mostrador.consolidar_usuarios()
+        else:
+            self.gestor_usuario.consolidar()
+        self.root.destroy()
+    
+    @property
+    def operaciones(self):
+        """Objeto que ejecuta las operaciones: el mostrador compartido o el gestor de préstamos."""
+        return self.mostrador or self.gestor_prestamos
+    
+    def sincronizar_mostrador(self):
+        """Aplica periódicamente los cambios registrados por otros mostradores."""
+        self.mostrador.sincronizar()
+        self.root.after(INTERVALO_SINCRONIZACION_MS, self.sincronizar_mostrador)
+    
+    def _aplicar_eventos(self, eventos):
+        """
+        Entrega los eventos agrupados a las vistas abiertas.
+        
+        Args:
+            eventos: Lista de eventos sin redundancias
+        """
+        for vista in list(self._vistas):
+            # Un error en una vista no debe impedir que las demás se actualicen
+            try:
+                vista(eventos)
+            except Exception as e:
+                print(f"Error al actualizar una vista: {e}")
+    
+    @staticmethod
+    def _valores_libro(libro):
+        """Valores de la fila de un libro en las tablas de inventario."""
+        return (libro.isbn, libro.titulo, libro.autor, 
+                f"{libro.peso} Kg", f"${libro.valor:,}", 
+                libro.cantidad_presente, libro.cantidad)
+    
+    def _rellenar_libros(self, tree, libros):
+        """
+        Reconstruye una tabla de inventario completa. Cada fila usa el ISBN
+        como identificador para poder actualizarla después sin reconstruir.
+        
+        Args:
+            tree: Treeview de libros
+            libros: Libros a mostrar, en orden
+        """
+        tree.delete(*tree.get_children())
+        for libro in libros:
+            self._insertar_libro(tree, tk.END, libro)
+    
+    def _insertar_libro(self, tree, posicion, libro):
+        """Inserta la fila de un libro; un ISBN repetido no interrumpe la tabla."""
+        try:
+            tree.insert("", posicion, iid=libro.isbn, values=self._valores_libro(libro))
+        except tk.TclError as e:
+            print(f"No se pudo mostrar el libro {libro.isbn}: {e}")
+    
+    @staticmethod
+    def _posicion_por_clave(tree, libros, libro):
+        """
+        Posición de la fila de un libro en una tabla ordenada por ISBN, con
+        búsqueda binaria sobre la lista ordenada (que ya contiene el libro).
+        
+        Args:
+            tree: Treeview de libros
+            libros: Lista de libros ordenada por clave de ISBN
+            libro: Libro a insertar
+            
+        Returns:
+            Índice de la fila, o tk.END si va al final
+        """
+        inicio, fin = 0, len(libros)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            if libros[medio].clave <= libro.clave:
+                inicio = medio + 1
+            else:
+                fin = medio
+        # La fila va antes del siguiente libro que ya está en la tabla (en un
+        # mismo grupo de eventos puede haber libros agregados aún sin fila)
+        for posicion in range(inicio, len(libros)):
+            if tree.exists(libros[posicion].isbn):
+                return tree.index(libros[posicion].isbn)
+        return tk.END
+    
+    def _vista_libros(self, tree, obtener_libros, ordenada=False):
+        """
+        Crea una vista que aplica los eventos de inventario fila por fila.
+        
+        Args:
+            tree: Treeview de libros
+            obtener_libros: Función que retorna los libros en el orden de la tabla
+            ordenada: Si es True la tabla está ordenada por ISBN y los libros
+                      nuevos se ubican con búsqueda binaria; si no, se agregan
+                      al final, como en el inventario general
+            
+        Returns:
+            Función que recibe la lista de eventos
+        """
+        def aplicar(eventos):
+            for evento in eventos:
+                if evento.tipo == ev.CATALOGO_RECARGADO:
+                    self._rellenar_libros(tree, obtener_libros())
+                    continue
+                libro = evento.datos.get("libro")
+                if libro is None:
+                    continue
+                if evento.tipo == ev.LIBRO_AGREGADO and not tree.exists(libro.isbn):
+                    posicion = (self._posicion_por_clave(tree, obtener_libros(), libro)
+                                if ordenada else tk.END)
+                    self._insertar_libro(tree, posicion, libro)
+                elif evento.tipo == ev.LIBRO_ELIMINADO and tree.exists(libro.isbn):
+                    tree.delete(libro.isbn)
+                elif evento.tipo == ev.LIBRO_ACTUALIZADO and tree.exists(libro.isbn):
+                    tree.item(libro.isbn, values=self._valores_libro(libro))
+        return aplicar
     
     def crear_interfaz(self):
         """Crea todos los componentes de la interfaz gráfica."""
@@ -75,6 +248,8 @@ class InterfazGestionBibliotecas:
                   command=self.mostrar_recursion, width=25).pack(pady=5, fill=tk.X)
         ttk.Button(menu_frame, text="7. Ver Inventario", 
                   command=self.mostrar_inventario, width=25).pack(pady=5, fill=tk.X)
+        ttk.Button(menu_frame, text="8. Diagnóstico", 
+                  command=self.mostrar_diagnostico, width=25).pack(pady=5, fill=tk.X)
         
         # Panel derecho - Área de contenido
         self.content_frame = ttk.Frame(main_frame)
@@ -87,6 +262,7 @@ class InterfazGestionBibliotecas:
     
     def limpiar_contenido(self):
         """Limpia el área de contenido."""
+        self._vistas = []
         for widget in self.content_frame.winfo_children():
             widget.destroy()
     
@@ -157,7 +333,7 @@ class InterfazGestionBibliotecas:
                 
                 libro = self.gestor_libros.cargar_libro_manual(isbn, titulo, autor, peso, valor, cantidad)
                 
-                if self.gestor_libros.agregar_libro(libro):
+                if (self.mostrador or self.gestor_libros).agregar_libro(libro):
                     messagebox.showinfo("Éxito", "Libro agregado exitosamente")
                     # Limpiar campos
                     entry_isbn.delete(0, tk.END)
@@ -168,6 +344,8 @@ class InterfazGestionBibliotecas:
                     entry_cantidad.delete(0, tk.END)
                 else:
                     messagebox.showerror("Error", "El ISBN ya existe en el inventario")
+            except ISBNInvalido as e:
+                messagebox.showerror("Error", str(e))
             except ValueError:
                 messagebox.showerror("Error", "Por favor ingrese valores numéricos válidos")
             except Exception as e:
@@ -198,17 +376,10 @@ class InterfazGestionBibliotecas:
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
         def actualizar_lista():
-            for item in tree.get_children():
-                tree.delete(item)
-            inventario = self.gestor_libros.obtener_inventario_general()
-            for libro in inventario:
-                tree.insert("", tk.END, values=(
-                    libro.isbn, libro.titulo, libro.autor, 
-                    f"{libro.peso} Kg", f"${libro.valor:,}", 
-                    libro.cantidad_presente, libro.cantidad
-                ))
+            self._rellenar_libros(tree, self.gestor_libros.obtener_inventario_general())
         
         actualizar_lista()
+        self._vistas.append(self._vista_libros(tree, self.gestor_libros.obtener_inventario_general))
         ttk.Button(list_frame, text="Actualizar Lista", command=actualizar_lista).grid(
             row=1, column=0, pady=5)
     
@@ -238,13 +409,20 @@ class InterfazGestionBibliotecas:
         entry_usuario_prestar = ttk.Entry(prestar_frame, width=30)
         entry_usuario_prestar.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
         
+        ttk.Label(prestar_frame, text="Prioridad de reserva:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        prioridades = {nombre: valor for valor, nombre in NOMBRES_PRIORIDAD.items()}
+        combo_prioridad = ttk.Combobox(prestar_frame, values=list(prioridades), state="readonly", width=27)
+        combo_prioridad.set(NOMBRES_PRIORIDAD[PRIORIDAD_GENERAL])
+        combo_prioridad.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
+        
         def prestar():
             isbn = entry_isbn_prestar.get().strip()
             usuario = entry_usuario_prestar.get().strip()
             if not isbn or not usuario:
                 messagebox.showerror("Error", "Por favor complete todos los campos")
                 return
-            exito, mensaje = self.gestor_prestamos.prestar_libro(isbn, usuario)
+            prioridad = prioridades.get(combo_prioridad.get(), PRIORIDAD_GENERAL)
+            exito, mensaje = self.operaciones.prestar_libro(isbn, usuario, prioridad)
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
             else:
@@ -253,7 +431,7 @@ class InterfazGestionBibliotecas:
             entry_usuario_prestar.delete(0, tk.END)
         
         ttk.Button(prestar_frame, text="Prestar", command=prestar).grid(
-            row=2, column=0, columnspan=2, pady=10)
+            row=3, column=0, columnspan=2, pady=10)
         
         # Devolver
         devolver_frame = ttk.LabelFrame(prestamo_frame, text="Devolver Libro", padding="10")
@@ -274,7 +452,7 @@ class InterfazGestionBibliotecas:
             if not isbn or not usuario:
                 messagebox.showerror("Error", "Por favor complete todos los campos")
                 return
-            exito, mensaje = self.gestor_prestamos.devolver_libro(isbn, usuario)
+            exito, mensaje = self.operaciones.devolver_libro(isbn, usuario)
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
             else:
@@ -295,7 +473,7 @@ class InterfazGestionBibliotecas:
         historial_frame.columnconfigure(1, weight=1)
         
         text_historial = scrolledtext.ScrolledText(historial_frame, height=20, width=60)
-        text_historial.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        text_historial.grid(row=1, column=0, columnspan=5, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         historial_frame.rowconfigure(1, weight=1)
         
         def mostrar_historial():
@@ -303,42 +481,123 @@ class InterfazGestionBibliotecas:
             if not usuario:
                 messagebox.showerror("Error", "Por favor ingrese un usuario")
                 return
-            historial = self.gestor_prestamos.obtener_historial_usuario(usuario)
+            historial = self.gestor_prestamos.obtener_historial_usuario(
+                usuario, incluir_archivo=incluir_archivo.get())
             text_historial.delete(1.0, tk.END)
             if historial:
                 text_historial.insert(tk.END, f"Historial de préstamos de {usuario}:\n\n")
                 for i, prestamo in enumerate(reversed(historial), 1):
                     text_historial.insert(tk.END, 
-                        f"{i}. ISBN: {prestamo['ISBN']}\n   Fecha: {prestamo['Fecha']}\n\n")
+                        f"{i}. ISBN: {prestamo['ISBN']}\n   Fecha: {prestamo['Fecha']}\n")
+                    # Los préstamos del formato anterior no tienen fecha de vencimiento
+                    vence = prestamo.get("Vence") or "Sin fecha"
+                    devuelto = prestamo.get("Devuelto") or "Pendiente"
+                    text_historial.insert(tk.END, 
+                        f"   Vence: {vence} | Devuelto: {devuelto}\n")
+                    text_historial.insert(tk.END, "\n")
             else:
                 text_historial.insert(tk.END, f"No hay historial de préstamos para {usuario}")
         
+        def compactar_historial():
+            if not messagebox.askyesno("Confirmar", 
+                                       "¿Archivar los préstamos cerrados con más de un año de antigüedad?"):
+                return
+            archivados = self.operaciones.compactar_historial(365)
+            messagebox.showinfo("Historial", f"Se archivaron {archivados} préstamo(s)")
+        
         ttk.Button(historial_frame, text="Buscar Historial", command=mostrar_historial).grid(
             row=0, column=2, padx=5)
+        incluir_archivo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(historial_frame, text="Incluir archivado", 
+                        variable=incluir_archivo).grid(row=0, column=3, padx=5)
+        ttk.Button(historial_frame, text="Archivar Antiguos", command=compactar_historial).grid(
+            row=0, column=4, padx=5)
         
         # Pestaña de reservas
         reservas_frame = ttk.Frame(notebook, padding="10")
         notebook.add(reservas_frame, text="Reservas")
         
-        text_reservas = scrolledtext.ScrolledText(reservas_frame, height=20, width=60)
-        text_reservas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        columnas_reservas = ("ISBN", "Usuario", "Prioridad", "Expira")
+        tree_reservas = ttk.Treeview(reservas_frame, columns=columnas_reservas, show="headings", height=20)
+        for col in columnas_reservas:
+            tree_reservas.heading(col, text=col)
+            tree_reservas.column(col, width=150)
+        scrollbar_reservas = ttk.Scrollbar(reservas_frame, orient=tk.VERTICAL, command=tree_reservas.yview)
+        tree_reservas.configure(yscrollcommand=scrollbar_reservas.set)
+        tree_reservas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        scrollbar_reservas.grid(row=0, column=1, sticky=(tk.N, tk.S), pady=5)
         reservas_frame.columnconfigure(0, weight=1)
         reservas_frame.rowconfigure(0, weight=1)
         
-        def actualizar_reservas():
-            reservas = self.gestor_prestamos.obtener_reservas_pendientes()
-            text_reservas.delete(1.0, tk.END)
-            if reservas:
-                text_reservas.insert(tk.END, "Reservas pendientes:\n\n")
-                for i, reserva in enumerate(reservas, 1):
-                    text_reservas.insert(tk.END, 
-                        f"{i}. ISBN: {reserva['ISBN']} - Usuario: {reserva['Usuario']}\n")
-            else:
-                text_reservas.insert(tk.END, "No hay reservas pendientes")
+        def insertar_reserva(reserva):
+            # Cada reserva es un diccionario distinto, así que su id identifica la fila
+            prioridad = NOMBRES_PRIORIDAD.get(reserva.get("Prioridad", PRIORIDAD_GENERAL), "General")
+            tree_reservas.insert("", tk.END, iid=str(id(reserva)), values=(
+                reserva["ISBN"], reserva["Usuario"], prioridad,
+                reserva.get("Expira") or "Sin vencimiento"))
         
-        ttk.Button(reservas_frame, text="Actualizar Reservas", command=actualizar_reservas).grid(
-            row=1, column=0, pady=5)
+        def actualizar_reservas():
+            tree_reservas.delete(*tree_reservas.get_children())
+            for reserva in self.gestor_prestamos.obtener_reservas_pendientes():
+                insertar_reserva(reserva)
+        
+        def aplicar_eventos_reservas(eventos):
+            for evento in eventos:
+                if evento.tipo == ev.RESERVAS_RECARGADAS:
+                    actualizar_reservas()
+                elif evento.tipo == ev.RESERVA_ENCOLADA:
+                    insertar_reserva(evento.datos["reserva"])
+                elif evento.tipo in (ev.RESERVA_ATENDIDA, ev.RESERVA_RETIRADA):
+                    fila = str(id(evento.datos["reserva"]))
+                    if tree_reservas.exists(fila):
+                        tree_reservas.delete(fila)
+        
+        def eliminar_expiradas():
+            expiradas = self.operaciones.barrer_reservas_expiradas()
+            messagebox.showinfo("Reservas", f"Se eliminaron {len(expiradas)} reserva(s) expirada(s)")
+        
+        botones_reservas = ttk.Frame(reservas_frame)
+        botones_reservas.grid(row=1, column=0, pady=5)
+        ttk.Button(botones_reservas, text="Actualizar Reservas", 
+                  command=actualizar_reservas).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botones_reservas, text="Eliminar Expiradas", 
+                  command=eliminar_expiradas).pack(side=tk.LEFT, padx=5)
         actualizar_reservas()
+        self._vistas.append(aplicar_eventos_reservas)
+        
+        # Pestaña de vencimientos
+        vencimientos_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(vencimientos_frame, text="Vencimientos")
+        
+        text_vencimientos = scrolledtext.ScrolledText(vencimientos_frame, height=20, width=60)
+        text_vencimientos.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        vencimientos_frame.columnconfigure(0, weight=1)
+        vencimientos_frame.rowconfigure(0, weight=1)
+        
+        def actualizar_vencimientos():
+            vencidos = self.gestor_prestamos.prestamos_vencidos()
+            proximos = self.gestor_prestamos.proximos_a_vencer(48)
+            text_vencimientos.delete(1.0, tk.END)
+            text_vencimientos.insert(tk.END, f"Préstamos vencidos ({len(vencidos)}):\n\n")
+            for i, prestamo in enumerate(vencidos, 1):
+                text_vencimientos.insert(tk.END, 
+                    f"{i}. ISBN: {prestamo['ISBN']} - Usuario: {prestamo['Usuario']} - Venció: {prestamo['Vence']}\n")
+            text_vencimientos.insert(tk.END, f"\nPróximos a vencer en 48 horas ({len(proximos)}):\n\n")
+            for i, prestamo in enumerate(proximos, 1):
+                text_vencimientos.insert(tk.END, 
+                    f"{i}. ISBN: {prestamo['ISBN']} - Usuario: {prestamo['Usuario']} - Vence: {prestamo['Vence']}\n")
+        
+        ttk.Button(vencimientos_frame, text="Actualizar Vencimientos", command=actualizar_vencimientos).grid(
+            row=1, column=0, pady=5)
+        actualizar_vencimientos()
+        
+        def aplicar_eventos_historial(eventos):
+            # Los vencimientos dependen de todo el índice de préstamos activos;
+            # basta recalcularlos una vez por grupo de eventos del historial
+            if any(ev.AREA_EVENTO.get(evento.tipo) == "historial" for evento in eventos):
+                actualizar_vencimientos()
+        
+        self._vistas.append(aplicar_eventos_historial)
     
     def mostrar_busqueda(self):
         """Muestra la interfaz de búsqueda."""
@@ -347,7 +606,7 @@ class InterfazGestionBibliotecas:
         frame = ttk.LabelFrame(self.content_frame, text="Búsqueda de Libros", padding="10")
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
         frame.columnconfigure(0, weight=1)
-        frame.rowconfigure(2, weight=1)
+        frame.rowconfigure(3, weight=1)
         
         # Búsqueda por ISBN
         isbn_frame = ttk.LabelFrame(frame, text="Búsqueda Binaria por ISBN", padding="10")
@@ -396,21 +655,72 @@ class InterfazGestionBibliotecas:
             resultados = self.gestor_libros.buscar_por_titulo_autor(termino)
             resultado_text.delete(1.0, tk.END)
             if resultados:
-                resultado_text.insert(tk.END, f"Se encontraron {len(resultados)} resultado(s):\n\n")
-                for i, libro in enumerate(resultados, 1):
-                    resultado_text.insert(tk.END, f"{i}. {libro.titulo}\n")
-                    resultado_text.insert(tk.END, f"   ISBN: {libro.isbn} | Autor: {libro.autor}\n")
-                    resultado_text.insert(tk.END, f"   Peso: {libro.peso} Kg | Valor: ${libro.valor:,} COP\n")
-                    resultado_text.insert(tk.END, f"   Disponibles: {libro.cantidad_presente}/{libro.cantidad}\n\n")
+                listar_resultados(resultados)
             else:
                 resultado_text.insert(tk.END, f"No se encontraron libros con el término '{termino}'")
         
+        def listar_resultados(resultados):
+            resultado_text.insert(tk.END, f"Se encontraron {len(resultados)} resultado(s):\n\n")
+            for i, libro in enumerate(resultados, 1):
+                resultado_text.insert(tk.END, f"{i}. {libro.titulo}\n")
+                resultado_text.insert(tk.END, f"   ISBN: {libro.isbn} | Autor: {libro.autor}\n")
+                resultado_text.insert(tk.END, f"   Peso: {libro.peso} Kg | Valor: ${libro.valor:,} COP\n")
+                resultado_text.insert(tk.END, f"   Disponibles: {libro.cantidad_presente}/{libro.cantidad}\n\n")
+        
         ttk.Button(lineal_frame, text="Buscar", command=buscar_lineal).grid(
             row=0, column=2, padx=5)
         
+        # Búsqueda con varios criterios
+        avanzada_frame = ttk.LabelFrame(frame, text="Búsqueda Avanzada", padding="10")
+        avanzada_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
+        
+        campos = {}
+        for columna, (clave, etiqueta) in enumerate((("autor", "Autor:"), ("valor_min", "Valor mín.:"),
+                                                      ("valor_max", "Valor máx.:"), ("peso_max", "Peso máx.:"))):
+            ttk.Label(avanzada_frame, text=etiqueta).grid(row=0, column=2 * columna, sticky=tk.W, pady=5)
+            campos[clave] = ttk.Entry(avanzada_frame, width=16 if clave == "autor" else 10)
+            campos[clave].grid(row=0, column=2 * columna + 1, pady=5, padx=5)
+        
+        solo_disponibles = tk.BooleanVar(value=False)
+        ttk.Checkbutton(avanzada_frame, text="Solo disponibles", 
+                        variable=solo_disponibles).grid(row=1, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(avanzada_frame, text="Ordenar por:").grid(row=1, column=2, sticky=tk.W)
+        combo_orden = ttk.Combobox(avanzada_frame, values=["", "titulo", "autor", "valor", "peso", "isbn"],
+                                   state="readonly", width=8)
+        combo_orden.grid(row=1, column=3, padx=5)
+        
+        def criterios_avanzados():
+            criterios = {"autor": campos["autor"].get().strip() or None,
+                         "solo_disponibles": solo_disponibles.get(),
+                         "ordenar_por": combo_orden.get() or None}
+            for clave in ("valor_min", "valor_max", "peso_max"):
+                texto = campos[clave].get().strip().replace(",", "")
+                criterios[clave] = float(texto) if texto else None
+            return criterios
+        
+        def buscar_avanzada(explicar=False):
+            try:
+                criterios = criterios_avanzados()
+            except ValueError:
+                messagebox.showerror("Error", "Ingrese valores numéricos válidos")
+                return
+            resultado = self.gestor_libros.consultar(explicar=explicar, **criterios)
+            resultado_text.delete(1.0, tk.END)
+            if explicar:
+                resultado_text.insert(tk.END, f"Plan de la consulta:\n\n{resultado}\n")
+            elif resultado:
+                listar_resultados(resultado)
+            else:
+                resultado_text.insert(tk.END, "No se encontraron libros con esos criterios")
+        
+        ttk.Button(avanzada_frame, text="Buscar", command=buscar_avanzada).grid(
+            row=1, column=4, padx=5)
+        ttk.Button(avanzada_frame, text="Explicar", command=lambda: buscar_avanzada(True)).grid(
+            row=1, column=5, padx=5)
+        
         # Área de resultados
         resultado_frame = ttk.LabelFrame(frame, text="Resultados", padding="10")
-        resultado_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        resultado_frame.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         resultado_frame.columnconfigure(0, weight=1)
         resultado_frame.rowconfigure(0, weight=1)
         
@@ -424,31 +734,76 @@ class InterfazGestionBibliotecas:
         frame = ttk.LabelFrame(self.content_frame, text="Reportes", padding="10")
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
         frame.columnconfigure(0, weight=1)
-        frame.rowconfigure(1, weight=1)
+        frame.rowconfigure(2, weight=1)
+        
+        def mostrar_libros(titulo, libros):
+            texto_reporte.delete(1.0, tk.END)
+            texto_reporte.insert(tk.END, titulo)
+            for i, libro in enumerate(libros, 1):
+                texto_reporte.insert(tk.END, f"{i}. {libro.titulo}\n")
+                texto_reporte.insert(tk.END, f"   Valor: ${libro.valor:,} COP | Peso: {libro.peso} Kg\n")
+                texto_reporte.insert(tk.END, f"   ISBN: {libro.isbn} | Autor: {libro.autor}\n\n")
         
         def generar_reporte():
-            inventario = self.gestor_libros.obtener_inventario_general()
-            if not inventario:
+            # El índice por valor ya mantiene el orden, no hace falta reordenar
+            inventario_ordenado = self.gestor_libros.obtener_inventario_por_valor()
+            if not inventario_ordenado:
                 messagebox.showwarning("Advertencia", "No hay libros en el inventario")
                 return
             
-            self.ordenamiento.generar_reporte_por_valor(inventario)
+            self.ordenamiento.generar_reporte_por_valor(inventario_ordenado, ordenado=True)
             messagebox.showinfo("Éxito", "Reporte generado exitosamente en 'reporte_por_valor.json'")
             
             # Mostrar el reporte
-            inventario_ordenado = self.ordenamiento.merge_sort_por_valor(inventario)
-            texto_reporte.delete(1.0, tk.END)
-            texto_reporte.insert(tk.END, "Reporte de Inventario Ordenado por Valor (Merge Sort):\n\n")
-            for i, libro in enumerate(inventario_ordenado, 1):
-                texto_reporte.insert(tk.END, f"{i}. {libro.titulo}\n")
-                texto_reporte.insert(tk.END, f"   Valor: ${libro.valor:,} COP | Peso: {libro.peso} Kg\n")
-                texto_reporte.insert(tk.END, f"   ISBN: {libro.isbn} | Autor: {libro.autor}\n\n")
+            mostrar_libros("Reporte de Inventario Ordenado por Valor:\n\n", inventario_ordenado)
+        
+        def buscar_rango():
+            try:
+                minimo = float(entry_minimo.get().strip().replace(",", ""))
+                maximo = float(entry_maximo.get().strip().replace(",", ""))
+            except ValueError:
+                messagebox.showerror("Error", "Ingrese valores numéricos válidos")
+                return
+            libros = self.gestor_libros.libros_en_rango_valor(minimo, maximo)
+            mostrar_libros(f"Libros con valor entre ${minimo:,.0f} y ${maximo:,.0f} COP "
+                           f"({len(libros)} encontrados):\n\n", libros)
         
-        ttk.Button(frame, text="Generar Reporte por Valor (Merge Sort)", 
-                  command=generar_reporte).grid(row=0, column=0, pady=10)
+        def mostrar_circulacion():
+            texto_reporte.delete(1.0, tk.END)
+            texto_reporte.insert(tk.END, "Libros más prestados (toda la historia, aproximado):\n\n")
+            for i, (isbn, prestamos) in enumerate(self.analitica.libros_mas_prestados(10), 1):
+                libro = self.gestor_libros.buscar_por_isbn_binaria(isbn)
+                titulo = libro.titulo if libro else isbn
+                texto_reporte.insert(tk.END, f"{i}. {titulo} - {prestamos} préstamo(s)\n")
+            dias = self.analitica.dias_ventana
+            texto_reporte.insert(tk.END, f"\nUsuarios más activos (últimos {dias} días):\n\n")
+            for i, (usuario, prestamos) in enumerate(
+                    self.analitica.usuarios_mas_activos(10, recientes=True), 1):
+                texto_reporte.insert(tk.END, f"{i}. {usuario} - {prestamos} préstamo(s)\n")
+            texto_reporte.insert(tk.END, f"\nPréstamos por día (últimos {dias} días):\n\n")
+            for dia, prestamos in self.analitica.prestamos_por_dia():
+                texto_reporte.insert(tk.END, f"{dia}: {prestamos}\n")
+        
+        botones_frame = ttk.Frame(frame)
+        botones_frame.grid(row=0, column=0, pady=10)
+        ttk.Button(botones_frame, text="Generar Reporte por Valor", 
+                  command=generar_reporte).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botones_frame, text="Circulación", 
+                  command=mostrar_circulacion).pack(side=tk.LEFT, padx=5)
+        
+        rango_frame = ttk.Frame(frame)
+        rango_frame.grid(row=1, column=0, pady=5)
+        ttk.Label(rango_frame, text="Valor mínimo:").pack(side=tk.LEFT, padx=5)
+        entry_minimo = ttk.Entry(rango_frame, width=12)
+        entry_minimo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(rango_frame, text="Valor máximo:").pack(side=tk.LEFT, padx=5)
+        entry_maximo = ttk.Entry(rango_frame, width=12)
+        entry_maximo.pack(side=tk.LEFT, padx=5)
+        ttk.Button(rango_frame, text="Buscar por Rango de Valor", 
+                  command=buscar_rango).pack(side=tk.LEFT, padx=5)
         
         texto_reporte = scrolledtext.ScrolledText(frame, height=20, width=60)
-        texto_reporte.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        texto_reporte.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
     def mostrar_estanteria(self):
         """Muestra la interfaz del módulo de estantería."""
@@ -506,14 +861,34 @@ class InterfazGestionBibliotecas:
                 messagebox.showwarning("Advertencia", "No hay libros en el inventario")
                 return
             
-            mejor_combinacion, mejor_valor, mejor_peso = self.estanteria.backtracking_estanteria_optima(inventario)
+            # Solo los libros que caben en el estante, tomados del índice por peso.
+            # Se parte de la última solución: tras unos pocos cambios en el
+            # inventario solo se revisa lo que esos cambios afectan
+            candidatos = self.gestor_libros.libros_en_rango_peso(0, self.estanteria.capacidad_maxima)
+            mostrar_resultado(self.estanteria.reoptimizar(candidatos, self.gestor_libros.version_catalogo),
+                              self.estanteria.capacidad_maxima)
+        
+        def mostrar_frontera():
+            try:
+                capacidad = float(entry_capacidad.get())
+            except ValueError:
+                messagebox.showerror("Error", "La capacidad debe ser un número")
+                return
+            # La frontera se calcula una vez por versión del catálogo; cada
+            # capacidad consultada después es una búsqueda binaria
+            mostrar_resultado(self.estanteria.estanteria_optima(
+                self.gestor_libros.obtener_inventario_general(), capacidad,
+                self.gestor_libros.version_catalogo), capacidad)
+        
+        def mostrar_resultado(resultado, capacidad):
+            mejor_combinacion, mejor_valor, mejor_peso = resultado
             texto_backtrack.delete(1.0, tk.END)
             
             if mejor_combinacion:
                 texto_backtrack.insert(tk.END, "Estantería Óptima:\n\n")
                 texto_backtrack.insert(tk.END, f"Valor total: ${mejor_valor:,} COP\n")
                 texto_backtrack.insert(tk.END, f"Peso total: {mejor_peso:.2f} Kg\n")
-                texto_backtrack.insert(tk.END, f"Capacidad máxima: {self.estanteria.capacidad_maxima} Kg\n\n")
+                texto_backtrack.insert(tk.END, f"Capacidad máxima: {capacidad} Kg\n\n")
                 texto_backtrack.insert(tk.END, f"Libros seleccionados ({len(mejor_combinacion)}):\n\n")
                 for libro in mejor_combinacion:
                     texto_backtrack.insert(tk.END, 
@@ -523,8 +898,16 @@ class InterfazGestionBibliotecas:
             else:
                 texto_backtrack.insert(tk.END, "No se encontró una combinación válida")
         
-        ttk.Button(backtrack_frame, text="Calcular Estantería Óptima", 
-                  command=mostrar_backtracking).grid(row=0, column=0, pady=10)
+        controles_frame = ttk.Frame(backtrack_frame)
+        controles_frame.grid(row=0, column=0, sticky=tk.W, pady=10)
+        ttk.Button(controles_frame, text="Calcular Estantería Óptima", 
+                  command=mostrar_backtracking).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controles_frame, text="Capacidad (Kg):").pack(side=tk.LEFT, padx=5)
+        entry_capacidad = ttk.Entry(controles_frame, width=8)
+        entry_capacidad.insert(0, str(self.estanteria.capacidad_maxima))
+        entry_capacidad.pack(side=tk.LEFT)
+        ttk.Button(controles_frame, text="Consultar con Frontera de Pareto", 
+                  command=mostrar_frontera).pack(side=tk.LEFT, padx=5)
         
         texto_backtrack = scrolledtext.ScrolledText(backtrack_frame, height=20, width=60)
         texto_backtrack.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -597,6 +980,41 @@ class InterfazGestionBibliotecas:
         
         texto_cola = scrolledtext.ScrolledText(cola_frame, height=15, width=60)
         texto_cola.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        
+        # Estadísticas de todos los autores en una sola pasada
+        autores_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(autores_frame, text="Todos los Autores")
+        autores_frame.columnconfigure(0, weight=1)
+        autores_frame.rowconfigure(1, weight=1)
+        
+        columnas = ("Autor", "Títulos", "Ejemplares", "Disponibles", "Valor Total", "Peso Total", "Peso Promedio")
+        tree_autores = ttk.Treeview(autores_frame, columns=columnas, show="headings", height=20)
+        for col in columnas:
+            tree_autores.heading(col, text=col)
+            tree_autores.column(col, width=140 if col == "Autor" else 100)
+        tree_autores.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        scrollbar_autores = ttk.Scrollbar(autores_frame, orient=tk.VERTICAL, command=tree_autores.yview)
+        scrollbar_autores.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        tree_autores.configure(yscrollcommand=scrollbar_autores.set)
+        
+        def generar_reporte_autores():
+            inventario = self.gestor_libros.obtener_inventario_general()
+            try:
+                tabla = self.reporte_autores.generar_reporte(inventario)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo generar el reporte de autores: {e}")
+                return
+            tree_autores.delete(*tree_autores.get_children())
+            for fila in tabla:
+                tree_autores.insert("", tk.END, values=(
+                    fila["Autor"], fila["Titulos"], fila["Ejemplares"],
+                    f"{fila['Disponibles']} ({fila['Proporcion_disponible']:.0%})",
+                    f"${fila['Valor_total']:,}", f"{fila['Peso_total']:.2f} Kg",
+                    f"{fila['Peso_promedio']:.2f} Kg"))
+            messagebox.showinfo("Éxito", f"Reporte de {len(tabla)} autor(es) generado en reporte_autores.json")
+        
+        ttk.Button(autores_frame, text="Generar Reporte de Autores", 
+                  command=generar_reporte_autores).grid(row=0, column=0, sticky=tk.W, pady=5)
     
     def mostrar_inventario(self):
         """Muestra el inventario completo."""
@@ -626,13 +1044,8 @@ class InterfazGestionBibliotecas:
         tree_general.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar_general.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        inventario_general = self.gestor_libros.obtener_inventario_general()
-        for libro in inventario_general:
-            tree_general.insert("", tk.END, values=(
-                libro.isbn, libro.titulo, libro.autor, 
-                f"{libro.peso} Kg", f"${libro.valor:,}", 
-                libro.cantidad_presente, libro.cantidad
-            ))
+        self._rellenar_libros(tree_general, self.gestor_libros.obtener_inventario_general())
+        self._vistas.append(self._vista_libros(tree_general, self.gestor_libros.obtener_inventario_general))
         
         # Inventario Ordenado
         ordenado_frame = ttk.Frame(notebook, padding="10")
@@ -652,16 +1065,91 @@ class InterfazGestionBibliotecas:
         tree_ordenado.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar_ordenado.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        inventario_ordenado = self.gestor_libros.obtener_inventario_ordenado()
-        for libro in inventario_ordenado:
-            tree_ordenado.insert("", tk.END, values=(
-                libro.isbn, libro.titulo, libro.autor, 
-                f"{libro.peso} Kg", f"${libro.valor:,}", 
-                libro.cantidad_presente, libro.cantidad
-            ))
+        self._rellenar_libros(tree_ordenado, self.gestor_libros.obtener_inventario_ordenado())
+        self._vistas.append(self._vista_libros(tree_ordenado, self.gestor_libros.obtener_inventario_ordenado,
+                                               ordenada=True))
+
+    def mostrar_diagnostico(self):
+        """Muestra el panel de diagnóstico con las métricas de instrumentación."""
+        self.limpiar_contenido()
+        
+        frame = ttk.LabelFrame(self.content_frame, text="Diagnóstico de Rendimiento", padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+        
+        botones_frame = ttk.Frame(frame)
+        botones_frame.grid(row=0, column=0, sticky=tk.W, pady=5)
+        
+        estado = tk.StringVar()
+        
+        columns = ("Método", "Llamadas", "p50 (ms)", "p95 (ms)", "p99 (ms)", 
+                   "Bytes escritos", "Examinados (prom.)")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=110)
+        tree.column("Método", width=260)
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        
+        def actualizar_metricas():
+            cache = self.gestor_libros.estadisticas_cache
+            estado.set(("Instrumentación activa" if instrumentacion_activa() 
+                        else "Instrumentación desactivada") +
+                       f" | Caché de búsquedas: {cache['aciertos']} aciertos, "
+                       f"{cache['fallos']} fallos, {cache['desalojos']} desalojos")
+            for item in tree.get_children():
+                tree.delete(item)
+            for nombre, datos in metricas.resumen().items():
+                latencia = datos["latencia_s"]
+                bytes_escritos = datos.get("bytes_escritos", {}).get("bytes_totales", "")
+                examinados = datos.get("examinados", {}).get("promedio", "")
+                tree.insert("", tk.END, values=(
+                    nombre, datos["llamadas"],
+                    f"{latencia['p50'] * 1000:.3f}", f"{latencia['p95'] * 1000:.3f}",
+                    f"{latencia['p99'] * 1000:.3f}",
+                    f"{bytes_escritos:,}" if bytes_escritos != "" else "",
+                    f"{examinados:,.1f}" if examinados != "" else ""
+                ))
+        
+        def alternar_instrumentacion():
+            if instrumentacion_activa():
+                desactivar_instrumentacion()
+            else:
+                activar_instrumentacion()
+            actualizar_metricas()
+        
+        def reiniciar_metricas():
+            metricas.reiniciar()
+            actualizar_metricas()
+        
+        def exportar_metricas():
+            try:
+                ruta = metricas.exportar_json()
+                messagebox.showinfo("Éxito", f"Métricas exportadas en '{os.path.basename(ruta)}'")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al exportar métricas: {str(e)}")
+        
+        ttk.Button(botones_frame, text="Activar/Desactivar", 
+                  command=alternar_instrumentacion).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botones_frame, text="Actualizar", 
+                  command=actualizar_metricas).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botones_frame, text="Reiniciar", 
+                  command=reiniciar_metricas).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botones_frame, text="Exportar JSON", 
+                  command=exportar_metricas).pack(side=tk.LEFT, padx=5)
+        ttk.Label(botones_frame, textvariable=estado).pack(side=tk.LEFT, padx=10)
+        
+        actualizar_metricas()
 
 def main():
     """Función principal que inicia la aplicación."""
+    if os.environ.get("SGB_METRICAS") == "1":
+        activar_instrumentacion()
     root = tk.Tk()
     app = InterfazGestionBibliotecas(root)
     root.mainloop()
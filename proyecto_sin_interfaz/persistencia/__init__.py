@@ -0,0 +1,8 @@
+from .diario import DiarioCambios
+from .serializador import escribir_registros, leer_registros, formato_predeterminado
+from .archivo_historial import ArchivoHistorial
+from .sincronizacion import BloqueoArchivo, RegistroCambios
+from .escritor_diferido import EscritorDiferido
+
+__all__ = ['DiarioCambios', 'escribir_registros', 'leer_registros', 'formato_predeterminado',
+           'ArchivoHistorial', 'BloqueoArchivo', 'RegistroCambios', 'EscritorDiferido']
@@ -0,0 +1,210 @@
+"""
+Módulo que implementa el archivo histórico de préstamos: segmentos
+comprimidos, uno por mes, con los préstamos cerrados que ya no se
+mantienen en memoria.
+
+Cada segmento es un archivo JSON Lines comprimido con gzip
+(historial_AAAA-MM.jsonl.gz). Un índice (indice.json) guarda, por segmento,
+el número de registros, el rango de fechas y los usuarios que aparecen en
+él, de modo que una consulta por usuario solo descomprime los segmentos
+donde ese usuario tiene préstamos.
+"""
+
+import json
+import os
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from .serializador import escribir_registros, leer_registros, sincronizar
+
+
+class ArchivoHistorial:
+    """
+    Clase que gestiona los segmentos archivados del historial de préstamos.
+
+    Atributos:
+        directorio: Ruta del directorio de los segmentos
+        segmentos: Diccionario mes (AAAA-MM) -> metadatos del segmento
+    """
+
+    ARCHIVO_INDICE = "indice.json"
+
+    def __init__(self, directorio: str = "historial_archivo"):
+        """
+        Inicializa el archivo histórico y carga su índice si existe.
+
+        Args:
+            directorio: Ruta del directorio de los segmentos
+        """
+        self.directorio = directorio
+        self.segmentos: Dict[str, Dict[str, Any]] = {}
+        self._segmentos_por_usuario: Optional[Dict[str, List[str]]] = None
+        self.cargar_indice()
+
+    @property
+    def ruta(self) -> str:
+        """Ruta completa del directorio de los segmentos."""
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        return os.path.join(dir_proyecto, self.directorio)
+
+    def cargar_indice(self) -> None:
+        """Carga el índice de segmentos desde el directorio del archivo."""
+        try:
+            with open(os.path.join(self.ruta, self.ARCHIVO_INDICE), "r", encoding="utf-8") as f:
+                self.segmentos = json.load(f)
+        except FileNotFoundError:
+            self.segmentos = {}
+        except Exception as e:
+            print(f"Error al cargar el índice del archivo histórico: {e}")
+            self.segmentos = {}
+        self._segmentos_por_usuario = None
+
+    def _guardar_indice(self) -> None:
+        """Guarda el índice de segmentos."""
+        ruta_indice = os.path.join(self.ruta, self.ARCHIVO_INDICE)
+        temporal = ruta_indice + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.segmentos, f, indent=4, ensure_ascii=False)
+        sincronizar(temporal)
+        os.replace(temporal, ruta_indice)
+
+    @property
+    def hasta(self) -> Optional[str]:
+        """Fecha del préstamo archivado más reciente, o None si no hay segmentos."""
+        if not self.segmentos:
+            return None
+        return max(segmento["hasta"] for segmento in self.segmentos.values())
+
+    def total_registros(self) -> int:
+        """
+        Retorna el número de préstamos archivados.
+
+        Returns:
+            Suma de los registros de todos los segmentos
+        """
+        return sum(segmento["registros"] for segmento in self.segmentos.values())
+
+    def archivar(self, registros: Iterable[Dict[str, Any]]) -> int:
+        """
+        Agrega préstamos al archivo, agrupados por el mes de su fecha de
+        préstamo. Si el segmento del mes ya existe se reescribe con los
+        registros anteriores más los nuevos.
+
+        Args:
+            registros: Préstamos cerrados a archivar
+
+        Returns:
+            Número de registros archivados
+        """
+        por_mes: Dict[str, List[Dict[str, Any]]] = {}
+        for registro in registros:
+            por_mes.setdefault(registro["Fecha"][:7], []).append(registro)
+        if not por_mes:
+            return 0
+
+        os.makedirs(self.ruta, exist_ok=True)
+        total = 0
+        for mes, nuevos in sorted(por_mes.items()):
+            nombre = f"historial_{mes}.jsonl.gz"
+            ruta_segmento = os.path.join(self.ruta, nombre)
+            anteriores = leer_registros(ruta_segmento) if mes in self.segmentos else []
+            usuarios: Set[str] = set(self.segmentos.get(mes, {}).get("usuarios", []))
+            fechas = [registro["Fecha"] for registro in nuevos]
+            # El segmento anterior se lee mientras se escribe el temporal
+            # que lo reemplaza
+            cantidad = escribir_registros(ruta_segmento, chain(anteriores, nuevos),
+                                          formato="jsonl", comprimir=True)
+
+            usuarios.update(registro["Usuario"] for registro in nuevos)
+            anterior = self.segmentos.get(mes)
+            self.segmentos[mes] = {
+                "archivo": nombre,
+                "registros": cantidad,
+                "desde": min(fechas + ([anterior["desde"]] if anterior else [])),
+                "hasta": max(fechas + ([anterior["hasta"]] if anterior else [])),
+                "usuarios": sorted(usuarios),
+            }
+            total += len(nuevos)
+
+        self._guardar_indice()
+        self._segmentos_por_usuario = None
+        return total
+
+    def _indice_usuarios(self) -> Dict[str, List[str]]:
+        """Construye (una sola vez) el índice usuario -> meses con préstamos."""
+        if self._segmentos_por_usuario is None:
+            indice: Dict[str, List[str]] = {}
+            for mes in sorted(self.segmentos):
+                for usuario in self.segmentos[mes]["usuarios"]:
+                    indice.setdefault(usuario, []).append(mes)
+            self._segmentos_por_usuario = indice
+        return self._segmentos_por_usuario
+
+    def historial_usuario(self, usuario: str, desde: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos archivados de un usuario, en orden cronológico.
+        Solo se leen los segmentos en los que aparece el usuario.
+
+        Args:
+            usuario: Nombre del usuario
+            desde: Si se indica, solo préstamos con fecha igual o posterior
+
+        Returns:
+            Lista de diccionarios con los préstamos del usuario
+        """
+        resultado = []
+        for mes in self._indice_usuarios().get(usuario, []):
+            segmento = self.segmentos[mes]
+            if desde is not None and segmento["hasta"] < desde:
+                continue
+            for registro in leer_registros(os.path.join(self.ruta, segmento["archivo"])):
+                if registro["Usuario"] == usuario and (desde is None or registro["Fecha"] >= desde):
+                    resultado.append(registro)
+        # Un préstamo cerrado tarde puede archivarse después que otros más recientes
+        resultado.sort(key=lambda registro: registro["Fecha"])
+        return resultado
+
+    def iterar_registros(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre todos los préstamos archivados, segmento por segmento en
+        orden de mes, sin cargar más de un registro a la vez.
+
+        Returns:
+            Iterador de diccionarios de préstamos
+        """
+        for mes in sorted(self.segmentos):
+            yield from leer_registros(os.path.join(self.ruta, self.segmentos[mes]["archivo"]))
+
+    def registros_en_rango(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                           usuario: Optional[str] = None,
+                           isbn: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los préstamos archivados entre dos fechas, en orden
+        cronológico. Solo se leen los segmentos cuyo rango de fechas se
+        cruza con el pedido y, si se indica un usuario, donde él aparece.
+
+        Args:
+            desde: Fecha inicial en formato AAAA-MM-DD HH:MM:SS (None = sin límite)
+            hasta: Fecha final, inclusive (None = sin límite)
+            usuario: Si se indica, solo préstamos de ese usuario
+            isbn: Si se indica, solo préstamos de ese ISBN
+
+        Returns:
+            Lista de diccionarios con los préstamos
+        """
+        meses = self._indice_usuarios().get(usuario, []) if usuario is not None else sorted(self.segmentos)
+        resultado = []
+        for mes in meses:
+            segmento = self.segmentos[mes]
+            if desde is not None and segmento["hasta"] < desde:
+                continue
+            if hasta is not None and segmento["desde"] > hasta:
+                continue
+            for registro in leer_registros(os.path.join(self.ruta, segmento["archivo"])):
+                if ((usuario is None or registro["Usuario"] == usuario) and
+                        (isbn is None or registro["ISBN"] == isbn) and
+                        (desde is None or registro["Fecha"] >= desde) and
+                        (hasta is None or registro["Fecha"] <= hasta)):
+                    resultado.append(registro)
+        resultado.sort(key=lambda registro: registro["Fecha"])
+        return resultado
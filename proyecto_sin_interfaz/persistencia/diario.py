@@ -0,0 +1,85 @@
+"""
+Módulo que implementa un diario de cambios de solo anexado.
+
+Cada cambio se escribe como una línea JSON al final del archivo, de modo que
+registrar una modificación cuesta O(1) sin importar el tamaño de los datos.
+Al cargar, los cambios del diario se aplican sobre la última instantánea
+completa; al guardar una nueva instantánea el diario se vacía.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+
+class DiarioCambios:
+    """
+    Clase que gestiona un archivo de cambios en formato JSON Lines.
+    
+    Atributos:
+        archivo: Ruta del archivo del diario
+        entradas: Cambios en el diario (los leídos al cargar más los anexados)
+    """
+    
+    def __init__(self, archivo: str):
+        """
+        Inicializa el diario.
+        
+        Args:
+            archivo: Ruta del archivo del diario
+        """
+        self.archivo = archivo
+        self.entradas = 0
+    
+    @property
+    def ruta(self) -> str:
+        """Ruta completa del archivo del diario."""
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        return os.path.join(dir_proyecto, self.archivo)
+    
+    def anexar(self, operacion: str, datos: Dict[str, Any]) -> None:
+        """
+        Agrega un cambio al final del diario.
+        
+        Args:
+            operacion: Nombre de la operación (p. ej. "alta" o "baja")
+            datos: Datos del cambio
+        """
+        try:
+            linea = json.dumps({"op": operacion, "datos": datos}, ensure_ascii=False)
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(linea + "\n")
+            self.entradas += 1
+        except Exception as e:
+            print(f"Error al escribir en el diario: {e}")
+    
+    def leer(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Lee los cambios del diario en el orden en que se registraron.
+        Las líneas incompletas (p. ej. por una escritura interrumpida) se ignoran.
+        
+        Returns:
+            Iterador de tuplas (operación, datos)
+        """
+        self.entradas = 0
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    cambio = json.loads(linea)
+                    operacion, datos = cambio["op"], cambio["datos"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.entradas += 1
+                yield operacion, datos
+    
+    def vaciar(self) -> None:
+        """Elimina todos los cambios del diario."""
+        try:
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+            self.entradas = 0
+        except Exception as e:
+            print(f"Error al vaciar el diario: {e}")
@@ -0,0 +1,166 @@
+"""
+Módulo que implementa un escritor de archivos en segundo plano.
+
+Con el guardado automático, cada préstamo o devolución reescribía el
+inventario y el historial completos en el hilo que hizo el cambio (en la
+interfaz, el hilo de Tk). El escritor diferido solo marca el almacén como
+modificado y lo escribe desde un hilo propio, a más tardar `latencia`
+segundos después del primer cambio pendiente: todos los cambios de esa
+ventana se agrupan en una sola escritura.
+
+Cada almacén se identifica con una clave (el propio objeto) y se programa
+junto con una instantánea de sus datos, tomada en el hilo que hizo el
+cambio: una copia que no comparte objetos modificables con el almacén (los
+libros se copian como diccionarios con to_dict), así que el hilo escritor
+solo serializa datos que ya nadie modifica. Las escrituras se hacen sobre
+un archivo temporal que se sincroniza con el disco y luego reemplaza al
+original (ver escribir_registros), así que una interrupción nunca deja un
+archivo a medias. Las funciones de escritura retornan True si escribieron
+el archivo; las escrituras fallidas se informan y se cuentan.
+"""
+
+import atexit
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Escritura = Tuple[Callable[[Any], bool], Any]
+
+
+class EscritorDiferido:
+    """
+    Clase que agrupa y escribe en segundo plano los almacenes modificados.
+
+    Atributos:
+        latencia: Segundos máximos entre el primer cambio pendiente y su escritura
+        programadas: Número de escrituras solicitadas con programar
+        escrituras: Número de escrituras realizadas
+        fallidas: Número de escrituras que no pudieron guardar el archivo
+    """
+
+    def __init__(self, latencia: float = 0.5):
+        """
+        Inicializa el escritor e inicia su hilo.
+
+        Args:
+            latencia: Segundos máximos entre el primer cambio pendiente y su escritura
+        """
+        self.latencia = latencia
+        self.programadas = 0
+        self.escrituras = 0
+        self.fallidas = 0
+        self._pendientes: Dict[Any, Escritura] = {}
+        self._limite = 0.0
+        self._activo = True
+        # _condicion protege los pendientes; _escritura serializa las
+        # escrituras, de modo que una instantánea vieja nunca se escribe
+        # después de una más reciente del mismo almacén
+        self._condicion = threading.Condition()
+        self._escritura = threading.Lock()
+        self._hilo = threading.Thread(target=self._ejecutar, name="EscritorDiferido", daemon=True)
+        self._hilo.start()
+        # Se anula el registro al detener, para no retener el escritor hasta el final del proceso
+        atexit.register(self.detener)
+
+    def programar(self, clave: Any, escribir: Callable[[Any], bool], datos: Any) -> None:
+        """
+        Marca un almacén como modificado. Si ya tenía una escritura pendiente,
+        se reemplaza por la nueva instantánea.
+
+        Args:
+            clave: Almacén modificado
+            escribir: Función que escribe la instantánea en el archivo
+            datos: Instantánea de los datos del almacén (una copia que el almacén ya no modifica)
+        """
+        with self._condicion:
+            activo = self._activo
+            if activo:
+                if not self._pendientes:
+                    self._limite = time.monotonic() + self.latencia
+                    self._condicion.notify()
+                self._pendientes[clave] = (escribir, datos)
+                self.programadas += 1
+        # Después de detener el escritor ya no hay hilo: se escribe de inmediato
+        if not activo:
+            self.escribir(clave, escribir, datos)
+
+    def escribir(self, clave: Any, escribir: Callable[[Any], bool], datos: Any) -> bool:
+        """
+        Escribe un almacén de inmediato en el hilo actual, descartando la
+        escritura pendiente que tuviera.
+
+        Args:
+            clave: Almacén a escribir
+            escribir: Función que escribe la instantánea en el archivo
+            datos: Instantánea de los datos del almacén
+
+        Returns:
+            True si se escribió el archivo
+        """
+        with self._escritura:
+            with self._condicion:
+                self._pendientes.pop(clave, None)
+            return self._realizar(escribir, datos)
+
+    def vaciar(self, clave: Optional[Any] = None) -> None:
+        """
+        Escribe de inmediato, en el hilo actual, las escrituras pendientes.
+
+        Args:
+            clave: Almacén a escribir (None = todos los pendientes)
+        """
+        with self._escritura:
+            with self._condicion:
+                if clave is None:
+                    pendientes = list(self._pendientes.values())
+                    self._pendientes = {}
+                else:
+                    pendiente = self._pendientes.pop(clave, None)
+                    pendientes = [pendiente] if pendiente is not None else []
+            for escribir, datos in pendientes:
+                self._realizar(escribir, datos)
+
+    def detener(self) -> None:
+        """Escribe los pendientes y termina el hilo escritor."""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify()
+        if self._hilo.is_alive() and self._hilo is not threading.current_thread():
+            self._hilo.join()
+        self.vaciar()
+        atexit.unregister(self.detener)
+
+    def _realizar(self, escribir: Callable[[Any], bool], datos: Any) -> bool:
+        """
+        Escribe una instantánea; un error no detiene al hilo escritor.
+
+        Returns:
+            True si se escribió el archivo
+        """
+        try:
+            exito = escribir(datos) is not False
+        except Exception as e:
+            print(f"Error en la escritura diferida: {e}")
+            exito = False
+        self.escrituras += 1
+        if not exito:
+            self.fallidas += 1
+            nombre = getattr(escribir, "__qualname__", repr(escribir))
+            print(f"Escritura diferida fallida ({nombre}): el archivo conserva su versión anterior")
+        return exito
+
+    def _ejecutar(self) -> None:
+        """Ciclo del hilo escritor: espera cambios y los escribe al vencer la latencia."""
+        while True:
+            with self._condicion:
+                while self._activo and not self._pendientes:
+                    self._condicion.wait()
+                if not self._activo:
+                    return
+                espera = self._limite - time.monotonic()
+                while self._activo and self._pendientes and espera > 0:
+                    self._condicion.wait(espera)
+                    espera = self._limite - time.monotonic()
+                if not self._activo:
+                    return
+            self.vaciar()
@@ -0,0 +1,262 @@
+"""
+Módulo que implementa la serialización en streaming de listas de registros.
+
+Los registros se escriben uno a uno desde un iterador, sin construir la
+lista completa de diccionarios ni el texto JSON completo en memoria, y se
+leen también uno a uno. Formatos disponibles:
+- "json": arreglo JSON compacto, un registro por línea (formato predeterminado)
+- "json_indentado": arreglo JSON con sangría de 4 espacios (formato anterior)
+- "jsonl": JSON Lines, un objeto por línea
+
+Cualquiera de ellos puede comprimirse con gzip. El formato predeterminado
+puede cambiarse con la variable de entorno SGB_FORMATO.
+
+La escritura se hace sobre un archivo temporal que al terminar se
+sincroniza con el disco (fsync) y reemplaza al original, de modo que un
+proceso interrumpido o un corte de energía a mitad de la escritura dejan
+el archivo anterior completo en lugar de uno truncado.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+FORMATOS = ("json", "json_indentado", "jsonl")
+
+TAMANIO_BLOQUE = 1 << 16
+REGISTROS_POR_ESCRITURA = 1000
+
+_decodificador = json.JSONDecoder()
+_codificadores = {
+    "json": json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode,
+    "json_indentado": json.JSONEncoder(ensure_ascii=False, indent=4).encode,
+    "jsonl": json.JSONEncoder(ensure_ascii=False).encode,
+}
+
+
+def formato_predeterminado() -> str:
+    """
+    Obtiene el formato usado cuando no se indica uno.
+
+    Returns:
+        Valor de SGB_FORMATO si es un formato válido, o "json"
+    """
+    formato = os.environ.get("SGB_FORMATO", "json")
+    return formato if formato in FORMATOS else "json"
+
+
+def _abrir(ruta: str, modo: str, comprimir: bool) -> IO[str]:
+    """Abre un archivo de texto UTF-8, comprimido con gzip si corresponde."""
+    if comprimir:
+        return gzip.open(ruta, modo + "t", encoding="utf-8")
+    return open(ruta, modo, encoding="utf-8")
+
+
+def escribir_registros(ruta: str, registros: Iterable[Dict[str, Any]],
+                       formato: Optional[str] = None,
+                       comprimir: Optional[bool] = None) -> int:
+    """
+    Escribe registros en un archivo sin cargarlos todos en memoria. El
+    archivo de destino solo se reemplaza cuando la escritura terminó.
+
+    Args:
+        ruta: Ruta completa del archivo de destino
+        registros: Iterable de diccionarios a escribir
+        formato: "json", "json_indentado" o "jsonl" (por defecto, formato_predeterminado())
+        comprimir: Si es True se comprime con gzip; si es None se comprime
+                   cuando la ruta termina en ".gz"
+
+    Returns:
+        Número de registros escritos
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    formato = formato or formato_predeterminado()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no válido: '{formato}'")
+    if comprimir is None:
+        comprimir = ruta.endswith(".gz")
+
+    temporal = ruta + ".tmp"
+    try:
+        total = _escribir(temporal, registros, formato, comprimir)
+        sincronizar(temporal)
+        os.replace(temporal, ruta)
+        sincronizar(os.path.dirname(os.path.abspath(ruta)), directorio=True)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return total
+
+
+def sincronizar(ruta: str, directorio: bool = False) -> None:
+    """
+    Fuerza la escritura en disco de un archivo o de un directorio (para que
+    el reemplazo de un archivo sobreviva a un corte de energía).
+
+    Args:
+        ruta: Ruta del archivo o directorio
+        directorio: Si es True la ruta es un directorio; en Windows, donde
+                    no se pueden abrir directorios, no se hace nada
+    """
+    if directorio and os.name == "nt":
+        return
+    descriptor = os.open(ruta, os.O_RDONLY if directorio else os.O_RDWR)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _escribir(ruta: str, registros: Iterable[Dict[str, Any]], formato: str, comprimir: bool) -> int:
+    """Escribe los registros directamente en la ruta (ver escribir_registros)."""
+    codificar = _codificadores[formato]
+    indentado = formato == "json_indentado"
+    separador = "\n" if formato == "jsonl" else ",\n"
+    apertura = "" if formato == "jsonl" else "[\n"
+    total = 0
+    with _abrir(ruta, "w", comprimir) as f:
+        # Los registros se codifican en lotes pequeños para reducir las
+        # llamadas a write sin acumular el archivo completo en memoria
+        lote: List[str] = []
+        for registro in registros:
+            texto = codificar(registro)
+            if indentado:
+                texto = "    " + texto.replace("\n", "\n    ")
+            lote.append(texto)
+            if len(lote) == REGISTROS_POR_ESCRITURA:
+                f.write((apertura if total == 0 else separador) + separador.join(lote))
+                total += len(lote)
+                lote = []
+        if lote:
+            f.write((apertura if total == 0 else separador) + separador.join(lote))
+            total += len(lote)
+
+        if formato == "jsonl":
+            if total:
+                f.write("\n")
+        elif total:
+            f.write("\n]")
+        else:
+            f.write("[]")
+    return total
+
+
+def _es_gzip(ruta: str) -> bool:
+    """Indica si un archivo está comprimido con gzip según su firma."""
+    with open(ruta, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def _leer_arreglo(f: IO[str], inicio: str) -> Iterator[Any]:
+    """
+    Lee los elementos de un arreglo JSON en bloques, decodificando un
+    elemento a la vez.
+
+    Args:
+        f: Archivo abierto, posicionado después del texto inicial
+        inicio: Texto ya leído del archivo
+
+    Returns:
+        Iterador de los elementos del arreglo
+
+    Raises:
+        ValueError: Si el contenido no es un arreglo JSON válido
+    """
+    buffer = inicio
+    posicion = buffer.index("[") + 1
+    fin_archivo = False
+    esperando_elemento = True
+
+    while True:
+        # Saltar espacios y separadores
+        while posicion < len(buffer) and buffer[posicion] in " \t\r\n":
+            posicion += 1
+        if posicion >= len(buffer):
+            if fin_archivo:
+                raise ValueError("Arreglo JSON incompleto")
+            bloque = f.read(TAMANIO_BLOQUE)
+            fin_archivo = not bloque
+            buffer = buffer[posicion:] + bloque
+            posicion = 0
+            continue
+
+        caracter = buffer[posicion]
+        if caracter == "]":
+            return
+        if caracter == ",":
+            if esperando_elemento:
+                raise ValueError("Separador inesperado en el arreglo JSON")
+            esperando_elemento = True
+            posicion += 1
+            continue
+
+        try:
+            elemento, siguiente = _decodificador.raw_decode(buffer, posicion)
+            # Un número al final del bloque podría continuar en el siguiente
+            if siguiente >= len(buffer) and not fin_archivo:
+                raise json.JSONDecodeError("Elemento posiblemente incompleto", buffer, posicion)
+        except json.JSONDecodeError:
+            if fin_archivo:
+                raise
+            bloque = f.read(TAMANIO_BLOQUE)
+            fin_archivo = not bloque
+            buffer = buffer[posicion:] + bloque
+            posicion = 0
+            continue
+
+        yield elemento
+        esperando_elemento = False
+        posicion = siguiente
+        # Descartar lo ya procesado para que el buffer no crezca
+        if posicion > TAMANIO_BLOQUE:
+            buffer = buffer[posicion:]
+            posicion = 0
+
+
+def leer_registros(ruta: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lee los registros de un archivo uno a uno. El formato (arreglo JSON,
+    compacto o con sangría, o JSON Lines) y la compresión gzip se detectan
+    a partir del contenido.
+
+    Args:
+        ruta: Ruta completa del archivo
+
+    Returns:
+        Iterador de diccionarios
+
+    Raises:
+        ValueError: Si el contenido no es JSON válido
+    """
+    with _abrir(ruta, "r", _es_gzip(ruta)) as f:
+        inicio = ""
+        while True:
+            bloque = f.read(TAMANIO_BLOQUE)
+            if not bloque:
+                return
+            inicio += bloque
+            if inicio.strip():
+                break
+
+        if inicio.lstrip().startswith("["):
+            yield from _leer_arreglo(f, inicio)
+            return
+
+        # JSON Lines
+        pendiente = inicio
+        while True:
+            lineas = pendiente.split("\n")
+            pendiente = lineas.pop()
+            for linea in lineas:
+                if linea.strip():
+                    yield json.loads(linea)
+            bloque = f.read(TAMANIO_BLOQUE)
+            if not bloque:
+                break
+            pendiente += bloque
+        if pendiente.strip():
+            yield json.loads(pendiente)
@@ -0,0 +1,277 @@
+"""
+Módulo de coordinación entre varios procesos que comparten los archivos de
+datos (p. ej. dos mostradores sobre la misma carpeta de red).
+
+- BloqueoArchivo: bloqueo consultivo con fcntl sobre un archivo .lock
+- RegistroCambios: registro compartido de cambios en formato JSON Lines,
+  donde cada cambio lleva un número de versión creciente. Cada proceso
+  recuerda hasta qué posición del registro leyó, así que solo procesa los
+  cambios nuevos en lugar de releer los archivos de datos completos.
+  Cuando los archivos de datos ya contienen todos los cambios, el registro
+  se trunca: queda solo una línea base con la última versión.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .serializador import sincronizar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class BloqueoArchivo:
+    """
+    Bloqueo consultivo entre procesos basado en fcntl.flock.
+
+    Atributos:
+        ruta: Ruta completa del archivo de bloqueo
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Inicializa el bloqueo.
+
+        Args:
+            ruta: Ruta completa del archivo de bloqueo
+
+        Raises:
+            OSError: Si la plataforma no dispone de fcntl
+        """
+        if fcntl is None:
+            raise OSError("El modo multiproceso requiere fcntl (sistemas tipo Unix)")
+        self.ruta = ruta
+
+    @contextmanager
+    def adquirir(self, exclusivo: bool = True) -> Iterator[None]:
+        """
+        Mantiene el bloqueo mientras dura el contexto.
+
+        Args:
+            exclusivo: True para escritura (exclusivo), False para lectura (compartido)
+        """
+        with open(self.ruta, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class RegistroCambios:
+    """
+    Registro compartido de cambios con versión creciente.
+
+    Al truncarse, el registro se reemplaza por uno nuevo cuya primera línea
+    (tipo "base") indica la versión desde la que continúa. Un proceso que
+    detecta el reemplazo y no había leído hasta esa versión debe recargar
+    los archivos de datos (ver leer_nuevos).
+
+    Atributos:
+        archivo: Ruta del archivo del registro
+        version: Última versión leída o escrita por este proceso
+        bloqueo: Bloqueo que protege el registro y los archivos de datos
+    """
+
+    BASE = "base"
+
+    def __init__(self, archivo: str = "cambios.log"):
+        """
+        Inicializa el registro.
+
+        Args:
+            archivo: Ruta del archivo del registro
+        """
+        self.archivo = archivo
+        self.version = 0
+        self._posicion = 0
+        # Versión base e inodo del archivo en el que se lleva la posición
+        self._base = 0
+        self._inodo: Optional[int] = None
+        self.bloqueo = BloqueoArchivo(self.ruta + ".lock")
+
+    @property
+    def ruta(self) -> str:
+        """Ruta completa del archivo del registro."""
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        return os.path.join(dir_proyecto, self.archivo)
+
+    def hay_cambios(self) -> bool:
+        """
+        Indica, sin bloquear, si otro proceso agregó cambios al registro.
+
+        Returns:
+            True si el registro creció o fue truncado desde la última lectura
+        """
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return False
+        return estado.st_size > self._posicion or estado.st_ino != self._inodo
+
+    def _leer_base(self, f) -> int:
+        """
+        Lee la versión base de un registro abierto en modo binario.
+
+        Returns:
+            Versión de la línea base, o 0 si el registro nunca se truncó
+        """
+        f.seek(0)
+        try:
+            cambio = json.loads(f.readline())
+        except ValueError:
+            return 0
+        return cambio["version"] if cambio.get("tipo") == self.BASE else 0
+
+    def posicionar_al_final(self) -> None:
+        """
+        Marca como leídos todos los cambios existentes. Debe llamarse con el
+        bloqueo adquirido, justo después de cargar los archivos de datos.
+        """
+        try:
+            with open(self.ruta, "rb") as f:
+                self._base = self._leer_base(f)
+                self._inodo = os.fstat(f.fileno()).st_ino
+                f.seek(0, os.SEEK_END)
+                self._posicion = f.tell()
+                # Leer solo el final del archivo para conocer la última versión
+                f.seek(max(0, self._posicion - 4096))
+                lineas = f.read().splitlines()
+            for linea in reversed(lineas):
+                try:
+                    self.version = json.loads(linea)["version"]
+                    break
+                except (ValueError, KeyError, TypeError):
+                    continue
+        except FileNotFoundError:
+            self._posicion = 0
+            self.version = 0
+            self._base = 0
+            self._inodo = None
+
+    def marca(self) -> Tuple[int, int, int, Optional[int]]:
+        """
+        Retorna la posición de lectura actual, para volver a ella con
+        volver_a si los cambios leídos no se pueden aplicar todavía.
+
+        Returns:
+            Tupla (versión, posición, versión base, inodo)
+        """
+        return (self.version, self._posicion, self._base, self._inodo)
+
+    def volver_a(self, marca: Tuple[int, int, int, Optional[int]]) -> None:
+        """
+        Restaura una posición de lectura obtenida con marca.
+
+        Args:
+            marca: Tupla retornada por marca
+        """
+        self.version, self._posicion, self._base, self._inodo = marca
+
+    def leer_nuevos(self) -> List[Dict[str, Any]]:
+        """
+        Lee los cambios agregados desde la última lectura.
+        Debe llamarse con el bloqueo adquirido.
+
+        Si el registro se truncó y faltaban cambios anteriores a su versión
+        base, el primer elemento es la línea base ({"tipo": "base"}): los
+        archivos de datos deben recargarse antes de aplicar el resto.
+
+        Returns:
+            Lista de cambios ({"version", "pid", "tipo", "datos"}) en orden
+        """
+        cambios = []
+        try:
+            with open(self.ruta, "rb") as f:
+                base = self._leer_base(f)
+                inodo = os.fstat(f.fileno()).st_ino
+                if base != self._base or (base and inodo != self._inodo):
+                    # El registro fue truncado: se continúa tras la línea base
+                    f.seek(0)
+                    linea_base = f.readline()
+                    if self.version < base:
+                        cambios.append(json.loads(linea_base))
+                    self.version = max(self.version, base)
+                    self._base = base
+                    self._posicion = len(linea_base)
+                self._inodo = inodo
+                f.seek(self._posicion)
+                contenido = f.read()
+        except FileNotFoundError:
+            return []
+
+        # Solo se consumen líneas completas
+        fin = contenido.rfind(b"\n") + 1
+        for linea in contenido[:fin].splitlines():
+            if not linea.strip():
+                continue
+            cambio = json.loads(linea)
+            cambios.append(cambio)
+            self.version = cambio["version"]
+        self._posicion += fin
+        return cambios
+
+    def anexar(self, cambios: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Agrega cambios al registro asignándoles versiones consecutivas.
+        Debe llamarse con el bloqueo exclusivo adquirido y después de leer
+        los cambios pendientes, para que las versiones sigan siendo crecientes.
+
+        Args:
+            cambios: Lista de tuplas (tipo, datos)
+
+        Returns:
+            Versión del último cambio agregado
+        """
+        lineas = []
+        for tipo, datos in cambios:
+            self.version += 1
+            lineas.append(json.dumps({"version": self.version, "pid": os.getpid(),
+                                      "tipo": tipo, "datos": datos}, ensure_ascii=False))
+        with open(self.ruta, "ab") as f:
+            f.write(("\n".join(lineas) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self._posicion = f.tell()
+            self._inodo = os.fstat(f.fileno()).st_ino
+        return self.version
+
+    def tamanio(self) -> int:
+        """
+        Retorna el tamaño en bytes del registro.
+
+        Returns:
+            Tamaño del archivo, o 0 si no existe
+        """
+        try:
+            return os.path.getsize(self.ruta)
+        except OSError:
+            return 0
+
+    def truncar(self) -> None:
+        """
+        Reemplaza el registro por uno que solo contiene la línea base con la
+        versión actual. Debe llamarse con el bloqueo exclusivo adquirido,
+        después de leer los cambios pendientes y solo cuando los archivos de
+        datos ya están guardados con todos los cambios del registro.
+        """
+        linea = json.dumps({"version": self.version, "pid": os.getpid(),
+                            "tipo": self.BASE, "datos": {}}) + "\n"
+        temporal = self.ruta + ".tmp"
+        try:
+            with open(temporal, "wb") as f:
+                f.write(linea.encode("utf-8"))
+            sincronizar(temporal)
+            os.replace(temporal, self.ruta)
+            sincronizar(os.path.dirname(self.ruta), directorio=True)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        self._base = self.version
+        self._posicion = len(linea.encode("utf-8"))
+        self._inodo = os.stat(self.ruta).st_ino
@@ -1,4 +1,5 @@
 from .estanteria import Estanteria
+from .frontera_pareto import FronteraPareto
 
-__all__ = ['Estanteria']
+__all__ = ['Estanteria', 'FronteraPareto']
 
@@ -1,25 +1,79 @@
 """
 Módulo que gestiona los algoritmos de resolución de problemas para estanterías.
-Implementa Fuerza Bruta y Backtracking.
+Implementa Fuerza Bruta y Backtracking, y la consulta de la estantería
+óptima para cualquier capacidad mediante la frontera de Pareto valor-peso.
+
+La estantería óptima también se puede reoptimizar después de cambios en el
+inventario sin recalcularla desde cero: se conserva la última solución y,
+si solo llegaron libros, la frontera de Pareto se amplía con ellos; si se
+retiraron o cambiaron libros, una ramificación y acotamiento parte de la
+solución anterior (sin los libros retirados) como cota inferior.
 """
 
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from funciones_libros.libro import Libro
+from .frontera_pareto import FronteraPareto, Nodo, TOLERANCIA
+
+# Cambios (libros agregados más retirados) a partir de los cuales
+# reoptimizar cuesta más que recalcular la estantería desde cero
+MAX_CAMBIOS_INCREMENTALES = 32
+
+# Margen de la cota superior para errores de redondeo en las sumas de pesos
+MARGEN_COTA = 1e-6
+
+# Firma de un libro candidato: (libro, peso, valor) al momento del cálculo
+Firma = Tuple[Libro, float, int]
+
+
+class EstadoEstanteria:
+    """
+    Última estantería óptima calculada y lo necesario para actualizarla.
+    
+    Atributos:
+        version: Versión del catálogo con que se calculó
+        capacidad: Capacidad de la estantería en kilogramos
+        firmas: Diccionario clave del libro -> firma de los libros candidatos
+        solucion: Tupla (mejor_combinacion, mejor_valor, mejor_peso)
+        frontera: Frontera de Pareto de los candidatos, o None si un retiro
+                  la dejó desactualizada
+    """
+    
+    def __init__(self, version: Any, capacidad: float, firmas: Dict[Any, Firma],
+                 solucion: Tuple[List[Libro], int, float], frontera: Optional[FronteraPareto]):
+        self.version = version
+        self.capacidad = capacidad
+        self.firmas = firmas
+        self.solucion = solucion
+        self.frontera = frontera
 
 class Estanteria:
     """
     Clase que gestiona los algoritmos de resolución de problemas para estanterías.
     Implementa Fuerza Bruta y Backtracking.
+    
+    Atributos:
+        capacidad_maxima: Peso máximo que soporta un estante en kilogramos
+        limite_frontera: Capacidad mínima que cubre la frontera de Pareto en caché
     """
     
-    def __init__(self, capacidad_maxima: float = 8.0):
+    def __init__(self, capacidad_maxima: float = 8.0, limite_frontera: float = 20.0):
         """
         Inicializa la estantería con una capacidad máxima.
         
         Args:
             capacidad_maxima: Peso máximo que soporta un estante en kilogramos
+            limite_frontera: Capacidad mínima que cubre la frontera de Pareto
+                             (las consultas de más peso la amplían)
         """
         self.capacidad_maxima = capacidad_maxima
+        self.limite_frontera = limite_frontera
+        # (versión del catálogo, firma de los libros, frontera) de la última frontera calculada
+        self._frontera: Optional[Tuple[Any, frozenset, FronteraPareto]] = None
+        # Última solución de reoptimizar y cómo se obtuvo
+        self._estado: Optional[EstadoEstanteria] = None
+        self.ultima_reoptimizacion = ""
+        self.nodos_explorados = 0
     
     def fuerza_bruta_estanteria_deficiente(self, libros: List[Libro]) -> List[List[Libro]]:
         """
@@ -54,6 +108,9 @@ class Estanteria:
         Encuentra la combinación de libros que maximiza el valor total sin exceder
         la capacidad máxima de peso usando backtracking.
         Demuestra la exploración y ejecución del algoritmo.
+        Los libros que pesan más que la capacidad no caben en ninguna
+        combinación, así que se descartan antes de explorar (con
+        GestorLibros.libros_en_rango_peso ya llegan descartados).
         
         Args:
             libros: Lista de objetos Libro disponibles
@@ -61,6 +118,7 @@ class Estanteria:
         Returns:
             Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
         """
+        libros = [libro for libro in libros if libro.peso <= self.capacidad_maxima]
         mejor_combinacion = []
         mejor_valor = 0
         mejor_peso = 0
@@ -103,4 +161,233 @@ class Estanteria:
         backtrack([], 0, 0.0, 0)
         
         return mejor_combinacion, mejor_valor, mejor_peso
+    
+    def frontera_pareto(self, libros: Iterable[Libro], capacidad_limite: Optional[float] = None,
+                        version: Any = None) -> FronteraPareto:
+        """
+        Obtiene la frontera de Pareto valor-peso de los libros. Si se indica
+        la versión del catálogo, la frontera se guarda y se reutiliza
+        mientras la versión no cambie, se pidan los mismos libros (con el
+        mismo peso y valor) y cubra la capacidad pedida. Comparar los libros
+        cuesta O(n), mucho menos que construir la frontera.
+        
+        Args:
+            libros: Libros candidatos
+            capacidad_limite: Peso máximo que debe cubrir la frontera (None = sin límite)
+            version: Versión del catálogo (p. ej. GestorLibros.version_catalogo);
+                     None para no usar la caché
+            
+        Returns:
+            Frontera de Pareto de los libros
+        """
+        if version is None:
+            return FronteraPareto(libros, capacidad_limite)
+        libros = list(libros)
+        firma = frozenset((libro.clave, libro.peso, libro.valor) for libro in libros)
+        if self._frontera is not None:
+            version_frontera, firma_frontera, frontera = self._frontera
+            cubierta = (frontera.capacidad_limite is None if capacidad_limite is None
+                        else frontera.cubre(capacidad_limite))
+            if version_frontera == version and firma_frontera == firma and cubierta:
+                return frontera
+        frontera = FronteraPareto(libros, capacidad_limite)
+        self._frontera = (version, firma, frontera)
+        return frontera
+    
+    def estanteria_optima(self, libros: Iterable[Libro], capacidad: Optional[float] = None,
+                          version: Any = None) -> Tuple[List[Libro], int, float]:
+        """
+        Encuentra la combinación de libros de mayor valor que no excede una
+        capacidad, con el mismo resultado que backtracking_estanteria_optima.
+        La frontera de Pareto se calcula una vez por versión del catálogo
+        (hasta limite_frontera o la capacidad pedida, lo que sea mayor) y
+        cada consulta es una búsqueda binaria sobre ella.
+        
+        Args:
+            libros: Lista de objetos Libro disponibles
+            capacidad: Capacidad en kilogramos (por defecto, capacidad_maxima)
+            version: Versión del catálogo; None para calcular sin caché
+            
+        Returns:
+            Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
+        """
+        capacidad = self.capacidad_maxima if capacidad is None else capacidad
+        frontera = self.frontera_pareto(libros, max(capacidad, self.limite_frontera), version)
+        return frontera.mejor(capacidad)
+    
+    def reoptimizar(self, libros: Iterable[Libro], version: Any = None) -> Tuple[List[Libro], int, float]:
+        """
+        Obtiene la estantería óptima para capacidad_maxima (el mismo valor que
+        backtracking_estanteria_optima) a partir de la última solución calculada.
+        
+        Si la versión del catálogo no cambió, se retorna la solución guardada.
+        Si cambió, se comparan los candidatos con los del cálculo anterior
+        (detectando también cambios de peso o valor):
+        - Sin retiros, la frontera de Pareto guardada se amplía con los
+          libros agregados y la solución se lee de ella.
+        - Si solo se retiraron libros que no estaban en la solución, esta
+          sigue siendo óptima.
+        - En otro caso se resuelve por ramificación y acotamiento, con la
+          solución anterior sin los libros retirados como cota inferior.
+        Con más de MAX_CAMBIOS_INCREMENTALES cambios se recalcula desde cero.
+        El camino usado queda en ultima_reoptimizacion.
+        
+        Args:
+            libros: Lista de objetos Libro disponibles
+            version: Versión del catálogo (p. ej. GestorLibros.version_catalogo);
+                     None para comparar siempre los candidatos
+            
+        Returns:
+            Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
+        """
+        capacidad = self.capacidad_maxima
+        estado = self._estado
+        self.nodos_explorados = 0
+        if (estado is not None and version is not None and estado.version == version
+                and estado.capacidad == capacidad):
+            self.ultima_reoptimizacion = "sin cambios"
+            return estado.solucion
+        
+        firmas = {libro.clave: (libro, libro.peso, libro.valor)
+                  for libro in libros if libro.peso <= capacidad}
+        if estado is None or estado.capacidad != capacidad:
+            return self._reoptimizar_completo(firmas, version, capacidad)
+        
+        # Un libro cambiado cuenta como retirado (firma vieja) y agregado (firma nueva)
+        agregados = [firma for clave, firma in firmas.items() if estado.firmas.get(clave) != firma]
+        retirados = {clave for clave, firma in estado.firmas.items() if firmas.get(clave) != firma}
+        if len(agregados) + len(retirados) > MAX_CAMBIOS_INCREMENTALES:
+            return self._reoptimizar_completo(firmas, version, capacidad)
+        
+        combinacion = estado.solucion[0]
+        if not retirados and estado.frontera is not None:
+            for libro, _, _ in agregados:
+                estado.frontera.agregar(libro)
+            solucion = estado.frontera.mejor(capacidad)
+            self.ultima_reoptimizacion = "frontera"
+        elif not agregados and not any(libro.clave in retirados for libro in combinacion):
+            # Quitar libros que no se usaban no mejora ninguna combinación
+            solucion = estado.solucion
+            self.ultima_reoptimizacion = "sin cambios" if not retirados else "solucion conservada"
+        else:
+            semilla = [libro for libro in combinacion if libro.clave not in retirados]
+            solucion = self._ramificar_y_acotar([firma[0] for firma in firmas.values()], semilla,
+                                                [firma[0] for firma in agregados], capacidad)
+            self.ultima_reoptimizacion = "ramificacion"
+        
+        if retirados:
+            # La frontera no permite quitar libros: se descarta
+            estado.frontera = None
+        estado.version = version
+        estado.firmas = firmas
+        estado.solucion = solucion
+        return solucion
+    
+    def _reoptimizar_completo(self, firmas: Dict[Any, Firma], version: Any,
+                              capacidad: float) -> Tuple[List[Libro], int, float]:
+        """
+        Calcula la estantería óptima desde cero con la frontera de Pareto y
+        guarda el estado para las siguientes reoptimizaciones.
+        
+        Args:
+            firmas: Firmas de los libros candidatos
+            version: Versión del catálogo
+            capacidad: Capacidad en kilogramos
+            
+        Returns:
+            Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
+        """
+        frontera = FronteraPareto((firma[0] for firma in firmas.values()), capacidad)
+        solucion = frontera.mejor(capacidad)
+        self._estado = EstadoEstanteria(version, capacidad, firmas, solucion, frontera)
+        self.ultima_reoptimizacion = "completa"
+        return solucion
+    
+    def _ramificar_y_acotar(self, libros: List[Libro], semilla: List[Libro], agregados: List[Libro],
+                            capacidad: float) -> Tuple[List[Libro], int, float]:
+        """
+        Encuentra la combinación de mayor valor por ramificación y acotamiento.
+        Los libros se exploran de mayor a menor valor por kilogramo, y una rama
+        se descarta cuando ni llenando el resto del estante con fracciones de
+        libros (cota de la mochila fraccionaria) supera la mejor solución
+        conocida. Partir de una buena solución descarta casi todas las ramas.
+        Los libros sin peso no tienen valor por kilogramo (la cota daría
+        0 * inf = NaN y dejaría de podar): se incluyen siempre, si tienen
+        valor, y no participan en la búsqueda.
+        
+        Args:
+            libros: Libros candidatos (todos caben solos en el estante)
+            semilla: Combinación factible usada como solución inicial
+            agregados: Libros nuevos que se intentan sumar a la semilla
+            capacidad: Capacidad en kilogramos
+            
+        Returns:
+            Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
+        """
+        def densidad(libro: Libro) -> float:
+            return libro.valor / libro.peso
+        
+        sin_peso = [libro for libro in libros if libro.peso <= 0 and libro.valor > 0]
+        libros = [libro for libro in libros if libro.peso > 0]
+        semilla = [libro for libro in semilla if libro.peso > 0]
+        agregados = [libro for libro in agregados if libro.peso > 0]
+        # Misma tolerancia que la frontera: la suma de los pesos en punto
+        # flotante depende del orden en que se suman
+        limite = capacidad + TOLERANCIA
+        
+        # Solución inicial: la semilla más los libros nuevos que quepan
+        mejor_combinacion = list(semilla)
+        mejor_peso = sum(libro.peso for libro in mejor_combinacion)
+        for libro in sorted(agregados, key=densidad, reverse=True):
+            if mejor_peso + libro.peso <= limite:
+                mejor_combinacion.append(libro)
+                mejor_peso += libro.peso
+        mejor_valor = sum(libro.valor for libro in mejor_combinacion)
+        
+        orden = sorted(libros, key=densidad, reverse=True)
+        total = len(orden)
+        densidades = [densidad(libro) for libro in orden]
+        # Pesos y valores acumulados, para calcular la cota con búsqueda binaria
+        pesos_acumulados = [0.0]
+        valores_acumulados = [0]
+        for libro in orden:
+            pesos_acumulados.append(pesos_acumulados[-1] + libro.peso)
+            valores_acumulados.append(valores_acumulados[-1] + libro.valor)
+        
+        def cota(indice: int, restante: float) -> float:
+            """Valor máximo que aportan los libros desde indice, admitiendo fracciones."""
+            limite = pesos_acumulados[indice] + restante
+            completos = bisect_right(pesos_acumulados, limite, indice, total + 1) - 1
+            valor = valores_acumulados[completos] - valores_acumulados[indice]
+            if completos < total:
+                valor += (limite - pesos_acumulados[completos]) * densidades[completos]
+            return valor + MARGEN_COTA
+        
+        mejor_nodo: Nodo = None
+        mejora = False
+        # Cada rama: (índice del siguiente libro, peso, valor, combinación)
+        pila: List[Tuple[int, float, int, Nodo]] = [(0, 0.0, 0, None)]
+        while pila:
+            indice, peso, valor, nodo = pila.pop()
+            self.nodos_explorados += 1
+            if valor > mejor_valor:
+                mejor_valor, mejor_peso, mejor_nodo = valor, peso, nodo
+                mejora = True
+            if indice >= total or valor + cota(indice, limite - peso) <= mejor_valor:
+                continue
+            # Se apila primero la rama sin el libro, para explorar antes la que lo incluye
+            pila.append((indice + 1, peso, valor, nodo))
+            libro = orden[indice]
+            if peso + libro.peso <= limite:
+                pila.append((indice + 1, peso + libro.peso, valor + libro.valor, (libro, nodo)))
+        
+        if mejora:
+            mejor_combinacion = []
+            while mejor_nodo is not None:
+                libro, mejor_nodo = mejor_nodo
+                mejor_combinacion.append(libro)
+            mejor_combinacion.reverse()
+        mejor_combinacion.extend(sin_peso)
+        mejor_valor += sum(libro.valor for libro in sin_peso)
+        return mejor_combinacion, mejor_valor, mejor_peso
 
@@ -0,0 +1,158 @@
+"""
+Módulo que calcula la frontera de Pareto valor-peso de las estanterías
+posibles, para responder la estantería óptima de cualquier capacidad.
+
+Una combinación de libros está dominada si otra pesa lo mismo o menos y
+vale al menos lo mismo. La frontera es la lista de combinaciones no
+dominadas ordenada por peso, en la que el valor crece estrictamente; la
+mejor estantería para una capacidad es el último punto de la frontera que
+cabe, y se encuentra con búsqueda binaria.
+
+La frontera se construye libro por libro: las combinaciones actuales se
+mezclan, en orden de peso, con las mismas combinaciones más el libro nuevo,
+y durante la mezcla se descartan las dominadas. Así el trabajo depende del
+tamaño de la frontera y no de las 2^n combinaciones.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+from funciones_libros.libro import Libro
+
+# Margen para comparar sumas de pesos en punto flotante
+TOLERANCIA = 1e-9
+
+# Combinación de la frontera como lista enlazada: (libro, resto) o None.
+# Las combinaciones nuevas comparten el resto con las anteriores, así que
+# agregar un libro no copia la combinación completa.
+Nodo = Optional[Tuple[Libro, 'Nodo']]
+
+
+class FronteraPareto:
+    """
+    Frontera de Pareto valor-peso de las combinaciones de un conjunto de libros.
+
+    Atributos:
+        pesos: Peso de cada punto de la frontera, en orden creciente
+        valores: Valor de cada punto, también creciente
+        capacidad_limite: Peso máximo considerado (None = sin límite)
+    """
+
+    def __init__(self, libros: Iterable[Libro], capacidad_limite: Optional[float] = None):
+        """
+        Construye la frontera.
+
+        Args:
+            libros: Libros candidatos
+            capacidad_limite: Peso máximo de las combinaciones que se conservan
+                              (None = sin límite). Acotarla mantiene la frontera
+                              pequeña en catálogos grandes.
+        """
+        self.capacidad_limite = capacidad_limite
+        self.pesos: List[float] = [0.0]
+        self.valores: List[int] = [0]
+        self._nodos: List[Nodo] = [None]
+        for libro in libros:
+            self.agregar(libro)
+
+    def agregar(self, libro: Libro) -> None:
+        """
+        Agrega un libro a la frontera. El resultado es el mismo que si el
+        libro hubiera estado desde el principio, así que la frontera se puede
+        actualizar cuando llegan libros nuevos sin recalcularla.
+
+        Args:
+            libro: Libro que se agrega
+        """
+        limite = self.capacidad_limite + TOLERANCIA if self.capacidad_limite is not None else float("inf")
+        if libro.peso > limite:
+            return
+        self.pesos, self.valores, self._nodos = self._agregar_libro(
+            libro, self.pesos, self.valores, self._nodos, limite)
+
+    @staticmethod
+    def _agregar_libro(libro: Libro, pesos: List[float], valores: List[int], nodos: List[Nodo],
+                       limite: float) -> Tuple[List[float], List[int], List[Nodo]]:
+        """
+        Mezcla la frontera con la frontera desplazada por un libro,
+        descartando los puntos dominados.
+
+        Args:
+            libro: Libro que se agrega
+            pesos, valores, nodos: Frontera actual
+            limite: Peso máximo de los puntos que se conservan
+
+        Returns:
+            Tupla (pesos, valores, nodos) de la nueva frontera
+        """
+        peso_libro = libro.peso
+        valor_libro = libro.valor
+        nuevos_pesos: List[float] = []
+        nuevos_valores: List[int] = []
+        nuevos_nodos: List[Nodo] = []
+        mejor_valor = -1
+        i = j = 0
+        total = len(pesos)
+        while i < total or j < total:
+            # Candidato sin el libro (i) o con el libro (j): se toma el más
+            # liviano, y a igual peso el de mayor valor
+            if j < total:
+                peso_con = pesos[j] + peso_libro
+                if peso_con > limite:
+                    j = total
+                    continue
+            if j >= total or (i < total and (pesos[i], -valores[i]) <= (peso_con, -(valores[j] + valor_libro))):
+                peso, valor, nodo = pesos[i], valores[i], nodos[i]
+                i += 1
+            else:
+                peso, valor, nodo = peso_con, valores[j] + valor_libro, (libro, nodos[j])
+                j += 1
+            # Solo sobrevive si vale más que todo lo que pesa igual o menos
+            if valor > mejor_valor:
+                nuevos_pesos.append(peso)
+                nuevos_valores.append(valor)
+                nuevos_nodos.append(nodo)
+                mejor_valor = valor
+        return nuevos_pesos, nuevos_valores, nuevos_nodos
+
+    def cubre(self, capacidad: float) -> bool:
+        """
+        Indica si la frontera responde una capacidad (no quedó fuera del límite).
+
+        Args:
+            capacidad: Capacidad en kilogramos
+
+        Returns:
+            True si la capacidad no supera el límite de la frontera
+        """
+        return self.capacidad_limite is None or capacidad <= self.capacidad_limite
+
+    def mejor(self, capacidad: float) -> Tuple[List[Libro], int, float]:
+        """
+        Obtiene la combinación de mayor valor que no excede una capacidad,
+        con búsqueda binaria sobre la frontera.
+
+        Args:
+            capacidad: Capacidad en kilogramos (no mayor que capacidad_limite)
+
+        Returns:
+            Tupla con (mejor_combinacion, mejor_valor, mejor_peso)
+
+        Raises:
+            ValueError: Si la capacidad supera el límite con que se construyó la frontera
+        """
+        if not self.cubre(capacidad):
+            raise ValueError(f"La frontera solo cubre hasta {self.capacidad_limite} Kg")
+        posicion = bisect_right(self.pesos, capacidad + TOLERANCIA) - 1
+        if posicion < 0:
+            return [], 0, 0
+        combinacion: List[Libro] = []
+        nodo = self._nodos[posicion]
+        while nodo is not None:
+            libro, nodo = nodo
+            combinacion.append(libro)
+        combinacion.reverse()
+        return combinacion, self.valores[posicion], self.pesos[posicion]
+
+    def __len__(self) -> int:
+        """Retorna el número de puntos de la frontera."""
+        return len(self.pesos)
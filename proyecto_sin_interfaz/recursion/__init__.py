@@ -1,4 +1,5 @@
 from .funciones_recursivas import FuncionesRecursivas
+from .reporte_autores import ReporteAutores
 
-__all__ = ['FuncionesRecursivas']
+__all__ = ['FuncionesRecursivas', 'ReporteAutores']
 
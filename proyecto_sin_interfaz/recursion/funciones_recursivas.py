@@ -4,6 +4,7 @@ Módulo que contiene las funciones recursivas requeridas.
 
 from typing import List
 from funciones_libros.libro import Libro
+from funciones_libros.texto import normalizar_termino
 
 class FuncionesRecursivas:
     """
@@ -13,6 +14,7 @@ class FuncionesRecursivas:
     def valor_total_autor_recursivo_pila(self, libros: List[Libro], autor: str, indice: int = 0) -> int:
         """
         Calcula el valor total de todos los libros de un autor específico usando recursión de pila.
+        El autor se compara sin distinguir mayúsculas ni tildes.
         La recursión de pila acumula el resultado en el retorno de las llamadas recursivas.
         
         Args:
@@ -29,7 +31,7 @@ class FuncionesRecursivas:
         
         # Verificar si el libro actual es del autor buscado
         valor_actual = 0
-        if libros[indice].autor.lower() == autor.lower():
+        if libros[indice].autor_normalizado == normalizar_termino(autor):
             valor_actual = libros[indice].valor
         
         # Llamada recursiva (recursión de pila)
@@ -40,6 +42,7 @@ class FuncionesRecursivas:
                                            cantidad: int = 0) -> float:
         """
         Calcula el peso promedio de la colección de un autor usando recursión de cola.
+        El autor se compara sin distinguir mayúsculas ni tildes.
         La recursión de cola pasa los resultados acumulados como parámetros.
         
         Args:
@@ -59,7 +62,7 @@ class FuncionesRecursivas:
             return suma_pesos / cantidad
         
         # Verificar si el libro actual es del autor buscado
-        if libros[indice].autor.lower() == autor.lower():
+        if libros[indice].autor_normalizado == normalizar_termino(autor):
             nuevo_suma = suma_pesos + libros[indice].peso
             nueva_cantidad = cantidad + 1
         else:
@@ -0,0 +1,230 @@
+"""
+Módulo que genera el reporte de estadísticas de todos los autores.
+
+FuncionesRecursivas calcula el valor total o el peso promedio de un solo
+autor, recorriendo el catálogo completo en cada consulta. Este reporte
+calcula en una sola pasada, para todos los autores a la vez: títulos,
+ejemplares, ejemplares disponibles, proporción disponible, valor total y
+peso total y promedio.
+
+El catálogo se divide en bloques; cada bloque se agrega por autor en un
+proceso del pool (map) y los totales parciales se combinan en el proceso
+principal (reduce). Los catálogos pequeños se agregan en el mismo proceso,
+donde iniciar el pool costaría más que el cálculo. Los procesos del pool se
+inician con "spawn": la interfaz tiene hilos activos (Tk, el escritor
+diferido) y un fork copiaría sus bloqueos en el estado en que estén. Como en
+FuncionesRecursivas, los autores se agrupan sin distinguir mayúsculas ni tildes.
+"""
+
+import os
+from itertools import chain, islice
+import multiprocessing
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from funciones_libros.isbn import registros_validos
+from funciones_libros.libro import Libro
+from funciones_libros.texto import normalizar_texto
+from persistencia.serializador import escribir_registros, leer_registros
+
+# Fila de un libro: (autor, valor, peso, cantidad, cantidad presente)
+Fila = Tuple[str, float, float, int, int]
+
+# Totales de un autor: [nombre, títulos, ejemplares, disponibles, valor, peso]
+Totales = List[Any]
+
+
+def _sumar(totales: Dict[str, Totales], clave: str, datos: Totales) -> None:
+    """Suma los totales de un autor a los acumulados con la misma clave."""
+    actual = totales.get(clave)
+    if actual is None:
+        totales[clave] = datos
+    else:
+        for posicion in range(1, 6):
+            actual[posicion] += datos[posicion]
+
+
+def _agregar_bloque(filas: List[Fila]) -> Dict[str, Totales]:
+    """
+    Agrega un bloque de libros por autor (fase map).
+
+    Args:
+        filas: Filas de los libros del bloque
+
+    Returns:
+        Diccionario autor normalizado -> totales del autor en el bloque
+    """
+    por_nombre: Dict[str, Totales] = {}
+    for autor, valor, peso, cantidad, presentes in filas:
+        actual = por_nombre.get(autor)
+        if actual is None:
+            por_nombre[autor] = [autor, 1, cantidad, presentes, valor, peso]
+        else:
+            actual[1] += 1
+            actual[2] += cantidad
+            actual[3] += presentes
+            actual[4] += valor
+            actual[5] += peso
+    # Las variantes de un nombre (mayúsculas, tildes) se unen al final, así
+    # que cada nombre distinto se normaliza una sola vez por bloque
+    totales: Dict[str, Totales] = {}
+    for autor, datos in por_nombre.items():
+        _sumar(totales, normalizar_texto(autor), datos)
+    return totales
+
+
+def _combinar(totales: Dict[str, Totales], parcial: Dict[str, Totales]) -> None:
+    """
+    Suma los totales parciales de un bloque a los acumulados (fase reduce).
+    Se conserva el nombre del autor tal como aparece en el primer bloque.
+
+    Args:
+        totales: Totales acumulados, se modifican en el lugar
+        parcial: Totales de un bloque
+    """
+    for clave, datos in parcial.items():
+        _sumar(totales, clave, datos)
+
+
+def _bloques(filas: Iterable[Fila], tamanio: int) -> Iterator[List[Fila]]:
+    """Divide las filas en listas de un tamaño fijo (la última puede ser menor)."""
+    iterador = iter(filas)
+    while True:
+        bloque = list(islice(iterador, tamanio))
+        if not bloque:
+            return
+        yield bloque
+
+
+class ReporteAutores:
+    """
+    Clase que calcula y guarda la tabla de estadísticas por autor.
+
+    Atributos:
+        procesos: Número de procesos del pool (None = uno por núcleo)
+        tamanio_bloque: Libros por bloque enviado a cada proceso
+    """
+
+    def __init__(self, procesos: Optional[int] = None, tamanio_bloque: int = 100000):
+        """
+        Inicializa el reporte.
+
+        Args:
+            procesos: Número de procesos del pool (None = uno por núcleo)
+            tamanio_bloque: Libros por bloque enviado a cada proceso
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamanio_bloque = tamanio_bloque
+
+    def _agregar(self, filas: Iterable[Fila]) -> Dict[str, Totales]:
+        """
+        Agrega las filas por autor, en paralelo si hay más de un bloque.
+
+        Args:
+            filas: Filas de los libros
+
+        Returns:
+            Diccionario autor normalizado -> totales del autor
+        """
+        bloques = _bloques(filas, self.tamanio_bloque)
+        primeros = list(islice(bloques, 2))
+        totales: Dict[str, Totales] = {}
+        if len(primeros) < 2 or self.procesos == 1:
+            for bloque in chain(primeros, bloques):
+                _combinar(totales, _agregar_bloque(bloque))
+            return totales
+        with multiprocessing.get_context("spawn").Pool(self.procesos) as pool:
+            # imap conserva el orden de los bloques, así que el nombre de
+            # cada autor no depende de qué proceso termina primero
+            for parcial in pool.imap(_agregar_bloque, chain(primeros, bloques)):
+                _combinar(totales, parcial)
+        return totales
+
+    @staticmethod
+    def _tabla(totales: Dict[str, Totales]) -> List[Dict[str, Any]]:
+        """
+        Convierte los totales en la tabla del reporte, ordenada por valor
+        total de mayor a menor (desempate por autor).
+
+        Args:
+            totales: Diccionario autor normalizado -> totales del autor
+
+        Returns:
+            Lista de diccionarios, uno por autor
+        """
+        tabla = []
+        for clave in sorted(totales, key=lambda clave: (-totales[clave][4], clave)):
+            autor, titulos, ejemplares, disponibles, valor, peso = totales[clave]
+            tabla.append({
+                "Autor": autor,
+                "Titulos": titulos,
+                "Ejemplares": ejemplares,
+                "Disponibles": disponibles,
+                "Proporcion_disponible": round(disponibles / ejemplares, 4) if ejemplares else 0.0,
+                "Valor_total": valor,
+                "Peso_total": round(peso, 4),
+                "Peso_promedio": round(peso / titulos, 4),
+            })
+        return tabla
+
+    def calcular(self, libros: Iterable[Libro]) -> List[Dict[str, Any]]:
+        """
+        Calcula las estadísticas de todos los autores de una colección.
+        El valor total y el peso promedio coinciden con los de
+        FuncionesRecursivas (por título, sin multiplicar por ejemplares).
+
+        Args:
+            libros: Libros del catálogo
+
+        Returns:
+            Lista de diccionarios por autor, ordenada por valor total descendente
+        """
+        filas = ((libro.autor, libro.valor, libro.peso, libro.cantidad, libro.cantidad_presente)
+                 for libro in libros)
+        return self._tabla(self._agregar(filas))
+
+    def calcular_desde_archivo(self, archivo: str = "libros.json") -> List[Dict[str, Any]]:
+        """
+        Calcula las estadísticas leyendo el inventario registro por registro,
+        sin crear los objetos Libro (para catálogos de millones de títulos).
+        Los registros con ISBN inválido o repetido se omiten, igual que al
+        cargar el inventario.
+
+        Args:
+            archivo: Ruta del archivo de inventario (relativa al proyecto)
+
+        Returns:
+            Lista de diccionarios por autor, ordenada por valor total descendente
+        """
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        ruta_archivo = os.path.join(dir_proyecto, archivo)
+        filas = ((registro["Autor"], registro["Valor"], registro["Peso"], registro["Cantidad"],
+                  registro.get("Cantidad_presente", registro["Cantidad"]))
+                 for _, registro in registros_validos(leer_registros(ruta_archivo)))
+        return self._tabla(self._agregar(filas))
+
+    def generar_reporte(self, libros: Iterable[Libro], archivo: str = "reporte_autores.json",
+                        formato: Optional[str] = None,
+                        comprimir: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Calcula las estadísticas de todos los autores y las guarda en un archivo.
+
+        Args:
+            libros: Libros del catálogo
+            archivo: Nombre del archivo donde se guardará el reporte
+            formato: "json", "json_indentado" o "jsonl" (ver persistencia.serializador)
+            comprimir: Si es True se comprime con gzip; si es None se comprime
+                       cuando el archivo termina en ".gz"
+
+        Returns:
+            Lista de diccionarios por autor, ordenada por valor total descendente
+
+        Raises:
+            OSError: Si no se pudo escribir el archivo del reporte
+        """
+        tabla = self.calcular(libros)
+        dir_actual = os.path.dirname(os.path.abspath(__file__))
+        dir_proyecto = os.path.dirname(dir_actual)
+        ruta_archivo = os.path.join(dir_proyecto, archivo)
+        escribir_registros(ruta_archivo, tabla, formato, comprimir)
+        print(f"\nReporte generado exitosamente en {archivo}")
+        return tabla
@@ -0,0 +1,37 @@
+"""
+Pruebas de la analítica de circulación.
+"""
+
+from datetime import datetime
+
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.analitica_circulacion import AnaliticaCirculacion
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+
+
+def test_compactar_conserva_los_contadores(tmp_path, monkeypatch):
+    gestor = GestorPrestamos(GestorLibros(str(tmp_path / "libros.json")),
+                             str(tmp_path / "historial.json"), str(tmp_path / "reservas.json"))
+    historial = gestor.historial
+    historial.apilar("978-84-376-0494-7", "2020-01-05 10:00:00", "ana")
+    historial.apilar("978-84-376-0494-7", "2020-01-06 10:00:00", "luis")
+    historial.apilar("978-84-376-0123-6", "2020-01-07 10:00:00", "ana")
+    for isbn, usuario in (("978-84-376-0494-7", "ana"), ("978-84-376-0494-7", "luis"),
+                          ("978-84-376-0123-6", "ana")):
+        historial.marcar_devuelto(isbn, usuario, "2020-01-08 10:00:00")
+    analitica = AnaliticaCirculacion(gestor)
+    ahora = datetime(2020, 1, 20)
+    assert analitica.libros_mas_prestados(1, ahora=ahora) == [("978-84-376-0494-7", 2)]
+
+    assert gestor.compactar_historial(dias=1, ahora=ahora) == 3
+    # Tras archivar no se vuelven a leer los segmentos
+    monkeypatch.setattr(historial.archivo_historico, "iterar_registros",
+                        lambda: (_ for _ in ()).throw(AssertionError("reconstrucción")))
+    historial.apilar("978-84-376-0123-6", "2020-01-19 10:00:00", "luis")
+    assert analitica.total_prestamos == 4
+    assert analitica.usuarios_mas_activos(2, recientes=True, ahora=ahora) == [("ana", 2), ("luis", 2)]
+
+    monkeypatch.undo()
+    historial.cargar_desde_archivo()
+    assert analitica.prestamos_libro("978-84-376-0123-6") >= 2
+    assert analitica.total_prestamos == 4
@@ -0,0 +1,39 @@
+"""
+Pruebas del catálogo mapeado en memoria.
+"""
+
+import os
+
+import pytest
+
+from funciones_libros.catalogo_mapeado import CatalogoMapeado
+from funciones_libros.libro import Libro
+
+
+def _libros(*isbns):
+    return [Libro(isbn, f"Título {isbn}", "Autor", 0.5, 10000, 2, 1) for isbn in isbns]
+
+
+def test_reescribir_no_altera_un_catalogo_abierto(tmp_path):
+    archivo = str(tmp_path / "catalogo.sgbc")
+    assert CatalogoMapeado.escribir(_libros("978-84-376-0494-7", "8437601231"), archivo) == 2
+
+    with CatalogoMapeado(archivo) as catalogo:
+        CatalogoMapeado.escribir(_libros("978-84-376-0456-5"), archivo)
+        assert len(catalogo) == 2
+        assert catalogo.buscar_por_isbn("978-84-376-0123-6").isbn == "8437601231"
+        with CatalogoMapeado(archivo) as nuevo:
+            assert [libro.isbn for libro in nuevo] == ["978-84-376-0456-5"]
+    assert not os.path.exists(archivo + ".tmp")
+
+
+def test_cantidad_negativa_no_reemplaza_el_catalogo(tmp_path):
+    archivo = str(tmp_path / "catalogo.sgbc")
+    CatalogoMapeado.escribir(_libros("978-84-376-0494-7"), archivo)
+    libros = _libros("978-84-376-0456-5")
+    libros[0].cantidad_presente = -1
+
+    with pytest.raises(ValueError):
+        CatalogoMapeado.escribir(libros, archivo)
+    with CatalogoMapeado(archivo) as catalogo:
+        assert catalogo.buscar_por_isbn("978-84-376-0494-7").cantidad_presente == 1
@@ -0,0 +1,116 @@
+"""
+Pruebas del escritor diferido y del guardado en segundo plano.
+"""
+
+import gc
+import json
+import weakref
+
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_libros.libro import Libro
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from persistencia.escritor_diferido import EscritorDiferido
+from persistencia.serializador import escribir_registros, leer_registros
+
+
+def _inventario(tmp_path):
+    archivo = tmp_path / "libros.json"
+    escribir_registros(str(archivo), [Libro("978-84-376-0494-7", "Cien años de soledad",
+                                            "Gabriel García Márquez", 0.5, 45000, 2).to_dict()])
+    return archivo
+
+
+def test_detener_escribe_lo_pendiente(tmp_path):
+    archivo = _inventario(tmp_path)
+    gestor = GestorPrestamos(GestorLibros(str(archivo)), str(tmp_path / "historial.json"),
+                             str(tmp_path / "reservas.json"))
+    escritor = EscritorDiferido(latencia=60)
+    gestor.usar_escritor(escritor)
+
+    assert gestor.prestar_libro("978-84-376-0494-7", "ana")[0]
+    assert list(leer_registros(str(archivo)))[0]["Cantidad_presente"] == 2
+    assert escritor.escrituras == 0
+
+    escritor.detener()
+    assert list(leer_registros(str(archivo)))[0]["Cantidad_presente"] == 1
+    historial = list(leer_registros(str(tmp_path / "historial.json")))
+    assert [(r["Usuario"], r["Devuelto"]) for r in historial] == [("ana", None)]
+    # El inventario y el historial se escriben una vez cada uno
+    assert escritor.escrituras == 2
+
+
+def test_cambios_cercanos_se_agrupan(tmp_path):
+    archivo = _inventario(tmp_path)
+    gestor_libros = GestorLibros(str(archivo))
+    escritor = EscritorDiferido(latencia=60)
+    gestor_libros.escritor = escritor
+    for _ in range(5):
+        gestor_libros.guardar_si_corresponde()
+    escritor.vaciar()
+    assert escritor.programadas == 5
+    assert escritor.escrituras == 1
+    escritor.detener()
+
+
+def test_instantanea_tomada_al_programar(tmp_path):
+    archivo = _inventario(tmp_path)
+    gestor_libros = GestorLibros(str(archivo))
+    escritor = EscritorDiferido(latencia=60)
+    gestor_libros.escritor = escritor
+    libro = gestor_libros.inventario_general[0]
+
+    libro.prestar()
+    gestor_libros.guardar_si_corresponde()
+    # Un cambio posterior no debe colarse en la escritura ya programada
+    libro.titulo = "Cambiado sin guardar"
+    escritor.detener()
+
+    registro = json.loads(archivo.read_text(encoding="utf-8"))[0]
+    assert registro["Cantidad_presente"] == 1
+    assert registro["Título"] == "Cien años de soledad"
+    assert not (tmp_path / "libros.json.tmp").exists()
+
+
+def test_metricas_miden_la_escritura_diferida(tmp_path):
+    from diagnostico.metricas import activar_instrumentacion, desactivar_instrumentacion, metricas
+    archivo = _inventario(tmp_path)
+    gestor_libros = GestorLibros(str(archivo))
+    escritor = EscritorDiferido(latencia=60)
+    gestor_libros.escritor = escritor
+    gestor_libros.agregar_libro(Libro("978-84-376-0123-6", "Don Quijote de la Mancha",
+                                      "Miguel de Cervantes", 1.2, 55000, 4))
+    metricas.reiniciar()
+    activar_instrumentacion()
+    try:
+        gestor_libros.guardar_si_corresponde()
+        escritor.detener()
+    finally:
+        desactivar_instrumentacion()
+
+    resumen = metricas.resumen()
+    assert "bytes_escritos" not in resumen["GestorLibros.guardar_si_corresponde"]
+    escritura = resumen["GestorLibros._escribir"]
+    assert escritura["llamadas"] == 1
+    assert escritura["bytes_escritos"]["bytes_totales"] == archivo.stat().st_size
+
+
+def test_escritura_fallida_se_informa(tmp_path, capsys):
+    gestor_libros = GestorLibros(str(_inventario(tmp_path)))
+    gestor_libros.archivo = str(tmp_path / "no_existe" / "libros.json")
+    escritor = EscritorDiferido(latencia=60)
+    gestor_libros.escritor = escritor
+
+    gestor_libros.guardar_si_corresponde()
+    escritor.detener()
+    assert (escritor.escrituras, escritor.fallidas) == (1, 1)
+    assert "Escritura diferida fallida (GestorLibros._escribir)" in capsys.readouterr().out
+    assert escritor.escribir(gestor_libros, gestor_libros._escribir, []) is False
+
+
+def test_detener_libera_el_escritor():
+    escritor = EscritorDiferido(latencia=60)
+    referencia = weakref.ref(escritor)
+    escritor.detener()
+    del escritor
+    gc.collect()
+    assert referencia() is None
@@ -0,0 +1,110 @@
+"""
+Pruebas de la estantería óptima: frontera de Pareto y reoptimización
+incremental comparadas con el backtracking y con un cálculo desde cero.
+"""
+
+import random
+
+import pytest
+
+from funciones_libros.libro import Libro
+from problemas_resueltos.estanteria import Estanteria
+from problemas_resueltos.frontera_pareto import FronteraPareto
+
+
+def _isbn(numero):
+    cuerpo = f"978{numero:09d}"
+    suma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(cuerpo))
+    return cuerpo + str((10 - suma % 10) % 10)
+
+
+def _libros(generador, cantidad, desde=0):
+    return [Libro(_isbn(desde + i), f"Libro {desde + i}", "Autor",
+                  round(generador.uniform(0.1, 3.0), 2), generador.randint(1, 100) * 1000, 1)
+            for i in range(cantidad)]
+
+
+def _valor_optimo(libros, capacidad):
+    return Estanteria(capacidad).backtracking_estanteria_optima(libros)[1]
+
+
+def _valida(resultado, capacidad):
+    combinacion, valor, peso = resultado
+    assert sum(libro.valor for libro in combinacion) == valor
+    assert sum(libro.peso for libro in combinacion) == pytest.approx(peso)
+    assert peso <= capacidad + 1e-9
+    assert len({libro.clave for libro in combinacion}) == len(combinacion)
+
+
+@pytest.mark.parametrize("semilla", range(8))
+def test_frontera_coincide_con_backtracking(semilla):
+    generador = random.Random(semilla)
+    libros = _libros(generador, 12)
+    frontera = FronteraPareto(libros)
+    for capacidad in (0.05, 0.3, 1.0, 2.5, 4.0, 8.0, 12.0, 40.0):
+        resultado = frontera.mejor(capacidad)
+        _valida(resultado, capacidad)
+        assert resultado[1] == _valor_optimo(libros, capacidad)
+
+
+def test_frontera_en_cache_depende_de_los_libros():
+    generador = random.Random(1)
+    libros = _libros(generador, 12)
+    estanteria = Estanteria(4.0)
+    completo = estanteria.estanteria_optima(libros, 4.0, version=7)
+    subconjunto = libros[:5]
+    parcial = estanteria.estanteria_optima(subconjunto, 4.0, version=7)
+    assert parcial[1] == _valor_optimo(subconjunto, 4.0)
+    assert set(parcial[0]) <= set(subconjunto)
+    assert estanteria.estanteria_optima(libros, 4.0, version=7)[1] == completo[1]
+
+
+def _comprobar_reoptimizacion(estanteria, libros, version, capacidad):
+    resultado = estanteria.reoptimizar(libros, version)
+    _valida(resultado, capacidad)
+    assert set(resultado[0]) <= set(libros)
+    completo = Estanteria(capacidad).reoptimizar(libros)
+    assert resultado[1] == completo[1]
+    return estanteria.ultima_reoptimizacion
+
+
+@pytest.mark.parametrize("semilla", range(6))
+def test_reoptimizar_coincide_con_calculo_completo(semilla):
+    generador = random.Random(semilla)
+    capacidad = 6.0
+    libros = _libros(generador, 25)
+    estanteria = Estanteria(capacidad)
+    version = 0
+    caminos = {_comprobar_reoptimizacion(estanteria, libros, version, capacidad)}
+    siguiente = len(libros)
+    for _ in range(40):
+        version += 1
+        cambio = generador.choice(("agregar", "retirar", "retirar_usado", "editar"))
+        if cambio == "agregar":
+            libros.extend(_libros(generador, generador.randint(1, 3), siguiente))
+            siguiente += 3
+        elif cambio == "retirar" and len(libros) > 5:
+            libros.pop(generador.randrange(len(libros)))
+        elif cambio == "retirar_usado" and estanteria._estado.solucion[0]:
+            libros.remove(generador.choice(estanteria._estado.solucion[0]))
+        else:
+            libro = generador.choice(libros)
+            libro.peso = round(generador.uniform(0.1, 3.0), 2)
+            libro.valor = generador.randint(1, 100) * 1000
+        caminos.add(_comprobar_reoptimizacion(estanteria, libros, version, capacidad))
+    assert "ramificacion" in caminos
+
+
+def test_reoptimizar_con_libros_sin_peso():
+    generador = random.Random(3)
+    capacidad = 5.0
+    libros = _libros(generador, 15)
+    gratis = Libro(_isbn(900), "Folleto", "Autor", 0.0, 2000, 1)
+    estanteria = Estanteria(capacidad)
+    estanteria.reoptimizar(libros, 0)
+    # Retirar un libro usado y agregar uno sin peso obliga a ramificar
+    libros.remove(estanteria._estado.solucion[0][0])
+    libros.append(gratis)
+    assert _comprobar_reoptimizacion(estanteria, libros, 1, capacidad) == "ramificacion"
+    assert gratis in estanteria._estado.solucion[0]
+    assert estanteria._estado.solucion[1] == _valor_optimo(libros, capacidad)
@@ -0,0 +1,19 @@
+"""
+Pruebas del bus de eventos de cambio.
+"""
+
+from estructuras_datos.eventos import BusEventos, LIBRO_AGREGADO, LIBRO_ELIMINADO
+
+
+def test_error_en_suscriptor_no_se_propaga():
+    bus = BusEventos()
+    recibidos = []
+
+    def falla(evento):
+        raise RuntimeError("vista cerrada")
+
+    bus.suscribir(falla)
+    bus.suscribir(recibidos.append, (LIBRO_AGREGADO,))
+    bus.emitir(LIBRO_AGREGADO, libro=None)
+    bus.emitir(LIBRO_ELIMINADO, libro=None)
+    assert [evento.tipo for evento in recibidos] == [LIBRO_AGREGADO]
@@ -0,0 +1,86 @@
+"""
+Pruebas del historial de préstamos: consultas por rango de fechas con
+préstamos archivados.
+"""
+
+import json
+
+from estructuras_datos.indice_vencimientos import IndiceVencimientos
+from estructuras_datos.pila import Pila
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+
+
+def _historial(tmp_path):
+    pila = Pila(str(tmp_path / "historial.json"))
+    # Un préstamo antiguo que sigue activo no se archiva
+    pila.apilar("978-84-376-0494-7", "2020-01-05 10:00:00", "ana", "2020-01-19 10:00:00")
+    pila.apilar("978-84-376-0123-6", "2020-02-01 10:00:00", "ana", "2020-02-15 10:00:00")
+    pila.marcar_devuelto("978-84-376-0123-6", "ana", "2020-02-03 10:00:00")
+    # Formato anterior, sin devolución registrada: sigue activo y no se archiva
+    pila.apilar("978-84-376-0456-5", "2020-03-01 10:00:00", "ana")
+    pila.apilar("978-84-376-0494-7", "2021-06-01 10:00:00", "luis", "2021-06-15 10:00:00")
+    assert pila.compactar("2021-01-01 00:00:00") == 1
+    return pila
+
+
+def test_historial_rango_en_orden_cronologico(tmp_path):
+    pila = _historial(tmp_path)
+    fechas = [r["Fecha"] for r in pila.historial_rango(usuario="ana")]
+    assert fechas == ["2020-01-05 10:00:00", "2020-02-01 10:00:00", "2020-03-01 10:00:00"]
+    fechas = [r["Fecha"] for r in pila.historial_rango(usuario="ana", desde="2020-01-20 00:00:00")]
+    assert fechas == ["2020-02-01 10:00:00", "2020-03-01 10:00:00"]
+    fechas = [r["Fecha"] for r in pila.historial_rango(isbn="978-84-376-0494-7")]
+    assert fechas == ["2020-01-05 10:00:00", "2021-06-01 10:00:00"]
+
+
+def test_historial_usuario_con_archivo_en_orden_cronologico(tmp_path):
+    pila = _historial(tmp_path)
+    fechas = [r["Fecha"] for r in pila.obtener_historial_usuario("ana", incluir_archivo=True)]
+    assert fechas == sorted(fechas) and len(fechas) == 3
+
+
+def test_indice_vencimientos_tras_cerrar_prestamos():
+    indice = IndiceVencimientos()
+    prestamos = [{"ISBN": f"isbn-{i % 3}", "Usuario": f"usuario-{i}"} for i in range(10)]
+    for i, prestamo in enumerate(prestamos):
+        indice.agregar(prestamo, float(100 - i * 10))
+
+    assert indice.cerrar("isbn-0", "usuario-0") is prestamos[0]
+    assert indice.cerrar("isbn-0", "usuario-0") is None
+    for i in range(1, 7):
+        assert indice.cerrar(prestamos[i]["ISBN"], prestamos[i]["Usuario"], prestamos[i])
+
+    assert len(indice) == 3
+    assert indice.vencidos(25.0) == [prestamos[9], prestamos[8]]
+    assert indice.en_rango(10.0, 100.0) == [prestamos[9], prestamos[8], prestamos[7]]
+    assert indice.en_rango(40.0, 100.0) == []
+
+
+def test_devolver_prestamo_del_formato_anterior(tmp_path):
+    (tmp_path / "libros.json").write_text(json.dumps([
+        {"ISBN": "978-84-376-0494-7", "Título": "Cien", "Autor": "Autor", "Peso": 0.5,
+         "Valor": 10000, "Cantidad": 3, "Cantidad_presente": 2}]), encoding="utf-8")
+    (tmp_path / "historial.json").write_text(json.dumps([
+        {"Usuario": "Ana", "ISBN": "978-84-376-0494-7", "Fecha": "2020-01-05 10:00:00"}]),
+        encoding="utf-8")
+    gestor = GestorPrestamos(GestorLibros(str(tmp_path / "libros.json")),
+                             str(tmp_path / "historial.json"), str(tmp_path / "reservas.json"))
+
+    assert gestor.compactar_historial(dias=1) == 0
+    assert gestor.prestamos_vencidos() == []
+    exito, _ = gestor.devolver_libro("978-84-376-0494-7", "Ana")
+    assert exito
+    assert gestor.gestor_libros.buscar_por_isbn_binaria("978-84-376-0494-7").cantidad_presente == 3
+    assert gestor.historial.cima()["Devuelto"] is not None
+    assert not gestor.devolver_libro("978-84-376-0494-7", "Ana")[0]
+
+
+def test_historial_usuario_desde_un_dia_sin_hora(tmp_path):
+    gestor = GestorPrestamos(GestorLibros(str(tmp_path / "libros.json")),
+                             str(tmp_path / "historial.json"), str(tmp_path / "reservas.json"))
+    gestor.historial = _historial(tmp_path)
+    fechas = [r["Fecha"] for r in gestor.obtener_historial_usuario("ana", desde="2020-02-01",
+                                                                   incluir_archivo=True)]
+    assert fechas == ["2020-02-01 10:00:00", "2020-03-01 10:00:00"]
+    assert fechas == [r["Fecha"] for r in gestor.historial_rango(usuario="ana", desde="2020-02-01")]
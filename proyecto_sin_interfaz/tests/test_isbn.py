@@ -0,0 +1,95 @@
+"""
+Pruebas de la normalización de ISBN y de las búsquedas por ISBN.
+"""
+
+import json
+
+import pytest
+
+from funciones_libros.isbn import ISBNInvalido, clave_isbn, es_isbn_valido, isbn13
+from funciones_libros.libro import Libro
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_libros.catalogo_particionado import CatalogoParticionado
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+
+
+def _registro(isbn, titulo="Título", autor="Autor"):
+    return {"ISBN": isbn, "Título": titulo, "Autor": autor, "Peso": 0.5,
+            "Valor": 10000, "Cantidad": 1, "Cantidad_presente": 1}
+
+
+def test_clave_isbn10_e_isbn13_coinciden():
+    assert clave_isbn("978-84-376-0494-7") == 9788437604947
+    assert clave_isbn("843760494X") == 9788437604947
+    assert clave_isbn("84-376-0494-x") == 9788437604947
+    assert clave_isbn(" 978 84 376 0494 7 ") == 9788437604947
+    assert isbn13(clave_isbn("8437601231")) == "9788437601236"
+
+
+@pytest.mark.parametrize("isbn", ["978-84-376-0789-1", "8437604941", "12345", "97884376A4947", ""])
+def test_isbn_invalido(isbn):
+    assert not es_isbn_valido(isbn)
+    with pytest.raises(ISBNInvalido):
+        Libro(isbn, "T", "A", 1.0, 1, 1)
+
+
+def test_carga_omite_invalidos_y_duplicados_sin_perderlos(tmp_path):
+    archivo = tmp_path / "libros.json"
+    registros = [_registro("978-84-376-0494-7", "Cien años de soledad"),
+                 _registro("843760494X", "Duplicado en ISBN-10"),
+                 _registro("978-84-376-0789-1", "Dígito de control incorrecto"),
+                 _registro("978-84-376-0123-6", "Don Quijote de la Mancha")]
+    archivo.write_text(json.dumps(registros), encoding="utf-8")
+
+    gestor = GestorLibros(str(archivo))
+    assert [libro.isbn for libro in gestor.inventario_ordenado] == ["978-84-376-0123-6",
+                                                                    "978-84-376-0494-7"]
+    assert len(gestor.registros_rechazados) == 2
+
+    gestor.guardar_inventario()
+    guardados = json.loads(archivo.read_text(encoding="utf-8"))
+    assert sorted(r["ISBN"] for r in guardados) == sorted(r["ISBN"] for r in registros)
+
+
+def test_prestamo_y_devolucion_con_distintas_escrituras(tmp_path):
+    archivo = tmp_path / "libros.json"
+    archivo.write_text(json.dumps([_registro("978-84-376-0494-7")]), encoding="utf-8")
+    gestor_libros = GestorLibros(str(archivo))
+    gestor = GestorPrestamos(gestor_libros, str(tmp_path / "historial.json"),
+                             str(tmp_path / "reservas.json"))
+
+    assert gestor.prestar_libro("843760494X", "ana")[0]
+    exito, _ = gestor.prestar_libro("9788437604947", "luis")
+    assert not exito
+    assert gestor.reservas.tiene_reservas("978-84-376-0494-7")
+
+    exito, mensaje = gestor.devolver_libro("978 84 376 0494 7", "ana")
+    assert exito and "luis" in mensaje
+    registros = gestor.historial_rango(isbn="843760494X")
+    assert [(r["Usuario"], r["ISBN"]) for r in registros] == [("ana", "978-84-376-0494-7"),
+                                                             ("luis", "978-84-376-0494-7")]
+    assert registros[0]["Devuelto"] is not None
+    assert not gestor.reservas.tiene_reservas("978-84-376-0494-7")
+
+
+def test_catalogo_particionado_desde_archivo_omite_invalidos(tmp_path):
+    archivo = tmp_path / "libros.json"
+    archivo.write_text(json.dumps([_registro("978-84-376-0494-7"), _registro("843760494X"),
+                                   _registro("978-84-376-0789-1"), _registro("978-84-376-0123-6")]),
+                       encoding="utf-8")
+    with CatalogoParticionado.desde_archivo(str(archivo), 2) as catalogo:
+        assert catalogo.buscar_por_isbn_binaria("978-84-376-0494-7").isbn == "978-84-376-0494-7"
+        assert catalogo.buscar_por_isbn_binaria("978-84-376-0123-6") is not None
+        assert catalogo.buscar_por_isbn_binaria("978-84-376-0789-1") is None
+
+
+def test_catalogo_particionado_busqueda_por_isbn():
+    libros = [Libro.from_dict(_registro(isbn)) for isbn in
+              ("978-84-376-0494-7", "978-84-376-0495-4", "978-84-376-0123-6", "978-84-376-0456-5")]
+    with CatalogoParticionado(libros, 2) as catalogo:
+        assert catalogo.particiones == 2
+        assert catalogo.buscar_por_isbn_binaria("978-84-376-0123-6").isbn == "978-84-376-0123-6"
+        assert catalogo.buscar_por_isbn_binaria("978-84-376-0495-4").isbn == "978-84-376-0495-4"
+        assert catalogo.buscar_por_isbn_binaria("8437601231").isbn == "978-84-376-0123-6"
+        assert catalogo.buscar_por_isbn_binaria("978-0-306-40615-7") is None
+        assert catalogo.buscar_por_isbn_binaria("no es un isbn") is None
@@ -0,0 +1,76 @@
+"""
+Pruebas del modo multiproceso: dos mostradores sobre los mismos archivos.
+"""
+
+import json
+from contextlib import contextmanager
+
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from funciones_prestamo.mostrador_compartido import MostradorCompartido
+
+ISBN = "978-84-376-0494-7"
+
+
+def _mostrador(tmp_path, **kwargs):
+    gestor = GestorPrestamos(GestorLibros(str(tmp_path / "libros.json")),
+                             str(tmp_path / "historial.json"), str(tmp_path / "reservas.json"),
+                             gestor_usuarios=GestorUsuario(str(tmp_path / "usuarios.json")))
+    return MostradorCompartido(gestor, str(tmp_path / "cambios.log"), **kwargs)
+
+
+def _disponibles(mostrador):
+    return mostrador.gestor_prestamos.gestor_libros.buscar_por_isbn_binaria(ISBN).cantidad_presente
+
+
+def test_registro_truncado_tras_la_instantanea(tmp_path):
+    (tmp_path / "libros.json").write_text(json.dumps([
+        {"ISBN": ISBN, "Título": "Título", "Autor": "Autor", "Peso": 0.5,
+         "Valor": 10000, "Cantidad": 1, "Cantidad_presente": 1}]), encoding="utf-8")
+    primero = _mostrador(tmp_path, limite_registro=0)
+    segundo = _mostrador(tmp_path)
+
+    assert primero.prestar_libro(ISBN, "ana")[0]
+    lineas = (tmp_path / "cambios.log").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(linea)["tipo"] for linea in lineas] == ["base"]
+
+    # El segundo mostrador no había leído esos cambios: recarga los archivos
+    assert segundo.sincronizar() == 1
+    assert _disponibles(segundo) == 0
+    assert segundo.version == primero.version
+
+    assert primero.agregar_usuario("Eva", "1001") is not None
+    segundo.sincronizar()
+    assert segundo.gestor_prestamos.gestor_usuarios.buscar_usuario("1001").nombre == "Eva"
+
+    # Sin superar su límite, el segundo publica cambios incrementales
+    assert segundo.devolver_libro(ISBN, "1001")[0] is False
+    assert segundo.devolver_libro(ISBN, "ana")[0]
+    assert primero.sincronizar() > 0
+    assert _disponibles(primero) == 1
+    assert primero.gestor_prestamos.historial.cima()["Devuelto"] is not None
+
+
+def test_recarga_al_sincronizar_con_bloqueo_exclusivo(tmp_path):
+    primero = _mostrador(tmp_path, limite_registro=0)
+    segundo = _mostrador(tmp_path)
+    adquirir = segundo.registro.bloqueo.adquirir
+    modos = []
+    recargas = []
+
+    @contextmanager
+    def registrar(exclusivo=True):
+        modos.append(exclusivo)
+        with adquirir(exclusivo):
+            yield
+            modos.pop()
+
+    recargar = segundo._recargar
+    segundo.registro.bloqueo.adquirir = registrar
+    segundo._recargar = lambda almacen: (recargas.append((almacen, modos[-1])), recargar(almacen))
+
+    assert primero.agregar_usuario("Eva", "1001") is not None
+    assert segundo.sincronizar() == 1
+    assert recargas and all(exclusivo for _, exclusivo in recargas)
+    assert segundo.gestor_prestamos.gestor_usuarios.buscar_usuario("1001").nombre == "Eva"
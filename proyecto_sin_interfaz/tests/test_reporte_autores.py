@@ -0,0 +1,43 @@
+"""
+Pruebas del reporte de estadísticas de todos los autores.
+"""
+
+import json
+
+import pytest
+
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_libros.libro import Libro
+from recursion.reporte_autores import ReporteAutores
+
+
+def _libros():
+    return [Libro("978-84-376-0494-7", "Cien años de soledad", "Gabriel García Márquez", 0.5, 45000, 3),
+            Libro("978-84-376-0495-4", "El amor en los tiempos del cólera", "Gabriel Garcia Marquez",
+                  0.6, 42000, 2, 1),
+            Libro("978-84-376-0123-6", "Don Quijote de la Mancha", "Miguel de Cervantes", 1.2, 55000, 4)]
+
+
+def test_pool_coincide_con_el_calculo_en_proceso():
+    secuencial = ReporteAutores(procesos=1).calcular(_libros())
+    paralelo = ReporteAutores(procesos=2, tamanio_bloque=1).calcular(_libros())
+    assert paralelo == secuencial
+    assert [(fila["Autor"], fila["Titulos"], fila["Disponibles"]) for fila in secuencial] == [
+        ("Gabriel García Márquez", 2, 4), ("Miguel de Cervantes", 1, 4)]
+
+
+def test_error_de_escritura_se_propaga(tmp_path):
+    with pytest.raises(OSError):
+        ReporteAutores(procesos=1).generar_reporte(_libros(), str(tmp_path / "no_existe" / "reporte.json"))
+
+
+def test_desde_archivo_omite_los_registros_rechazados(tmp_path):
+    archivo = tmp_path / "libros.json"
+    registros = [libro.to_dict() for libro in _libros()]
+    registros.append(dict(registros[0], ISBN="843760494X"))
+    registros.append(dict(registros[2], ISBN="978-84-376-0789-1"))
+    archivo.write_text(json.dumps(registros), encoding="utf-8")
+
+    reporte = ReporteAutores(procesos=1)
+    assert reporte.calcular_desde_archivo(str(archivo)) == reporte.calcular(_libros())
+    assert reporte.calcular(GestorLibros(str(archivo)).inventario_general) == reporte.calcular(_libros())
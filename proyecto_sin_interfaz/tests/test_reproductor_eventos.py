@@ -0,0 +1,33 @@
+"""
+Pruebas del reproductor de eventos de circulación.
+"""
+
+import json
+
+from funciones_libros.gestor_libros import GestorLibros
+from funciones_prestamo.gestor_prestamos import GestorPrestamos
+from funciones_prestamo.reproductor_eventos import ReproductorEventos
+
+
+def test_prestamo_sin_ejemplares_cuenta_como_en_espera(tmp_path):
+    archivo = tmp_path / "libros.json"
+    archivo.write_text(json.dumps([{"ISBN": "978-84-376-0494-7", "Título": "Título",
+                                    "Autor": "Autor", "Peso": 0.5, "Valor": 10000,
+                                    "Cantidad": 1, "Cantidad_presente": 1}]),
+                       encoding="utf-8")
+    gestor = GestorPrestamos(GestorLibros(str(archivo)), str(tmp_path / "historial.json"),
+                             str(tmp_path / "reservas.json"))
+    eventos = [("prestar", "978-84-376-0494-7", "ana"),
+               ("prestar", "978-84-376-0494-7", "luis"),
+               ("prestar", "978-84-376-0000-0", "eva"),
+               ("reservar", "978-84-376-0000-0", "eva"),
+               ("devolver", "978-84-376-0494-7", "eva")]
+
+    estadisticas = ReproductorEventos(gestor).reproducir(iter(eventos))
+
+    assert estadisticas["aplicados"] == 1
+    assert estadisticas["en_espera"] == 1
+    assert estadisticas["fallidos"] == 3
+    # Devolver sin un préstamo activo no repone el ejemplar
+    assert estadisticas["estado_final"]["ejemplares_disponibles"] == 0
+    assert estadisticas["estado_final"]["reservas_pendientes"] == 1
@@ -0,0 +1,53 @@
+"""
+Pruebas de la cola de reservas.
+"""
+
+from datetime import datetime, timedelta
+
+from estructuras_datos.cola import Cola
+from estructuras_datos.planificador_reservas import (PlanificadorReservas, PRIORIDAD_GENERAL,
+                                                     PRIORIDAD_PERSONAL)
+
+
+def test_cola_fifo_y_persistencia(tmp_path):
+    archivo = str(tmp_path / "reservas.json")
+    cola = Cola(archivo)
+    for usuario in ("ana", "luis", "eva"):
+        cola.encolar("978-84-376-0494-7", usuario)
+    cola.encolar("978-84-376-0123-6", "ana")
+
+    assert cola.desencolar()["Usuario"] == "ana"
+    assert cola.eliminar_reserva("978-84-376-0494-7", "eva")
+    assert not cola.eliminar_reserva("978-84-376-0494-7", "eva")
+    assert cola.frente()["Usuario"] == "luis"
+
+    recargada = Cola(archivo)
+    assert [(e["ISBN"], e["Usuario"]) for e in recargada.elementos] == [
+        ("978-84-376-0494-7", "luis"), ("978-84-376-0123-6", "ana")]
+    assert recargada.tiene_reservas("978-84-376-0123-6")
+    assert not Cola(str(tmp_path / "vacia.json")).tiene_reservas("978-84-376-0123-6")
+
+
+def test_planificador_prioridad_eliminacion_y_guardado(tmp_path, monkeypatch):
+    archivo = str(tmp_path / "reservas.json")
+    planificador = PlanificadorReservas(archivo)
+    llegada = datetime(2026, 1, 1, 10, 0, 0)
+    planificador.encolar("978-84-376-0494-7", "ana", PRIORIDAD_GENERAL, llegada)
+    planificador.encolar("978-84-376-0494-7", "luis", PRIORIDAD_PERSONAL,
+                         llegada + timedelta(minutes=1))
+    planificador.encolar("978-84-376-0494-7", "ana", PRIORIDAD_PERSONAL,
+                         llegada + timedelta(minutes=2))
+    assert planificador.elementos is planificador.elementos
+
+    # Se elimina la reserva de ana que se atendería primero (la Personal)
+    assert planificador.eliminar_reserva("978-84-376-0494-7", "ana")
+    assert [(r["Usuario"], r["Prioridad"]) for r in planificador.elementos] == [
+        ("ana", PRIORIDAD_GENERAL), ("luis", PRIORIDAD_PERSONAL)]
+    assert not planificador.eliminar_reserva("978-84-376-0494-7", "eva")
+
+    guardados = []
+    monkeypatch.setattr(planificador, "_escribir", guardados.append)
+    assert planificador.siguiente_reserva("978-84-376-0123-6", llegada) is None
+    assert guardados == []
+    assert planificador.siguiente_reserva("978-84-376-0494-7", llegada)["Usuario"] == "luis"
+    assert [[r["Usuario"] for r in lista] for lista in guardados] == [["ana"]]
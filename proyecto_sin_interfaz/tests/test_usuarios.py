@@ -0,0 +1,32 @@
+"""
+Pruebas del gestor de usuarios: índice por nombre y diario de cambios.
+"""
+
+import os
+
+from funciones_prestamo.funciones_usuario.gestor_usuario import GestorUsuario
+
+
+def test_nombre_sin_tildes_ni_mayusculas(tmp_path):
+    gestor = GestorUsuario(str(tmp_path / "usuarios.json"))
+    gestor.agregar_usuario("José  Pérez", "1")
+    assert [u.identificacion for u in gestor.buscar_por_nombre("jose perez")] == ["1"]
+    assert [u.identificacion for u in gestor.buscar_por_nombre("JOSÉ PEREZ")] == ["1"]
+
+
+def test_diario_se_consolida_al_llegar_al_limite(tmp_path):
+    archivo = str(tmp_path / "usuarios.json")
+    gestor = GestorUsuario(archivo, limite_diario=3)
+    gestor.agregar_usuario("Ana", "1")
+    gestor.agregar_usuario("Luis", "2")
+    assert gestor.diario.entradas == 2 and os.path.exists(archivo + ".diario")
+
+    gestor.eliminar_usuario("1")
+    assert gestor.diario.entradas == 0 and not os.path.exists(archivo + ".diario")
+    gestor.agregar_usuario("Eva", "3")
+
+    recargado = GestorUsuario(archivo, limite_diario=3)
+    assert recargado.diario.entradas == 1
+    recargado.consolidar()
+    assert not os.path.exists(archivo + ".diario")
+    assert [u.identificacion for u in GestorUsuario(archivo).usuarios] == ["2", "3"]